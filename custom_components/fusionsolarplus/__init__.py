@@ -1,29 +1,192 @@
+import asyncio
+import logging
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 from homeassistant.helpers.device_registry import async_get as async_get_device_registry
-from .api.fusion_solar_py.client import FusionSolarClient
-from functools import partial
+from homeassistant.helpers.storage import Store
+from .api.fusion_solar_py.async_client import AsyncFusionSolarClient
+from .api.fusion_solar_py.captcha_solver import get_solver, local_solver_available
+from .api.fusion_solar_py.exceptions import (
+    NetworkException,
+    RateLimitException,
+    ServerException,
+)
+from .const import (
+    CAPTCHA_MODEL_FILENAME,
+    SESSION_SAVE_DELAY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
 
 
 DOMAIN = "fusionsolarplus"
 
+_LOGGER = logging.getLogger(__name__)
 
-async def async_setup_entry(hass, entry):
-    username = entry.data["username"]
-    password = entry.data["password"]
-    subdomain = entry.data.get("subdomain", "uni001eu5")
-
-    client = await hass.async_add_executor_job(
-        partial(
-            FusionSolarClient,
-            username,
-            password,
-            captcha_model_path=hass,
-            huawei_subdomain=subdomain,
-        )
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass, config):
+    store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN]["session_store"] = store
+    hass.data[DOMAIN]["sessions"] = await store.async_load() or {}
+    hass.data[DOMAIN]["clients"] = {}
+    hass.data[DOMAIN]["client_locks"] = {}
+
+    async def async_save_on_stop(event):
+        for (username, subdomain), shared in hass.data[DOMAIN]["clients"].items():
+            async_save_session(hass, shared["client"], username, subdomain)
+            await async_close_client(shared["client"])
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_save_on_stop)
+    hass.async_create_background_task(
+        async_warm_up_solver(hass), name=f"{DOMAIN} captcha solver warm-up"
+    )
+    return True
+
+
+async def async_warm_up_solver(hass):
+    """Loads the local captcha model in the background, so a login that hits
+    a captcha doesn't wait for it. The solver is shared by all clients."""
+    model_path = hass.config.path(DOMAIN, CAPTCHA_MODEL_FILENAME)
+    # without the model or onnxruntime, the remote solver is left to the login
+    if not await hass.async_add_executor_job(local_solver_available, model_path):
+        return
+    try:
+        await hass.async_add_executor_job(get_solver, model_path)
+    except Exception as e:
+        _LOGGER.warning("FusionSolarPlus: Failed to load the captcha solver: %s", e)
+
+
+def account_key(username, subdomain):
+    """Key identifying a FusionSolar account in the stored sessions"""
+    return f"{username}@{subdomain}"
+
+
+def async_save_session(hass, client, username, subdomain):
+    """Schedules the session of the given client to be written to .storage"""
+    sessions = hass.data[DOMAIN]["sessions"]
+    sessions[account_key(username, subdomain)] = client.export_session()
+    hass.data[DOMAIN]["session_store"].async_delay_save(
+        lambda: sessions, SESSION_SAVE_DELAY
+    )
+
+
+def client_key(entry):
+    """Key identifying the shared client of the account of an entry"""
+    return (entry.data["username"], entry.data.get("subdomain", "uni001eu5"))
+
+
+async def async_create_client(hass, username, password, subdomain, session_state=None):
+    """Returns a logged in client with its own cookie jar. Its connections are
+    pooled with all other aiohttp sessions of Home Assistant."""
+    client = AsyncFusionSolarClient(
+        username,
+        password,
+        session=async_create_clientsession(hass),
+        captcha_model_path=hass.config.path(DOMAIN, CAPTCHA_MODEL_FILENAME),
+        huawei_subdomain=subdomain,
+    )
+    try:
+        await client.async_login(session_state)
+    except Exception:
+        await async_close_client(client)
+        raise
+    return client
+
+
+async def async_close_client(client):
+    """Releases the aiohttp session created for a client. The connector is
+    shared with Home Assistant, which doesn't allow closing its sessions."""
+    client.session.detach()
+
+
+async def _async_create_client(hass, entry):
+    username, subdomain = client_key(entry)
+    session_state = hass.data[DOMAIN]["sessions"].get(account_key(username, subdomain))
+
+    client = await async_create_client(
+        hass, username, entry.data["password"], subdomain, session_state
     )
+    async_save_session(hass, client, username, subdomain)
+    return client
 
-    if DOMAIN not in hass.data:
-        hass.data[DOMAIN] = {}
-    hass.data[DOMAIN][entry.entry_id] = client
+
+async def async_acquire_client(hass, entry):
+    """Returns the logged in client shared by all entries of the same account"""
+    key = client_key(entry)
+    clients = hass.data[DOMAIN]["clients"]
+    lock = hass.data[DOMAIN]["client_locks"].setdefault(key, asyncio.Lock())
+
+    async with lock:
+        shared = clients.get(key)
+        if shared is None:
+            client = await _async_create_client(hass, entry)
+            shared = clients[key] = {"client": client, "entries": set()}
+        shared["entries"].add(entry.entry_id)
+
+    hass.data[DOMAIN][entry.entry_id] = shared["client"]
+    return shared["client"]
+
+
+async def async_recreate_client(hass, key, stale_client):
+    """Replaces the shared client of an account after its session broke.
+
+    If another entry already replaced stale_client, the new client is reused.
+    """
+    clients = hass.data[DOMAIN]["clients"]
+    lock = hass.data[DOMAIN]["client_locks"].setdefault(key, asyncio.Lock())
+
+    async with lock:
+        shared = clients[key]
+        if shared["client"] is stale_client:
+            # the entry that created the client may have been unloaded since
+            entry = _async_get_loaded_entry(hass, shared)
+            shared["client"] = await _async_create_client(hass, entry)
+            for entry_id in shared["entries"]:
+                hass.data[DOMAIN][entry_id] = shared["client"]
+            await async_close_client(stale_client)
+
+    return shared["client"]
+
+
+def _async_get_loaded_entry(hass, shared):
+    """Returns an entry using the shared client, for the current credentials"""
+    for entry_id in shared["entries"]:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is not None:
+            return entry
+    raise HomeAssistantError("No entry of the account is loaded")
+
+
+def async_release_client(hass, entry):
+    """Drops the reference of the entry on the shared client.
+
+    :return: The client if no other entry uses it anymore, None otherwise
+    """
+    hass.data[DOMAIN].pop(entry.entry_id, None)
+    key = client_key(entry)
+    shared = hass.data[DOMAIN]["clients"].get(key)
+    if shared is None:
+        return None
+
+    shared["entries"].discard(entry.entry_id)
+    if shared["entries"]:
+        return None
+
+    del hass.data[DOMAIN]["clients"][key]
+    return shared["client"]
+
+
+async def async_setup_entry(hass, entry):
+    try:
+        await async_acquire_client(hass, entry)
+    except (NetworkException, RateLimitException, ServerException) as err:
+        raise ConfigEntryNotReady(f"FusionSolar is not reachable: {err}") from err
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     device_registry = async_get_device_registry(hass)
     device_registry.async_get_or_create(
@@ -37,3 +200,19 @@ async def async_setup_entry(hass, entry):
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
 
     return True
+
+
+async def async_reload_entry(hass, entry):
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_unload_entry(hass, entry):
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
+    if unload_ok:
+        client = async_release_client(hass, entry)
+        if client is not None:
+            username, subdomain = client_key(entry)
+            async_save_session(hass, client, username, subdomain)
+            await async_close_client(client)
+
+    return unload_ok
@@ -0,0 +1,904 @@
+"""Asyncio client library to the fusion solar API"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import partial, wraps
+from http.cookies import SimpleCookie
+from typing import Any, Optional
+
+import aiohttp
+from yarl import URL
+
+from . import client as _client
+from .client import (
+    CAPTCHA_CANDIDATES,
+    DEFAULT_TIMEOUTS,
+    TIMEOUT_LOGIN,
+    USER_AGENT,
+    BatteryStatus,
+    Endpoint,
+    FusionSolarClient,
+    PowerStatus,
+    _active_power_control_endpoint,
+    _alarm_data_endpoint,
+    _battery_day_stats_endpoint,
+    _battery_module_stats_endpoint,
+    _battery_status_endpoint,
+    _captcha_endpoint,
+    _captcha_page_endpoint,
+    _check_company_error,
+    _check_login_response,
+    _check_power_setting,
+    _check_status_code,
+    _company_endpoint,
+    _current_plant_data_endpoint,
+    _device_ids_endpoint,
+    _historical_data_endpoint,
+    _keep_alive_endpoint,
+    _load_fake_response,
+    _login_endpoint,
+    _login_redirect_url,
+    _logout_endpoint,
+    _optimizer_stats_endpoint,
+    _parse_battery_basic_stats,
+    _parse_battery_ids,
+    _parse_company_id,
+    _parse_plant_ids,
+    _plant_flow_endpoint,
+    _plant_stats_endpoint,
+    _power_status_endpoint,
+    _pubkey_endpoint,
+    _real_time_data_endpoint,
+    _session_alive_endpoint,
+    _session_token_endpoint,
+    _station_list_endpoint,
+    _unexpected_response,
+    _verify_captcha_endpoint,
+)
+from .exceptions import (
+    AuthenticationException,
+    CaptchaRequiredException,
+    FusionSolarException,
+    NetworkException,
+    RequestTimeoutException,
+    SessionExpiredException,
+)
+
+# global logger object
+_LOGGER = logging.getLogger(__name__)
+
+# deadline (time.monotonic()) of the requests issued by the current task
+_DEADLINE = contextvars.ContextVar("fusion_solar_deadline", default=None)
+
+
+def _map_transport_error(e: Exception) -> Exception:
+    """Returns the matching FusionSolarException for an aiohttp error, other
+    exceptions are returned as is
+
+    :param e: The exception raised by a request
+    :type e: Exception
+    """
+    if isinstance(e, asyncio.TimeoutError):
+        return RequestTimeoutException(f"Request to FusionSolar timed out: {e}")
+    if isinstance(e, aiohttp.ClientError):
+        return NetworkException(f"Failed to connect to FusionSolar: {e}")
+    return e
+
+
+def _raise_for_status(r: aiohttp.ClientResponse) -> None:
+    """Raises the matching FusionSolarException for a failed response
+
+    :param r: The response to check
+    :type r: aiohttp.ClientResponse
+    """
+    _check_status_code(r.status)
+    if r.status >= 400:
+        raise FusionSolarException(
+            f"Request to FusionSolar failed: {r.status} {r.reason} for url {r.url}"
+        )
+
+
+def logged_in(func):
+    """
+    Decorator to make sure user is logged in.
+    """
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            # remember which login this check is based on, so that a concurrent
+            # re-login by another task is reused instead of repeated
+            login_generation = self._login_generation
+
+            # only use the is-session-alive feature if the session was not confirmed recently
+            if not self._is_session_cached() and not await self.is_session_active():
+                _LOGGER.debug("No active session. Resetting session and logging in...")
+                await self.relogin(login_generation)
+
+            result = await func(self, *args, **kwargs)
+        except (json.JSONDecodeError, SessionExpiredException) as e:
+            # this may indicate that the login failed or the session expired
+            # and the login page was returned instead
+            self._invalidate_session_cache()
+            _LOGGER.debug("Session expired. Received invalid response.")
+            if isinstance(e, SessionExpiredException):
+                raise
+            raise SessionExpiredException(
+                "Session expired. Received invalid response."
+            ) from e
+        except asyncio.TimeoutError as e:
+            raise RequestTimeoutException(
+                f"Request to FusionSolar timed out: {e}"
+            ) from e
+        except aiohttp.ClientError as e:
+            raise NetworkException(f"Failed to connect to FusionSolar: {e}") from e
+
+        # any successful authenticated response proves that the session is alive
+        self._mark_session_active()
+
+        return result
+
+    return wrapper
+
+
+def with_solver(func):
+    """
+    Decorator to solve captchas when required
+    """
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            result = await func(self, *args, **kwargs)
+        except CaptchaRequiredException:
+            _LOGGER.info("solving captcha and retrying login")
+            # don't allow another captcha exception to be caught by this wrapper
+            kwargs["allow_captcha_exception"] = False
+            # check if captcha is required and populate self._verify_code
+            # clear previous verify code if there was one for the check later
+            self._captcha_verify_code = None
+            captcha_present = await self._check_captcha()
+            if not captcha_present:
+                raise AuthenticationException(
+                    "Login failed: Captcha required but captcha not found."
+                )
+
+            if self._captcha_verify_code is not None:
+                result = await func(self, *args, **kwargs)
+            else:
+                raise AuthenticationException("Login failed: no verify code found.")
+        return result
+
+    return wrapper
+
+
+class AsyncFusionSolarClient:
+    """The asyncio client to interact with the Fusion Solar API. It offers the
+    methods of FusionSolarClient as coroutines, so that many requests can run
+    concurrently on the event loop without a thread per request."""
+
+    # helpers without I/O are shared with the blocking client
+    login_generation = FusionSolarClient.login_generation
+    get_last_plant_data = FusionSolarClient.get_last_plant_data
+    _get_last_value = FusionSolarClient._get_last_value
+    _get_day_start_sec = FusionSolarClient._get_day_start_sec
+    _is_session_cached = FusionSolarClient._is_session_cached
+    _mark_session_active = FusionSolarClient._mark_session_active
+    _invalidate_session_cache = FusionSolarClient._invalidate_session_cache
+    _init_solver = FusionSolarClient._init_solver
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        huawei_subdomain: str = "region01eu5",
+        session: Optional[aiohttp.ClientSession] = None,
+        captcha_model_path: Optional[str] = None,
+        captcha_device: Optional[Any] = ["CPUExecutionProvider"],
+        session_cache_ttl: float = 60,
+        timeouts: Optional[dict] = None,
+    ) -> None:
+        """Initialiazes a new AsyncFusionSolarClient instance. Unlike FusionSolarClient,
+           the client does not log in right away, call async_login before using it.
+           Must be created within the event loop.
+        :param username: The username for the system
+        :type username: str
+        :param password: The password
+        :type password: str
+        :param huawei_subdomain: The FusionSolar API uses different subdomains for different regions.
+                                 Adapt this based on the first part of the URL when you access your system.
+        :type huawei_subdomain: str
+        :param session: An optional aiohttp session. It must not be shared with other accounts, as it
+                        holds the cookies of the login. If not set, a new session will be created
+                        and closed by async_close.
+        :type session: aiohttp.ClientSession
+        :param captcha_model_path: Path to the weights file for the captcha solver. Only required if you want to use the auto captcha solver
+        :type captcha_model_path: str
+        :param captcha_device : The device to run the captcha solver on, as list of execution providers. Only required if you want to use the auto captcha solver.
+        :type captcha_device: list
+        :param session_cache_ttl: Number of seconds a confirmed session is considered active without
+                                  querying is-session-alive again. Set to 0 to check before every request.
+        :type session_cache_ttl: float
+        :param timeouts: (connect, read) timeouts in seconds by endpoint class, overriding
+                         DEFAULT_TIMEOUTS for the given classes.
+        :type timeouts: dict
+        """
+        self._user = username
+        self._password = password
+        self._captcha_verify_code = None
+        self._session_cache_ttl = session_cache_ttl
+        self._session_valid_until = 0.0
+        # single-flight login: only one task logs in, all others reuse its result
+        self._login_lock = asyncio.Lock()
+        self._login_generation = 0
+        self._login_error = None
+        self._timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self._owns_session = session is None
+        if session is None:
+            self._session = aiohttp.ClientSession()
+        else:
+            self._session = session
+        self._headers = {"User-Agent": USER_AGENT}
+        self._huawei_subdomain = huawei_subdomain
+        # hierarchy: company <- plants <- devices <- subdevices
+        self._company_id = None
+        if self._huawei_subdomain.startswith("region"):
+            self._login_subdomain = self._huawei_subdomain[8:]
+        elif self._huawei_subdomain.startswith("uni"):
+            self._login_subdomain = self._huawei_subdomain[6:]
+        else:
+            self._login_subdomain = self._huawei_subdomain
+
+        self._captcha_model_path = captcha_model_path
+        self.captcha_device = captcha_device
+        self._captcha_solver = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The aiohttp session used by the client"""
+        return self._session
+
+    async def async_login(self, session_state: Optional[dict] = None) -> None:
+        """Logs into the Fusion Solar API, or resumes a stored session if it is
+        still active. Raises an exception if the login fails.
+
+        :param session_state: The state of a previous session as returned by export_session
+        :type session_state: dict
+        """
+        try:
+            if session_state is not None and await self._restore_session(session_state):
+                _LOGGER.debug("Resumed stored session")
+                return
+
+            async with self._login_lock:
+                try:
+                    await self._configure_session()
+                finally:
+                    self._login_generation += 1
+        except asyncio.TimeoutError as e:
+            raise RequestTimeoutException(
+                f"Request to FusionSolar timed out: {e}"
+            ) from e
+        except aiohttp.ClientError as e:
+            raise NetworkException(f"Failed to connect to FusionSolar: {e}") from e
+
+    async def async_close(self) -> None:
+        """Closes the session if it was created by the client. The server side
+        session is kept, so that it can be resumed later on using export_session."""
+        if self._owns_session:
+            await self._session.close()
+
+    async def log_out(self):
+        """Log out from the FusionSolarAPI"""
+        await self._send(_logout_endpoint(self._huawei_subdomain))
+
+    @contextmanager
+    def deadline(self, expires_at: Optional[float]):
+        """Limits all requests issued by the current task within the context,
+        including a re-login, to finish before the given deadline. Tasks created
+        within the context inherit it.
+
+        :param expires_at: The deadline as time.monotonic() value, None for no deadline
+        :type expires_at: float
+        """
+        token = _DEADLINE.set(expires_at)
+        try:
+            yield
+        finally:
+            _DEADLINE.reset(token)
+
+    def _timeout(self, endpoint_class: str) -> aiohttp.ClientTimeout:
+        """Returns the timeout of a request to the given endpoint class, limited
+        to the remaining time of the current deadline.
+
+        :param endpoint_class: One of the TIMEOUT_* endpoint classes
+        :type endpoint_class: str
+        :rtype: aiohttp.ClientTimeout
+        """
+        connect_timeout, read_timeout = self._timeouts[endpoint_class]
+        expires_at = _DEADLINE.get()
+        if expires_at is None:
+            return aiohttp.ClientTimeout(
+                sock_connect=connect_timeout, sock_read=read_timeout
+            )
+
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            raise RequestTimeoutException("Deadline of the refresh exceeded.")
+        return aiohttp.ClientTimeout(
+            total=remaining, sock_connect=connect_timeout, sock_read=read_timeout
+        )
+
+    async def _request(
+        self, method: str, url, endpoint_class: str, **kwargs
+    ) -> aiohttp.ClientResponse:
+        """Sends a request with the headers of the session and reads the
+        complete response, so that it can be parsed after the connection was
+        released.
+
+        :param method: The HTTP method
+        :type method: str
+        :param endpoint_class: One of the TIMEOUT_* endpoint classes
+        :type endpoint_class: str
+        :rtype: aiohttp.ClientResponse
+        """
+        async with self._session.request(
+            method,
+            url,
+            headers=self._headers,
+            timeout=self._timeout(endpoint_class),
+            **kwargs,
+        ) as r:
+            await r.read()
+        return r
+
+    async def _send(self, endpoint: Endpoint) -> aiohttp.ClientResponse:
+        """Sends the request of an endpoint, see _request"""
+        return await self._request(
+            endpoint.method,
+            endpoint.url,
+            endpoint.timeout_class,
+            params=endpoint.params,
+            json=endpoint.json,
+            data=endpoint.data,
+        )
+
+    async def _fetch(self, endpoint: Endpoint) -> Any:
+        """Sends the request of an endpoint and returns its parsed response.
+
+        Decoding errors are raised as is, they mean that the session expired and
+        are handled by @logged_in.
+        """
+        if endpoint.fake_response is not None and _client.ENABLE_FAKE_BATTERY:
+            response = await self._run_blocking(
+                _load_fake_response, endpoint.fake_response
+            )
+        else:
+            r = await self._send(endpoint)
+            _raise_for_status(r)
+            if endpoint.parse is None:
+                return None
+            response = await r.json(
+                content_type=None,
+                loads=partial(json.loads, parse_float=endpoint.parse_float),
+            )
+
+        with _unexpected_response():
+            return endpoint.parse(response)
+
+    async def _run_blocking(self, func, *args):
+        """Runs CPU bound or blocking work (captcha solving) in the default executor"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(func, *args)
+        )
+
+    async def _check_captcha(self):
+        """Checks if the captcha is required for the login.
+
+        Also solves the captcha and places the answer into self._verify_code
+
+        :returns True if captcha is required, False otherwise
+        """
+        # check if the import is available
+        try:
+            import bs4
+        except ImportError:
+            _LOGGER.error(
+                "Required libraries for CAPTCHA solving are not available. Please install the package using pip install fusion_solar_py[captcha]."
+            )
+            raise Exception("Required libraries for CAPTCHA solving are not available.")
+
+        _LOGGER.debug("Checking if captcha is required")
+
+        r = await self._send(_captcha_page_endpoint(self._login_subdomain))
+        _raise_for_status(r)
+        page = await r.text()
+        soup = await self._run_blocking(bs4.BeautifulSoup, page, "html.parser")
+        captcha_exists = soup.find(id="verificationCodeInput")
+        if captcha_exists:
+            captcha = await self._get_captcha()
+            await self._run_blocking(self._init_solver)
+            verify_codes = await self._run_blocking(
+                self._captcha_solver.solve_captcha_candidates,
+                captcha,
+                CAPTCHA_CANDIDATES,
+            )
+            # try the next answer of the solver before downloading a new captcha
+            for verify_code in verify_codes:
+                r = await self._send(
+                    _verify_captcha_endpoint(self._login_subdomain, verify_code)
+                )
+                _raise_for_status(r)
+                if await r.text() == "success":
+                    self._captcha_verify_code = verify_code
+                    return True
+                _LOGGER.debug("Captcha answer rejected, trying the next one")
+            raise AuthenticationException("Login failed: captcha prevalidverify fail.")
+        else:
+            return False
+
+    async def _get_captcha(self):
+        r = await self._send(_captcha_endpoint(self._login_subdomain))
+        _raise_for_status(r)
+        return await r.read()
+
+    @with_solver
+    async def _login(self, allow_captcha_exception=True):
+        # retrieve the public key in order to test which loging function to use
+        key_request = await self._send(_pubkey_endpoint())
+
+        if key_request.status != 200:
+            _LOGGER.error(
+                f"Failed to retrieve public key. Status code = {key_request.status}"
+            )
+            raise FusionSolarException("Failed to retrieve public key.")
+
+        endpoint = _login_endpoint(
+            self._login_subdomain,
+            self._huawei_subdomain,
+            self._user,
+            self._password,
+            await key_request.json(content_type=None),
+            self._captcha_verify_code,
+        )
+        # invalidate verify code after use
+        self._captcha_verify_code = None
+
+        # send the request
+        r = await self._send(endpoint)
+        _raise_for_status(r)
+
+        try:
+            login_response = await r.json(content_type=None)
+        except Exception as e:
+            _LOGGER.error("Retrieved invalid data as login response.")
+            _LOGGER.exception(e)
+            raise FusionSolarException("Failed to process login response")
+
+        target_url = _login_redirect_url(self._login_subdomain, login_response)
+        if target_url is not None:
+            _LOGGER.debug("New loging procedure successful, sending additional request")
+            new_procedure_response = await self._request(
+                "GET", URL(target_url, encoded=True), TIMEOUT_LOGIN
+            )
+            _raise_for_status(new_procedure_response)
+
+        # only attempt to solve the captcha if it hasn't been tried before and
+        # a model path is available
+        _check_login_response(
+            login_response,
+            captcha_allowed=allow_captcha_exception and bool(self._captcha_model_path),
+        )
+
+    async def relogin(self, login_generation: Optional[int] = None) -> None:
+        """Resets the session and logs in again. Concurrent callers are collapsed
+        into a single login: while one task logs in, all others wait and then
+        reuse its result, including a failed login.
+
+        :param login_generation: The login generation the caller observed before
+                                 detecting the expired session. If another login
+                                 finished in the meantime, no new login is started.
+        :type login_generation: int
+        """
+        if login_generation is None:
+            login_generation = self._login_generation
+
+        async with self._login_lock:
+            if self._login_generation != login_generation:
+                _LOGGER.debug("Session was already renewed by a concurrent login")
+                if self._login_error is not None:
+                    raise self._login_error
+                return
+
+            try:
+                self._reset_session()
+                await self._configure_session()
+                self._login_error = None
+            except Exception as e:
+                self._login_error = _map_transport_error(e)
+                if self._login_error is e:
+                    raise
+                raise self._login_error from e
+            finally:
+                self._login_generation += 1
+
+    async def _configure_session(self):
+        """Logs into the Fusion Solar API. Raises an exception if the login fails."""
+        # check the login credentials right away
+        _LOGGER.debug("Logging into Huawei Fusion Solar API")
+
+        await self._login()
+
+        # get the payload - not using the decorated keep_alive, as it would try
+        # to log in again while this login holds the lock
+        payload = await self._keep_alive()
+
+        if not payload:
+            raise FusionSolarException(
+                "Login failed. No payload received from keep-alive."
+            )
+
+        # get the main id
+        r = await self._send(_company_endpoint(self._huawei_subdomain))
+        if r.status == 500:
+            _check_company_error(await r.text())
+        _raise_for_status(r)
+        self._company_id = _parse_company_id(await r.text())
+
+        # get the roarand, needed for post requests, otherwise they return 401
+        endpoint = _session_token_endpoint(self._huawei_subdomain)
+        r = await self._send(endpoint)
+        _raise_for_status(r)
+        try:
+            roarand = endpoint.parse(await r.json(content_type=None))
+        except json.JSONDecodeError:
+            roarand = None
+        if roarand is not None:
+            self._headers["roarand"] = roarand
+
+    def export_session(self) -> dict:
+        """Exports everything required to resume the current session later on
+        without logging in again. The format is shared with FusionSolarClient.
+
+        :return: The cookies, the roarand token and the company id of the session
+        :rtype: dict
+        """
+        cookies = []
+        for morsel in self._session.cookie_jar:
+            expires = None
+            if morsel["expires"]:
+                try:
+                    expires = int(parsedate_to_datetime(morsel["expires"]).timestamp())
+                except (TypeError, ValueError):
+                    pass
+            cookies.append(
+                {
+                    "name": morsel.key,
+                    "value": morsel.value,
+                    "domain": morsel["domain"],
+                    "path": morsel["path"] or "/",
+                    "secure": bool(morsel["secure"]),
+                    "expires": expires,
+                }
+            )
+
+        return {
+            "cookies": cookies,
+            "roarand": self._headers.get("roarand"),
+            "company_id": self._company_id,
+        }
+
+    async def _restore_session(self, session_state: dict) -> bool:
+        """Loads a session exported by export_session into the current session
+        and checks whether it is still active.
+
+        :param session_state: The state returned by export_session
+        :type session_state: dict
+        :return: True if the restored session is active
+        :rtype: bool
+        """
+        if not session_state.get("company_id") or not session_state.get("cookies"):
+            return False
+
+        for cookie in session_state["cookies"]:
+            if cookie.get("expires") and cookie["expires"] < time.time():
+                continue
+            domain = (cookie.get("domain") or "").lstrip(".") or (
+                f"{self._huawei_subdomain}.fusionsolar.huawei.com"
+            )
+            simple_cookie = SimpleCookie()
+            simple_cookie[cookie["name"]] = cookie["value"]
+            morsel = simple_cookie[cookie["name"]]
+            morsel["domain"] = domain
+            morsel["path"] = cookie.get("path") or "/"
+            if cookie.get("secure"):
+                morsel["secure"] = True
+            self._session.cookie_jar.update_cookies(
+                simple_cookie, URL(f"https://{domain}/")
+            )
+        if session_state.get("roarand"):
+            self._headers["roarand"] = session_state["roarand"]
+        self._company_id = session_state["company_id"]
+
+        try:
+            if await self.is_session_active():
+                return True
+        except (aiohttp.ClientError, asyncio.TimeoutError, FusionSolarException) as e:
+            _LOGGER.debug("Failed to validate stored session: %s", e)
+
+        # start from a clean session for the regular login
+        self._reset_session()
+        return False
+
+    def _reset_session(self) -> None:
+        """Drops the cookies and headers of the current session. The connections
+        of the session are kept, so that a new login reuses them."""
+        self._session.cookie_jar.clear()
+        self._headers = {"User-Agent": USER_AGENT}
+        self._company_id = None
+
+    async def is_session_active(self) -> bool:
+        """Tests whether the current session is active. In the web-based application, this
+        function is triggered every 10 seconds.
+
+        :return: Indicates whether the current session is active.
+        :rtype: bool
+        """
+        if self._session.closed:
+            self._invalidate_session_cache()
+            return False
+
+        # send the request
+        endpoint = _session_alive_endpoint(self._huawei_subdomain)
+        r = await self._send(endpoint)
+        if r.status == 401:
+            self._invalidate_session_cache()
+            return False
+        _raise_for_status(r)
+
+        # get the response - an expired session may return the HTML login page
+        try:
+            active = endpoint.parse(await r.json(content_type=None))
+        except json.JSONDecodeError:
+            active = False
+
+        if active:
+            self._mark_session_active()
+        else:
+            self._invalidate_session_cache()
+        return active
+
+    async def _keep_alive(self) -> str:
+        payload = await self._fetch(_keep_alive_endpoint(self._huawei_subdomain))
+        if payload is not None:
+            # save the payload as a session header
+            self._headers["roarand"] = payload
+        return payload
+
+    @logged_in
+    async def keep_alive(self) -> str:
+        """This function replicates a call sent by the web-based application. Currently,
+        the rate at which this function is called is unclear. It seems to be called around
+        every 30 seconds.
+
+        :return: This function returns the payload returned by the respective call
+        :rtype: str
+        """
+        return await self._keep_alive()
+
+    @logged_in
+    async def get_power_status(self) -> PowerStatus:
+        """Retrieve the current power status. This is the complete
+           summary accross all stations.
+        :return: The current status as a PowerStatus object
+        """
+        return await self._fetch(_power_status_endpoint(self._huawei_subdomain))
+
+    @logged_in
+    async def get_current_plant_data(self, plant_id: str) -> dict:
+        """Retrieve the current power status for a specific plant.
+        :return: A dict object containing the whole data
+        """
+        return await self._fetch(
+            _current_plant_data_endpoint(self._huawei_subdomain, plant_id)
+        )
+
+    @logged_in
+    async def get_plant_ids(self) -> list:
+        """Get the ids of all available stations linked
+           to this account
+        :return: A list of plant ids (strings)
+        :rtype: list
+        """
+        return _parse_plant_ids(await self.get_station_list())
+
+    @logged_in
+    async def get_station_list(self) -> list:
+        """Get the list of available PV stations.
+
+        :return: _description_
+        :rtype: list
+        """
+        return await self._fetch(
+            _station_list_endpoint(self._huawei_subdomain, self._get_day_start_sec())
+        )
+
+    @logged_in
+    async def get_device_ids(self) -> list:
+        """gets the devices associated to a given parent_id (can be a plant or a company/account)
+        returns a dictionary mapping device_type to device_id"""
+        return await self._fetch(
+            _device_ids_endpoint(self._huawei_subdomain, self._company_id)
+        )
+
+    @logged_in
+    async def get_historical_data(
+        self,
+        signal_ids: list[str] = ["30014", "30016", "30017"],
+        device_dn: str = None,
+        date: datetime = None,
+    ) -> dict:
+        """retrieves historical data for specified signals and device
+        possible signal_ids:
+        30017 : produced DC in kW
+        30016 : daily production in kWh
+        30014 : produced AC in kW
+
+        :return: historical data for requested signals and device
+        :rtype: dict
+        """
+        return await self._fetch(
+            _historical_data_endpoint(
+                self._huawei_subdomain, signal_ids, device_dn, date
+            )
+        )
+
+    @logged_in
+    async def get_real_time_data(self, device_dn: str = None) -> dict:
+        """retrieves real time data for requested device
+
+        :return: real time data for requested signals and device
+        :rtype: dict
+
+        """
+        return await self._fetch(
+            _real_time_data_endpoint(self._huawei_subdomain, device_dn)
+        )
+
+    @logged_in
+    async def get_alarm_data(self, device_dn: str = None) -> dict:
+        """retrieves alarm data for device id
+        :return: alarm data for device id
+        :rtype: dict
+        """
+        return await self._fetch(
+            _alarm_data_endpoint(self._huawei_subdomain, device_dn)
+        )
+
+    @logged_in
+    async def get_battery_ids(self, plant_id) -> list:
+        """gets the battery ids associated to a given plant id
+        :return: A list of battery ids (strings)
+        :rtype: list
+        """
+        return _parse_battery_ids(await self.get_plant_flow(plant_id))
+
+    @logged_in
+    async def get_battery_basic_stats(self, battery_id: str) -> BatteryStatus:
+        """Retrieves the basic stats for the given battery.
+        :param battery_id: The battery's id
+        :type battery_id: str
+        :return: The basic stats as a BatteryStatus object
+        """
+        return _parse_battery_basic_stats(await self.get_battery_status(battery_id))
+
+    @logged_in
+    async def get_battery_day_stats(
+        self, battery_id: str, query_time: int = None
+    ) -> dict:
+        """Retrieves the SOC (state of charge) in % and charge/discharge power in kW of
+        the battery for the current day.
+        :param battery_id: The battery's id
+        :type battery_id: str
+        :param query_time: If set, must be set to 00:00:00 of the day the data should
+                           be fetched for. If not set, retrieves the data for the
+                           current day.
+        :type query_time: int
+        :return: The complete data structure as a dict
+        """
+        return await self._fetch(
+            _battery_day_stats_endpoint(self._huawei_subdomain, battery_id, query_time)
+        )
+
+    @logged_in
+    async def get_battery_module_stats(
+        self, battery_id: str, module_id: str = "1", signal_ids: list = None
+    ) -> dict:
+        """Retrieves the complete stats for the given battery module
+        of the latest recorded time. See signals.md for a list of signals.
+        :param battery_id: The battery's id
+        :type battery_id: str
+        :param module_id: The module's id
+        :type module_id: str
+        :param signal_ids: The signal ids to retrieve. If not set, all signals will be retrieved
+        :type signal_ids: list
+        :return: The complete data structure as a dict
+        """
+        return await self._fetch(
+            _battery_module_stats_endpoint(
+                self._huawei_subdomain, battery_id, module_id, signal_ids
+            )
+        )
+
+    @logged_in
+    async def get_battery_status(self, battery_id: str) -> dict:
+        """Retrieve the current battery status. This is the complete
+           summary accross all battery modules.
+        :param battery_id: The battery's id
+        :type battery_id: str
+        :return: The current status as a dict
+        """
+        return await self._fetch(
+            _battery_status_endpoint(self._huawei_subdomain, battery_id)
+        )
+
+    @logged_in
+    async def active_power_control(self, power_setting) -> None:
+        """apply active power control.
+        This can be usefull when electrity prices are
+        negative (sunny summer holiday) and you want
+        to limit the power that is exported into the grid"""
+        _check_power_setting(power_setting)
+        device_ids = await self.get_device_ids()
+        await self._fetch(
+            _active_power_control_endpoint(
+                self._huawei_subdomain, device_ids, power_setting
+            )
+        )
+
+    @logged_in
+    async def get_plant_flow(self, plant_id: str) -> dict:
+        """Retrieves the data for the energy flow
+        diagram displayed for each plant
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :return: The complete data structure as a dict
+        """
+        return await self._fetch(_plant_flow_endpoint(self._huawei_subdomain, plant_id))
+
+    @logged_in
+    async def get_plant_stats(self, plant_id: str, query_time: int = None) -> dict:
+        """Retrieves the complete plant usage statistics for the current day.
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :param query_time: If set, must be set to 00:00:00 of the day the data should
+                           be fetched for. If not set, retrieves the data for the
+                           current day.
+        :type query_time: int
+        :return: _description_
+        """
+        # set the query time to today
+        if not query_time:
+            query_time = self._get_day_start_sec()
+
+        return await self._fetch(
+            _plant_stats_endpoint(self._huawei_subdomain, plant_id, query_time)
+        )
+
+    @logged_in
+    async def get_optimizer_stats(self, inverter_id: str) -> dict:
+        """Retrieves the complete list of optimizers and returns real time stats.
+
+        :param inverter_id: The inverter ID
+        :type plant_id: str
+        :return: _description_
+        """
+        return await self._fetch(
+            _optimizer_stats_endpoint(self._huawei_subdomain, inverter_id)
+        )
@@ -0,0 +1,103 @@
+"""Captcha solvers shared by all clients of the process"""
+
+import importlib.util
+import logging
+import os
+import threading
+import time
+
+from .exceptions import FusionSolarException
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PROVIDERS = ("CPUExecutionProvider",)
+
+# modules the local ONNX solver needs
+LOCAL_SOLVER_MODULES = ("numpy", "onnxruntime", "PIL")
+
+# seconds until a model which failed to load is tried again
+LOCAL_RETRY_INTERVAL = 30 * 60
+
+# key of the remote solver in _solvers, shared by all models which failed to load
+REMOTE_SOLVER = "remote"
+
+_solvers = {}
+# (model_path, providers) -> lock held while that model loads
+_load_locks = {}
+_load_locks_lock = threading.Lock()
+# (model_path, providers) -> time.monotonic() the failed model is tried again
+_retry_at = {}
+
+
+def local_solver_available(model_path):
+    """Tells whether the local ONNX solver can be loaded for the given model
+
+    :param model_path: Path to the ONNX captcha model
+    :type model_path: str
+    """
+    return os.path.isfile(model_path) and all(
+        importlib.util.find_spec(module) is not None for module in LOCAL_SOLVER_MODULES
+    )
+
+
+def get_solver(model_path, device=None):
+    """Returns the captcha solver for the given model, loading it on first use.
+
+    The local solver is shared by every client using the same model and
+    execution providers. Callers asking while the model loads wait for it
+    instead of loading another copy, other models load in parallel. If the
+    model can't be loaded, the remote solver shared by all clients is returned
+    and the model is tried again after LOCAL_RETRY_INTERVAL.
+
+    :param model_path: Path to the ONNX captcha model
+    :type model_path: str
+    :param device: The execution providers to run the model on
+    :type device: list
+    """
+    providers = tuple(device) if device else DEFAULT_PROVIDERS
+    key = (model_path, providers)
+    solver = _solvers.get(key)
+    if solver is None and _retry_at.get(key, 0) > time.monotonic():
+        solver = _solvers.get(REMOTE_SOLVER)
+    if solver is not None:
+        return solver
+
+    with _load_lock(key):
+        solver = _solvers.get(key)
+        if solver is None:
+            solver = _load_solver(key)
+    return solver
+
+
+def _load_lock(key):
+    with _load_locks_lock:
+        return _load_locks.setdefault(key, threading.Lock())
+
+
+def _load_solver(key):
+    model_path, providers = key
+    try:
+        from .captcha_solver_onnx import Solver
+
+        solver = Solver(model_path, list(providers))
+    except FusionSolarException as e:
+        _LOGGER.warning(
+            "Local captcha solver not available, using the remote solver: %s", e
+        )
+        _retry_at[key] = time.monotonic() + LOCAL_RETRY_INTERVAL
+        return _get_remote_solver()
+    _LOGGER.debug("Loaded captcha solver %s", type(solver).__module__)
+    _retry_at.pop(key, None)
+    _solvers[key] = solver
+    return solver
+
+
+def _get_remote_solver():
+    """Returns the remote solver, which connects to its Space on first use"""
+    with _load_lock(REMOTE_SOLVER):
+        solver = _solvers.get(REMOTE_SOLVER)
+        if solver is None:
+            from .captcha_solver_remote import Solver
+
+            solver = _solvers[REMOTE_SOLVER] = Solver(None)
+    return solver
@@ -1,7 +1,10 @@
+import os
+
 from .exceptions import FusionSolarException
 
 try:
-    from gradio_client import Client, handle_file
+    import numpy as np
+    import onnxruntime as ort
     from PIL import Image
     from io import BytesIO
 except ImportError:
@@ -12,34 +15,107 @@ except ImportError:
         "Required libraries for CAPTCHA solving are not available. Please install the package using pip install fusion_solar_py[captcha]."
     )
 
-from fusion_solar_py.interfaces import GenericSolver
+from .ctc_decoder import decode_batch
+from .interfaces import GenericSolver
+
+# characters used by the FusionSolar captchas, in the order of the model output.
+# The CTC blank is the last output, after the alphabet. Models can override the
+# alphabet through an "alphabet" entry in their metadata.
+ALPHABET = "2345678abcdefghkmnprwxy"
+
+# size the captcha is scaled to, used if the model input has no fixed size
+IMAGE_WIDTH = 200
+IMAGE_HEIGHT = 60
+
+BEAM_SIZE = 10
 
 
 class Solver(GenericSolver):
+    """Solves the captchas in-process with an ONNX CTC model.
+
+    The model takes a batch of grayscale images of shape (batch, width, height, 1)
+    scaled to [0, 1] and returns the per-character probabilities of shape
+    (batch, time, len(alphabet) + 1).
+    """
+
     def _init_model(self):
-        self.hass = self.model_path  # Using modelpath to pass self.hass
-        if not self.hass:
-            raise FusionSolarException("hass instance not provided as model_path")
+        if not self.model_path or not os.path.isfile(self.model_path):
+            raise FusionSolarException(f"Captcha model not found at {self.model_path}")
+        if self.device is None:
+            self.device = ["CPUExecutionProvider"]
+
+        options = ort.SessionOptions()
+        # captchas are solved one at a time, don't spin up a thread per core
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        try:
+            self._session = ort.InferenceSession(
+                self.model_path, sess_options=options, providers=self.device
+            )
+        except Exception as e:
+            raise FusionSolarException(f"Failed to load captcha model: {e}")
 
-    def save_image_to_disk(self, img_bytes, filename):
-        img = Image.open(BytesIO(img_bytes))
+        # a model that doesn't fit the solver falls back like a missing one
+        try:
+            model_input = self._session.get_inputs()[0]
+            input_shape = tuple(model_input.shape)
+            output_shape = tuple(self._session.get_outputs()[0].shape)
+            metadata = self._session.get_modelmeta().custom_metadata_map
+            alphabet = metadata.get("alphabet") or ALPHABET
+        except Exception as e:
+            raise FusionSolarException(f"Failed to inspect captcha model: {e}")
 
-        # Save in .storage directory
-        save_path = self.hass.config.path(".storage", filename)
-        img.save(save_path)
+        # dynamic dimensions are named or None instead of a size
+        channels = input_shape[3] if len(input_shape) == 4 else None
+        if len(input_shape) != 4 or isinstance(channels, int) and channels != 1:
+            raise FusionSolarException(
+                "Captcha model input must have the shape (batch, width, height, 1), "
+                f"got {input_shape}"
+            )
+        self._input_name = model_input.name
+        _, width, height, _ = input_shape
+        self._width = width if isinstance(width, int) else IMAGE_WIDTH
+        self._height = height if isinstance(height, int) else IMAGE_HEIGHT
 
-        return save_path
+        self._alphabet = alphabet
+        self._blank = len(self._alphabet)
+        labels = output_shape[-1] if output_shape else None
+        if isinstance(labels, int) and labels != self._blank + 1:
+            raise FusionSolarException(
+                f"Captcha model has {labels} outputs, expected {self._blank + 1} "
+                f"for the alphabet {self._alphabet!r} and the blank"
+            )
 
     def solve_captcha(self, img_bytes):
-        # Save image and get path
-        image_path = self.save_image_to_disk(img_bytes, "captcha_input.png")
+        return self.solve_captcha_candidates(img_bytes, 1)[0]
 
-        client = Client("docparser/Text_Captcha_breaker")
-        result = client.predict(img_org=handle_file(image_path), api_name="/predict")
-        return result
+    def solve_captcha_candidates(self, img_bytes, count):
+        img = self.preprocess_image(img_bytes)
+        pred = self._session.run(None, {self._input_name: img[np.newaxis]})[0]
+        return self.decode_batch_predictions(pred, count)[0]
 
-    def decode_batch_predictions(self):
-        pass
+    def decode_batch_predictions(self, pred, top_k=1):
+        """Decodes the model output of a batch of captchas, returns per captcha
+        its top_k answers, the most likely first"""
+        results = []
+        for hypotheses in decode_batch(
+            pred, beam_size=BEAM_SIZE, blank=self._blank, top_k=top_k
+        ):
+            results.append(
+                [
+                    "".join(self._alphabet[label] for label in labels)
+                    for labels, _ in hypotheses
+                ]
+            )
+        return results
 
     def preprocess_image(self, img_bytes):
-        pass
+        """Decodes the captcha into the model input in memory: a contiguous
+        float32 array of shape (width, height, 1) scaled to [0, 1]"""
+        with Image.open(BytesIO(img_bytes)) as img:
+            img = img.convert("L").resize((self._width, self._height))
+        # the model reads the image column by column, width is the time axis
+        img = img.transpose(Image.Transpose.TRANSPOSE)
+        pixels = np.asarray(img, dtype=np.float32).reshape(self._width, self._height, 1)
+        np.divide(pixels, 255, out=pixels)
+        return pixels
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import threading
+
+from .exceptions import FusionSolarException
+
+try:
+    from gradio_client import Client, handle_file
+    from PIL import Image
+    from io import BytesIO
+except ImportError:
+    print(
+        "Required libraries for CAPTCHA solving are not available. Please install the package using pip install fusion_solar_py[captcha]."
+    )
+    raise FusionSolarException(
+        "Required libraries for CAPTCHA solving are not available. Please install the package using pip install fusion_solar_py[captcha]."
+    )
+
+from .interfaces import GenericSolver
+
+HF_SPACE = "docparser/Text_Captcha_breaker"
+
+# tmpfs on Linux, so the captcha isn't written to the SD card of a Pi
+SHM_DIR = "/dev/shm"
+
+
+class Solver(GenericSolver):
+    """Solves the captchas through a remote Hugging Face Space. Only used if no
+    local captcha model is available."""
+
+    def _init_model(self):
+        # connecting to the Space fetches its API description over the network,
+        # which is left to the first captcha
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = Client(HF_SPACE)
+            return self._client
+
+    def solve_captcha(self, img_bytes):
+        # gradio only uploads files: keep the captcha on tmpfs if the system
+        # has one and remove it right after
+        tmp_dir = SHM_DIR if os.path.isdir(SHM_DIR) else None
+        with tempfile.NamedTemporaryFile(suffix=".png", dir=tmp_dir) as image_file:
+            image_file.write(self.preprocess_image(img_bytes))
+            image_file.flush()
+
+            result = self._get_client().predict(
+                img_org=handle_file(image_file.name), api_name="/predict"
+            )
+        return result
+
+    def decode_batch_predictions(self):
+        pass
+
+    def preprocess_image(self, img_bytes):
+        """Converts the captcha to PNG in memory"""
+        png = BytesIO()
+        with Image.open(BytesIO(img_bytes)) as img:
+            img.save(png, format="PNG")
+        return png.getvalue()
@@ -1,13 +1,15 @@
 """Client library to the fusion solar API"""
 
 import logging
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
 from decimal import Decimal
 from functools import wraps
 import json
 import os
-from typing import Any, Optional
+from typing import Any, Callable, NamedTuple, Optional
 
 import requests
 
@@ -15,15 +17,38 @@ from .exceptions import (
     AuthenticationException,
     CaptchaRequiredException,
     FusionSolarException,
+    InvalidSubdomainException,
+    NetworkException,
+    NoDataException,
+    RateLimitException,
+    RequestTimeoutException,
+    ServerException,
+    SessionExpiredException,
 )
 from .constants import MODULE_SIGNALS
 from .encryption import encrypt_password, get_secure_random
+from .transport import ACCEPT_ENCODING_HEADER, DEFAULT_POOL_SIZE, mount_adapter
 
 ENABLE_FAKE_BATTERY = False  # True/False » Will give predefined API responses. Useful if you don't have a battery
 
 # global logger object
 _LOGGER = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+
+# endpoint classes with their (connect, read) timeouts in seconds
+TIMEOUT_LOGIN = "login"
+TIMEOUT_SESSION = "session"
+TIMEOUT_DATA = "data"
+DEFAULT_TIMEOUTS = {
+    TIMEOUT_LOGIN: (10, 30),
+    TIMEOUT_SESSION: (5, 10),
+    TIMEOUT_DATA: (5, 20),
+}
+
+# answers of the captcha solver tried before downloading a new captcha
+CAPTCHA_CANDIDATES = 3
+
 DEC_PRECISION = Decimal("1.00000000")
 MAX_JS_NUMBER = Decimal("1.7976931348623157E308")
 
@@ -41,6 +66,47 @@ def _parse_float(value: str) -> float:
         return 0.0
 
 
+def _check_status_code(status_code: int) -> None:
+    """Raises the matching FusionSolarException for status codes which tell
+    how to proceed: an expired session, throttling or a server error
+
+    :param status_code: The HTTP status code of the response
+    :type status_code: int
+    """
+    if status_code in (401, 403):
+        raise SessionExpiredException(
+            f"Session rejected by FusionSolar (HTTP {status_code})."
+        )
+    if status_code == 429:
+        raise RateLimitException("Too many requests to FusionSolar.")
+    if status_code >= 500:
+        raise ServerException(f"FusionSolar server error (HTTP {status_code}).")
+
+
+@contextmanager
+def _unexpected_response():
+    """Raises a NoDataException if a valid JSON response misses the expected
+    data. Only wraps reading the response, so that bugs in the client or the
+    login aren't mistaken for missing data."""
+    try:
+        yield
+    except (KeyError, IndexError, TypeError) as e:
+        raise NoDataException(f"Unexpected response from FusionSolar: {e!r}") from e
+
+
+def _raise_for_status(r: requests.Response) -> None:
+    """Raises the matching FusionSolarException for a failed response
+
+    :param r: The response to check
+    :type r: requests.Response
+    """
+    _check_status_code(r.status_code)
+    try:
+        r.raise_for_status()
+    except requests.HTTPError as e:
+        raise FusionSolarException(f"Request to FusionSolar failed: {e}") from e
+
+
 class PowerStatus:
     """Class representing the basic power status"""
 
@@ -161,6 +227,573 @@ class BatteryStatus:
         )
 
 
+def _load_fake_response(filename: str) -> dict:
+    """Loads one of the predefined API responses used with ENABLE_FAKE_BATTERY"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(base_dir, filename)) as f:
+        return json.load(f)
+
+
+def _timestamp() -> int:
+    """The current time in milliseconds, as sent by the web application"""
+    return round(time.time() * 1000)
+
+
+class Endpoint(NamedTuple):
+    """A request to the FusionSolar API and how to read its response. The
+    *_endpoint functions below build them, the clients only send them."""
+
+    method: str
+    url: str
+    timeout_class: str
+    params: Any = None
+    json: Any = None
+    data: Any = None
+    # reads the decoded JSON response, None if the response is not read
+    parse: Optional[Callable[[Any], Any]] = None
+    # parse_float passed to the JSON decoder
+    parse_float: Optional[Callable[[str], Any]] = None
+    # predefined response returned instead if ENABLE_FAKE_BATTERY is set
+    fake_response: Optional[str] = None
+
+
+def _require_data(description: str) -> Callable[[dict], dict]:
+    """Returns a parser checking the success flag of a response and returning its data"""
+
+    def parse(response: dict) -> dict:
+        if not response["success"] or "data" not in response:
+            raise NoDataException(f"Failed to retrieve {description}")
+        return response["data"]
+
+    return parse
+
+
+def _logout_endpoint(subdomain: str) -> Endpoint:
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/unisess/v1/logout",
+        TIMEOUT_LOGIN,
+        params={"service": f"https://{subdomain}.fusionsolar.huawei.com"},
+    )
+
+
+def _captcha_page_endpoint(login_subdomain: str) -> Endpoint:
+    return Endpoint(
+        "GET",
+        f"https://{login_subdomain}.fusionsolar.huawei.com/",
+        TIMEOUT_LOGIN,
+        params={
+            "service": "%2Funisess%2Fv1%2Fauth%3Fservice%3D%252Fnetecowebext%252Fhome%252Findex.html",
+        },
+    )
+
+
+def _captcha_endpoint(login_subdomain: str) -> Endpoint:
+    return Endpoint(
+        "GET",
+        f"https://{login_subdomain}.fusionsolar.huawei.com/unisso/verifycode",
+        TIMEOUT_LOGIN,
+        params={"timestamp": _timestamp()},
+    )
+
+
+def _verify_captcha_endpoint(login_subdomain: str, verify_code: str) -> Endpoint:
+    return Endpoint(
+        "POST",
+        f"https://{login_subdomain}.fusionsolar.huawei.com/unisso/preValidVerifycode",
+        TIMEOUT_LOGIN,
+        data={"verifycode": verify_code, "index": 0},
+    )
+
+
+def _pubkey_endpoint() -> Endpoint:
+    return Endpoint(
+        "GET", "https://eu5.fusionsolar.huawei.com/unisso/pubkey", TIMEOUT_LOGIN
+    )
+
+
+def _login_endpoint(
+    login_subdomain: str,
+    subdomain: str,
+    username: str,
+    password: str,
+    key_data: dict,
+    verify_code: Optional[str] = None,
+) -> Endpoint:
+    """Builds the login request, using the login function advertised by the
+    public key request"""
+    url = f"https://{login_subdomain}.fusionsolar.huawei.com/unisso/v2/validateUser.action"
+    url_params = {}
+
+    if key_data["enableEncrypt"]:
+        _LOGGER.debug("Using V3 loging function with encrypted passwords")
+        url = f"https://{login_subdomain}.fusionsolar.huawei.com/unisso/v3/validateUser.action"
+        url_params["timeStamp"] = key_data["timeStamp"]
+        url_params["nonce"] = get_secure_random()
+
+        # encrypt the password
+        password = encrypt_password(key_data=key_data, password=password)
+    else:
+        url_params["decision"] = 1
+        url_params["service"] = (
+            f"https://{subdomain}.fusionsolar.huawei.com/unisess/v1/auth?service=/netecowebext/home/index.html#/LOGIN"
+        )
+
+    json_data = {
+        "organizationName": "",
+        "username": username,
+        "password": password,
+    }
+    # add the verify code if it was set
+    if verify_code:
+        json_data["verifycode"] = verify_code
+
+    return Endpoint("POST", url, TIMEOUT_LOGIN, params=url_params, json=json_data)
+
+
+def _login_redirect_url(login_subdomain: str, login_response: dict) -> Optional[str]:
+    """Returns the URL starting the session after a login with the new login
+    procedure, None for the old one"""
+    # in the new login procedure, an errorCode 470 is pointing to a success
+    # but requires another request to start the session
+    if login_response["errorCode"] != "470":
+        return None
+    target_subdomain = login_response["respMultiRegionName"][1]
+    return f"https://{login_subdomain}.fusionsolar.huawei.com{target_subdomain}"
+
+
+def _check_login_response(login_response: dict, captcha_allowed: bool) -> None:
+    """Raises if the login was rejected
+
+    :param captcha_allowed: Whether a rejected verification code should be
+                            retried by solving the captcha
+    :type captcha_allowed: bool
+    """
+    # make sure that the login worked - NOTE: This may no longer work with the new procedure
+    error = login_response["errorMsg"]
+    if not error:
+        return
+
+    if "incorrect verification code" in error.lower() and captcha_allowed:
+        raise CaptchaRequiredException("Login failed: Incorrect verification code.")
+    raise AuthenticationException(f"Failed to login into FusionSolarAPI: {error}")
+
+
+def _company_endpoint(subdomain: str) -> Endpoint:
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/neteco/web/organization/v2/company/current",
+        TIMEOUT_LOGIN,
+        params={"_": _timestamp()},
+    )
+
+
+def _check_company_error(response_text: str) -> None:
+    """Reads the server error returned instead of the company. The new API
+    returns it if the subdomain is incorrect."""
+    try:
+        data = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        _LOGGER.error("Login validation failed. Failed to process response.")
+        _LOGGER.exception(e)
+        raise AuthenticationException("Failed to log into FusionSolarAPI.")
+
+    if data["exceptionId"] in ("Query company failed.", "bad status"):
+        raise InvalidSubdomainException(
+            "Invalid response received. Please check the correct Huawei subdomain."
+        )
+
+
+def _parse_company_id(response_text: str) -> str:
+    """Returns the id of the company the account belongs to"""
+    # catch an incorrect subdomain
+    if not response_text.strip().startswith('{"data":'):
+        raise InvalidSubdomainException(
+            "Invalid response received. Please check the correct Huawei subdomain."
+        )
+
+    response_data = json.loads(response_text)
+
+    if "data" not in response_data:
+        _LOGGER.error(f"Failed to retrieve data object. {json.dumps(response_data)}")
+        raise AuthenticationException("Failed to login into FusionSolarAPI.")
+
+    return response_data["data"]["moDn"]
+
+
+def _session_token_endpoint(subdomain: str) -> Endpoint:
+    """Returns the roarand, which is needed for non-GET requests, thus to
+    change device settings"""
+
+    def parse(response):
+        try:
+            return response["csrfToken"]
+        except Exception:
+            # this currently does not work in the new login procedure
+            return None
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/unisess/v1/auth/session",
+        TIMEOUT_LOGIN,
+        parse=parse,
+    )
+
+
+def _session_alive_endpoint(subdomain: str) -> Endpoint:
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/dpcloud/auth/v1/is-session-alive",
+        TIMEOUT_SESSION,
+        parse=lambda response: "code" in response and response["code"] == 0,
+    )
+
+
+def _keep_alive_endpoint(subdomain: str) -> Endpoint:
+    def parse(response):
+        if "code" not in response or response["code"] != 0:
+            raise SessionExpiredException("Failed to set keep alive.")
+        # the payload is sent as roarand header of the session
+        return response.get("payload")
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/dpcloud/auth/v1/keep-alive",
+        TIMEOUT_SESSION,
+        parse=parse,
+    )
+
+
+def _power_status_endpoint(subdomain: str) -> Endpoint:
+    def parse(response):
+        return PowerStatus(
+            current_power_kw=float(response["data"]["currentPower"]),
+            energy_today_kwh=float(response["data"]["dailyEnergy"]),
+            energy_kwh=float(response["data"]["cumulativeEnergy"]),
+        )
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/station/total-real-kpi",
+        TIMEOUT_DATA,
+        params={"queryTime": _timestamp(), "timeZone": 1, "_": _timestamp()},
+        parse=parse,
+    )
+
+
+def _current_plant_data_endpoint(subdomain: str, plant_id: str) -> Endpoint:
+    def parse(response):
+        if "data" not in response:
+            raise NoDataException("Failed to retrieve plant data.")
+        return response["data"]
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/overview/station-real-kpi",
+        TIMEOUT_DATA,
+        params={
+            "stationDn": plant_id,
+            "clientTime": _timestamp(),
+            "timeZone": 1,
+            "_": _timestamp(),
+        },
+        parse=parse,
+    )
+
+
+def _station_list_endpoint(subdomain: str, query_time: int) -> Endpoint:
+    def parse(response):
+        if not response["success"]:
+            raise NoDataException("Failed to retrieve station list")
+        # simply return the original object list
+        return response["data"]["list"]
+
+    return Endpoint(
+        "POST",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/station/station-list",
+        TIMEOUT_DATA,
+        json={
+            "curPage": 1,
+            "pageSize": 10,
+            "gridConnectedTime": "",
+            "queryTime": query_time,
+            "timeZone": 2,
+            "sortId": "createTime",
+            "sortDir": "DESC",
+            "locale": "en_US",
+        },
+        parse=parse,
+    )
+
+
+def _parse_plant_ids(station_list: list) -> list:
+    with _unexpected_response():
+        return [obj["dn"] for obj in station_list]
+
+
+def _device_ids_endpoint(subdomain: str, company_id: str) -> Endpoint:
+    def parse(response):
+        return [
+            dict(type=device["mocTypeName"], deviceDn=device["dn"])
+            for device in response["data"]
+        ]
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/neteco/web/config/device/v1/device-list",
+        TIMEOUT_DATA,
+        params={
+            "conditionParams.parentDn": company_id,  # can be a plant or company id
+            "conditionParams.mocTypes": "20814,20815,20816,20819,20822,50017,60066,60014,60015,23037",  # specifies the types of devices
+            "_": _timestamp(),
+        },
+        parse=parse,
+    )
+
+
+def _historical_data_endpoint(
+    subdomain: str, signal_ids: list, device_dn: str, date: Optional[datetime]
+) -> Endpoint:
+    if date is None:
+        date = datetime.now()
+
+    params = [("signalIds", signal_id) for signal_id in signal_ids]
+    params += [
+        ("deviceDn", device_dn),
+        ("date", int(date.timestamp() * 1000)),
+        ("_", _timestamp()),
+    ]
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/device-history-data",
+        TIMEOUT_DATA,
+        params=params,
+        parse=lambda response: response,
+        parse_float=_parse_float,
+    )
+
+
+def _real_time_data_endpoint(subdomain: str, device_dn: str) -> Endpoint:
+    def parse(response):
+        if "data" not in response:
+            raise NoDataException(f"Failed to retrieve real time data for {device_dn}")
+        return response
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/device-realtime-data",
+        TIMEOUT_DATA,
+        params=[("deviceDn", device_dn), ("_", _timestamp())],
+        parse=parse,
+    )
+
+
+def _alarm_data_endpoint(subdomain: str, device_dn: str) -> Endpoint:
+    return Endpoint(
+        "POST",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/fm/v1/query",
+        TIMEOUT_DATA,
+        json={
+            "dataType": "CURRENT",
+            "domainType": "OC_SOLAR",
+            "pageNo": 1,
+            "pageSize": 10,
+            "nativeMeDn": device_dn,
+        },
+        parse=lambda response: response,
+    )
+
+
+def _parse_battery_ids(plant_flow: dict) -> list:
+    """Returns the ids of the batteries in the energy flow of a plant"""
+    with _unexpected_response():
+        nodes = plant_flow["data"]["flow"]["nodes"]
+
+    battery_ids = []
+    for node in nodes:
+        name = node.get("name", "")
+        dev_ids = node.get("devIds")
+        _LOGGER.debug("Processing node: name=%r devIds=%r", name, dev_ids)
+        if "energy_store" in name:
+            if isinstance(dev_ids, list) and dev_ids:
+                battery_ids.append(dev_ids[0])
+            else:
+                _LOGGER.warning(
+                    "Node with 'energy_store' in name but devIds is not a non-empty list: %r",
+                    node,
+                )
+
+    return battery_ids
+
+
+def _parse_battery_basic_stats(battery_stats: list) -> BatteryStatus:
+    with _unexpected_response():
+        # ensure that all values are numeric
+        for index in (2, 4, 5, 6, 7, 8):
+            if "-" in battery_stats[index]["realValue"]:
+                battery_stats[index]["realValue"] = 0
+
+        return BatteryStatus(
+            state_of_charge=float(battery_stats[8]["realValue"]),
+            rated_capacity=float(battery_stats[2]["realValue"]),
+            operating_status=battery_stats[0]["value"],
+            backup_time=battery_stats[3]["value"],
+            bus_voltage=float(battery_stats[7]["realValue"]),
+            total_charged_today_kwh=float(battery_stats[4]["realValue"]),
+            total_discharged_today_kwh=float(battery_stats[5]["realValue"]),
+            current_charge_discharge_kw=float(battery_stats[6]["realValue"]),
+        )
+
+
+def _battery_day_stats_endpoint(
+    subdomain: str, battery_id: str, query_time: Optional[int]
+) -> Endpoint:
+    current_time = _timestamp() if query_time is None else query_time
+
+    def parse(response):
+        data = _require_data(f"battery day stats for {battery_id}")(response)
+        data["30005"]["name"] = "Charge/Discharge power"
+        data["30007"]["name"] = "SOC"
+        return data
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/device-history-data",
+        TIMEOUT_DATA,
+        params=[
+            # 30005 is Charge/Discharge power, 30007 is SOC, state of charge in %
+            ("signalIds", "30005"),
+            ("signalIds", "30007"),
+            ("deviceDn", battery_id),
+            ("date", current_time),
+            ("_", current_time),
+        ],
+        parse=parse,
+    )
+
+
+def _battery_module_stats_endpoint(
+    subdomain: str, battery_id: str, module_id: str, signal_ids: Optional[list]
+) -> Endpoint:
+    if signal_ids is None:
+        signal_ids = MODULE_SIGNALS[module_id]
+    elif not all(signal_id in MODULE_SIGNALS[module_id] for signal_id in signal_ids):
+        raise ValueError(f"One or more unknown signal ids for module {module_id}")
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/query-battery-dc",
+        TIMEOUT_DATA,
+        params={
+            "sigids": ",".join(signal_ids),
+            "dn": battery_id,
+            "moduleId": module_id,
+            "_": _timestamp(),
+        },
+        parse=_require_data(f"battery status for {battery_id}"),
+        fake_response={
+            "1": "battery_module_1.json",
+            "2": "battery_module_2.json",
+        }.get(module_id, "battery_module_empty.json"),
+    )
+
+
+def _battery_status_endpoint(subdomain: str, battery_id: str) -> Endpoint:
+    def parse(response):
+        return _require_data(f"battery status for {battery_id}")(response)[1]["signals"]
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/device-realtime-data",
+        TIMEOUT_DATA,
+        params={"deviceDn": battery_id, "_": _timestamp()},
+        parse=parse,
+        fake_response="battery_status.json",
+    )
+
+
+# values of the "Active Power Control" signal of the dongle
+POWER_SETTINGS = {
+    "No limit": 0,
+    "Zero Export Limitation": 5,
+    "Limited Power Grid (kW)": 6,
+    "Limited Power Grid (%)": 7,
+}
+
+
+def _check_power_setting(power_setting: str) -> None:
+    if power_setting not in POWER_SETTINGS:
+        raise ValueError("Unknown power setting")
+
+
+def _active_power_control_endpoint(
+    subdomain: str, device_ids: list, power_setting: str
+) -> Endpoint:
+    dongle_id = list(filter(lambda e: e["type"] == "Dongle", device_ids))[0]["id"]
+    return Endpoint(
+        "POST",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/deviceExt/set-config-signals",
+        TIMEOUT_DATA,
+        data={
+            "dn": dongle_id,  # power control needs to be done in the dongle
+            # 230190032 stands for "Active Power Control"
+            "changeValues": f'[{{"id":"230190032","value":"{POWER_SETTINGS[power_setting]}"}}]',
+        },
+    )
+
+
+def _plant_flow_endpoint(subdomain: str, plant_id: str) -> Endpoint:
+    def parse(response):
+        _require_data(f"plant flow for {plant_id}")(response)
+        return response
+
+    # https://region01eu5.fusionsolar.huawei.com/rest/pvms/web/station/v1/overview/energy-flow?stationDn=NE%3D33594051&_=1652469979488
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/overview/energy-flow",
+        TIMEOUT_DATA,
+        params={"stationDn": plant_id, "_": _timestamp()},
+        parse=parse,
+        fake_response="flow.json",
+    )
+
+
+def _plant_stats_endpoint(subdomain: str, plant_id: str, query_time: int) -> Endpoint:
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/overview/energy-balance",
+        TIMEOUT_DATA,
+        params={
+            "stationDn": plant_id,
+            "timeDim": 2,
+            "queryTime": query_time,  # TODO: this may have changed to micro-seconds ie. timestamp * 1000
+            # dateTime=2024-03-07 00:00:00
+            "timeZone": 2,  # 1 in no daylight
+            "timeZoneStr": "Europe/Vienna",
+            "_": _timestamp(),
+        },
+        parse=_require_data(f"plant status for {plant_id}"),
+    )
+
+
+def _optimizer_stats_endpoint(subdomain: str, inverter_id: str) -> Endpoint:
+    def parse(response):
+        # check for an error - this seems to happen if no optimizer is present
+        if "exceptionType" in response:
+            raise NoDataException(
+                f"Failed to retrieve optimizer status for {inverter_id}"
+            )
+        return _require_data(f"plant status for {inverter_id}")(response)
+
+    return Endpoint(
+        "GET",
+        f"https://{subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/layout/optimizer-info",
+        TIMEOUT_DATA,
+        params={"inverterDn": inverter_id, "_": _timestamp()},
+        parse=parse,
+    )
+
+
 def logged_in(func):
     """
     Decorator to make sure user is logged in.
@@ -168,20 +801,42 @@ def logged_in(func):
 
     @wraps(func)
     def wrapper(self, *args, **kwargs):
-        # use the is-session-alive feature to check whether the session is active
-        if not self.is_session_active():
-            _LOGGER.debug("No active session. Resetting session and logging in...")
+        try:
+            # remember which login this check is based on, so that a concurrent
+            # re-login by another thread is reused instead of repeated
+            login_generation = self._login_generation
 
-            # reset the session
-            self._session = requests.Session()
-            self._configure_session()
+            # only use the is-session-alive feature if the session was not confirmed recently
+            if not self._is_session_cached() and not self.is_session_active():
+                _LOGGER.debug("No active session. Resetting session and logging in...")
+                self.relogin(login_generation)
 
-        try:
             result = func(self, *args, **kwargs)
-        except json.JSONDecodeError:
-            # this may indicate that the login failed
-            _LOGGER.error("Login apparently failed. Received invalid response.")
-            raise FusionSolarException("Failed to reset session and login again.")
+        except (json.JSONDecodeError, SessionExpiredException) as e:
+            # this may indicate that the login failed or the session expired
+            # and the login page was returned instead
+            self._invalidate_session_cache()
+            _LOGGER.debug("Session expired. Received invalid response.")
+            if isinstance(e, SessionExpiredException):
+                raise
+            raise SessionExpiredException(
+                "Session expired. Received invalid response."
+            ) from e
+        except requests.HTTPError as e:
+            # failed requests of the login flow
+            if e.response is None:
+                raise FusionSolarException(f"Request to FusionSolar failed: {e}") from e
+            _raise_for_status(e.response)
+            raise
+        except requests.Timeout as e:
+            raise RequestTimeoutException(
+                f"Request to FusionSolar timed out: {e}"
+            ) from e
+        except requests.ConnectionError as e:
+            raise NetworkException(f"Failed to connect to FusionSolar: {e}") from e
+
+        # any successful authenticated response proves that the session is alive
+        self._mark_session_active()
 
         return result
 
@@ -230,6 +885,10 @@ class FusionSolarClient:
         session: Optional[requests.Session] = None,
         captcha_model_path: Optional[str] = None,
         captcha_device: Optional[Any] = ["CPUExecutionProvider"],
+        session_cache_ttl: float = 60,
+        session_state: Optional[dict] = None,
+        timeouts: Optional[dict] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
     ) -> None:
         """Initialiazes a new FusionSolarClient instance. This is the main
            class to interact with the FusionSolar API.
@@ -248,12 +907,36 @@ class FusionSolarClient:
         :param captcha_device : The device to run the captcha solver on, as list of execution providers. Only required if you want to use the auto captcha solver.
         Please refer to the onnxruntime documentation for more information. https://onnxruntime.ai/docs/execution-providers/
         :type captcha_device: list
+        :param session_cache_ttl: Number of seconds a confirmed session is considered active without
+                                  querying is-session-alive again. Set to 0 to check before every request.
+        :type session_cache_ttl: float
+        :param session_state: The state of a previous session as returned by export_session. If it is
+                              still active, it is resumed instead of logging in again.
+        :type session_state: dict
+        :param timeouts: (connect, read) timeouts in seconds by endpoint class, overriding
+                         DEFAULT_TIMEOUTS for the given classes.
+        :type timeouts: dict
+        :param pool_size: Maximum number of connections kept open per host. Should match the number of
+                          concurrent requests. Ignored if a session is passed.
+        :type pool_size: int
         """
         self._user = username
         self._password = password
         self._captcha_verify_code = None
+        self._session_cache_ttl = session_cache_ttl
+        self._session_valid_until = 0.0
+        # single-flight login: only one thread logs in, all others reuse its result
+        self._login_lock = threading.RLock()
+        self._login_generation = 0
+        self._login_error = None
+        self._timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        # the deadline is set per thread, as concurrent refreshes share the client
+        self._deadline = threading.local()
+        # a session passed by the caller is also closed by the caller
+        self._owns_session = session is None
         if session is None:
             self._session = requests.Session()
+            mount_adapter(self._session, pool_size)
         else:
             self._session = session
         self._huawei_subdomain = huawei_subdomain
@@ -272,16 +955,21 @@ class FusionSolarClient:
 
         # Only login if no session has been provided. The session should hold the cookies for a logged in state
         if session is None:
-            self._configure_session()
+            if session_state is not None and self._restore_session(session_state):
+                _LOGGER.debug("Resumed stored session")
+            else:
+                self._configure_session()
+
+    def close(self) -> None:
+        """Closes the connection pools of the client. The server side session is
+        kept, so that it can be resumed later on using export_session. Call
+        log_out beforehand to end it."""
+        if self._owns_session:
+            self._session.close()
 
     def log_out(self):
         """Log out from the FusionSolarAPI"""
-        self._session.get(
-            url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/unisess/v1/logout",
-            params={
-                "service": f"https://{self._huawei_subdomain}.fusionsolar.huawei.com"
-            },
-        )
+        self._send(_logout_endpoint(self._huawei_subdomain))
 
     def _check_captcha(self):
         """Checks if the captcha is required for the login.
@@ -301,40 +989,33 @@ class FusionSolarClient:
 
         _LOGGER.debug("Checking if captcha is required")
 
-        url = f"https://{self._login_subdomain}.fusionsolar.huawei.com/"
-        params = {
-            "service": "%2Funisess%2Fv1%2Fauth%3Fservice%3D%252Fnetecowebext%252Fhome%252Findex.html",
-        }
-        r = self._session.get(url=url, params=params)
+        r = self._send(_captcha_page_endpoint(self._login_subdomain))
         r.raise_for_status()
         soup = bs4.BeautifulSoup(r.text, "html.parser")
         captcha_exists = soup.find(id="verificationCodeInput")
         if captcha_exists:
             captcha = self._get_captcha()
             self._init_solver()
-            self._captcha_verify_code = self._captcha_solver.solve_captcha(captcha)
-            r = self._session.post(
-                url=f"https://{self._login_subdomain}.fusionsolar.huawei.com/unisso/preValidVerifycode",
-                data={"verifycode": self._captcha_verify_code, "index": 0},
-            )
-            r.raise_for_status()
-            if r.text != "success":
-                raise AuthenticationException(
-                    "Login failed: captcha prevalidverify fail."
+            # try the next answer of the solver before downloading a new captcha
+            for verify_code in self._captcha_solver.solve_captcha_candidates(
+                captcha, CAPTCHA_CANDIDATES
+            ):
+                r = self._send(
+                    _verify_captcha_endpoint(self._login_subdomain, verify_code)
                 )
-            return True
+                r.raise_for_status()
+                if r.text == "success":
+                    self._captcha_verify_code = verify_code
+                    return True
+                _LOGGER.debug("Captcha answer rejected, trying the next one")
+            raise AuthenticationException("Login failed: captcha prevalidverify fail.")
         else:
             return False
 
     def _get_captcha(self):
-        url = (
-            f"https://{self._login_subdomain}.fusionsolar.huawei.com/unisso/verifycode"
-        )
-        params = {"timestamp": round(time.time() * 1000)}
-        r = self._session.get(url=url, params=params)
+        r = self._send(_captcha_endpoint(self._login_subdomain))
         r.raise_for_status()
-        image_buffer = r.content
-        return image_buffer
+        return r.content
 
     def _init_solver(self):
         if self._captcha_model_path is None:
@@ -344,16 +1025,14 @@ class FusionSolarClient:
         if self._captcha_solver is not None:
             return
 
-        from .captcha_solver_onnx import Solver
+        from .captcha_solver import get_solver
 
-        self._captcha_solver = Solver(self._captcha_model_path, self.captcha_device)
+        self._captcha_solver = get_solver(self._captcha_model_path, self.captcha_device)
 
     @with_solver
     def _login(self, allow_captcha_exception=True):
         # retrieve the public key in order to test which loging function to use
-        key_request = self._session.get(
-            "https://eu5.fusionsolar.huawei.com/unisso/pubkey"
-        )
+        key_request = self._send(_pubkey_endpoint())
 
         if key_request.status_code != 200:
             _LOGGER.error(
@@ -361,41 +1040,19 @@ class FusionSolarClient:
             )
             raise FusionSolarException("Failed to retrieve public key.")
 
-        key_data = key_request.json()
-
-        # find the correct login function
-        url = f"https://{self._login_subdomain}.fusionsolar.huawei.com/unisso/v2/validateUser.action"
-        url_params = {}
-        password = self._password
-
-        if key_data["enableEncrypt"]:
-            _LOGGER.debug("Using V3 loging function with encrypted passwords")
-            url = f"https://{self._login_subdomain}.fusionsolar.huawei.com/unisso/v3/validateUser.action"
-            url_params["timeStamp"] = key_data["timeStamp"]
-            url_params["nonce"] = get_secure_random()
-
-            # encrypt the password
-            password = encrypt_password(key_data=key_data, password=password)
-        else:
-            url_params["decision"] = 1
-            url_params["service"] = (
-                f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/unisess/v1/auth?service=/netecowebext/home/index.html#/LOGIN",
-            )
-
-        json_data = {
-            "organizationName": "",
-            "username": self._user,
-            "password": password,
-        }
-
-        # add the verify code if it was set
-        if self._captcha_verify_code:
-            json_data["verifycode"] = self._captcha_verify_code
-            # invalidate verify code after use
-            self._captcha_verify_code = None
+        endpoint = _login_endpoint(
+            self._login_subdomain,
+            self._huawei_subdomain,
+            self._user,
+            self._password,
+            key_request.json(),
+            self._captcha_verify_code,
+        )
+        # invalidate verify code after use
+        self._captcha_verify_code = None
 
         # send the request
-        r = self._session.post(url=url, params=url_params, json=json_data)
+        r = self._send(endpoint)
         r.raise_for_status()
 
         try:
@@ -405,44 +1062,67 @@ class FusionSolarClient:
             _LOGGER.exception(e)
             raise FusionSolarException("Failed to process login response")
 
-        # in the new login procedure, an errorCode 470 is pointing to a success
-        # but requires another request to start the session
-        if login_response["errorCode"] == "470":
+        target_url = _login_redirect_url(self._login_subdomain, login_response)
+        if target_url is not None:
             _LOGGER.debug("New loging procedure successful, sending additional request")
-            target_subdomain = login_response["respMultiRegionName"][1]
-            target_url = f"https://{self._login_subdomain}.fusionsolar.huawei.com{target_subdomain}"
-            new_procedure_response = self._session.get(target_url)
+            new_procedure_response = self._session.get(
+                target_url, timeout=self._timeout(TIMEOUT_LOGIN)
+            )
             new_procedure_response.raise_for_status()
 
-        # make sure that the login worked - NOTE: This may no longer work with the new procedure
-        error = None
-        if login_response["errorMsg"]:
-            error = login_response["errorMsg"]
-
-        if error:
-            # only attempt to solve the captcha if it hasn't been tried before and
-            # a model path is available
-            if (
-                "incorrect verification code" in error.lower()
-                and allow_captcha_exception
-                and self._captcha_model_path
-            ):
-                raise CaptchaRequiredException(
-                    "Login failed: Incorrect verification code."
-                )
-            raise AuthenticationException(
-                f"Failed to login into FusionSolarAPI: {error}"
-            )
+        # only attempt to solve the captcha if it hasn't been tried before and
+        # a model path is available
+        _check_login_response(
+            login_response,
+            captcha_allowed=allow_captcha_exception and bool(self._captcha_model_path),
+        )
+
+    @property
+    def login_generation(self) -> int:
+        """The number of login attempts performed by relogin. Pass the value observed
+        before a failed request to relogin to collapse concurrent re-logins.
+
+        :rtype: int
+        """
+        return self._login_generation
+
+    def relogin(self, login_generation: Optional[int] = None) -> None:
+        """Resets the session and logs in again. Concurrent callers are collapsed
+        into a single login: while one thread logs in, all others wait and then
+        reuse its result, including a failed login.
+
+        :param login_generation: The login generation the caller observed before
+                                 detecting the expired session. If another login
+                                 finished in the meantime, no new login is started.
+        :type login_generation: int
+        """
+        if login_generation is None:
+            login_generation = self._login_generation
+
+        with self._login_lock:
+            if self._login_generation != login_generation:
+                _LOGGER.debug("Session was already renewed by a concurrent login")
+                if self._login_error is not None:
+                    raise self._login_error
+                return
+
+            try:
+                self._reset_session()
+                self._configure_session()
+                self._login_error = None
+            except Exception as e:
+                self._login_error = e
+                raise
+            finally:
+                self._login_generation += 1
 
     def _configure_session(self):
         """Logs into the Fusion Solar API. Raises an exception if the login fails."""
         # check the login credentials right away
         _LOGGER.debug("Logging into Huawei Fusion Solar API")
 
-        # set the user agent
-        self._session.headers["User-Agent"] = (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-        )
+        # set the user agent and the accepted encodings
+        self._set_default_headers()
 
         self._login()
 
@@ -455,61 +1135,94 @@ class FusionSolarClient:
             )
 
         # get the main id
-        r = self._session.get(
-            url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/neteco/web/organization/v2/company/current",
-            params={"_": round(time.time() * 1000)},
-        )
-
-        # the new API returns a 500 exception if the subdomain is incorrect
+        r = self._send(_company_endpoint(self._huawei_subdomain))
         if r.status_code == 500:
-            try:
-                data = r.json()
-
-                if (
-                    data["exceptionId"] == "Query company failed."
-                    or data["exceptionId"] == "bad status"
-                ):
-                    raise AuthenticationException(
-                        "Invalid response received. Please check the correct Huawei subdomain."
-                    )
-            except json.JSONDecodeError as e:
-                _LOGGER.error("Login validation failed. Failed to process response.")
-                _LOGGER.exception(e)
-                raise AuthenticationException("Failed to log into FusionSolarAPI.")
+            _check_company_error(r.content.decode())
+        r.raise_for_status()
+        self._company_id = _parse_company_id(r.content.decode())
 
+        # get the roarand, needed for post requests, otherwise they return 401
+        endpoint = _session_token_endpoint(self._huawei_subdomain)
+        r = self._send(endpoint)
         r.raise_for_status()
+        try:
+            roarand = endpoint.parse(r.json())
+        except json.JSONDecodeError:
+            roarand = None
+        if roarand is not None:
+            self._session.headers["roarand"] = roarand
 
-        # catch an incorrect subdomain
-        response_text = r.content.decode()
+    def export_session(self) -> dict:
+        """Exports everything required to resume the current session later on
+        without logging in again.
 
-        if not response_text.strip().startswith('{"data":'):
-            raise AuthenticationException(
-                "Invalid response received. Please check the correct Huawei subdomain."
-            )
+        :return: The cookies, the roarand token and the company id of the session
+        :rtype: dict
+        """
+        return {
+            "cookies": [
+                {
+                    "name": cookie.name,
+                    "value": cookie.value,
+                    "domain": cookie.domain,
+                    "path": cookie.path,
+                    "secure": cookie.secure,
+                    "expires": cookie.expires,
+                }
+                for cookie in self._session.cookies
+            ],
+            "roarand": self._session.headers.get("roarand"),
+            "company_id": self._company_id,
+        }
 
-        response_data = r.json()
+    def _restore_session(self, session_state: dict) -> bool:
+        """Loads a session exported by export_session into the current session
+        and checks whether it is still active.
 
-        if "data" not in response_data:
-            _LOGGER.error(
-                f"Failed to retrieve data object. {json.dumps(response_data)}"
-            )
-            raise AuthenticationException("Failed to login into FusionSolarAPI.")
-
-        self._company_id = r.json()["data"]["moDn"]
+        :param session_state: The state returned by export_session
+        :type session_state: dict
+        :return: True if the restored session is active
+        :rtype: bool
+        """
+        if not session_state.get("company_id") or not session_state.get("cookies"):
+            return False
 
-        # get the roarand, which is needed for non-GET requests, thus to change device settings
-        r = self._session.get(
-            url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/unisess/v1/auth/session"
-        )
-        r.raise_for_status()
+        self._set_default_headers()
+        for cookie in session_state["cookies"]:
+            self._session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+                secure=cookie.get("secure", False),
+                expires=cookie.get("expires"),
+            )
+        if session_state.get("roarand"):
+            self._session.headers["roarand"] = session_state["roarand"]
+        self._company_id = session_state["company_id"]
 
         try:
-            self._session.headers["roarand"] = r.json()[
-                "csrfToken"
-            ]  # needed for post requests, otherwise it will return 401
-        except Exception:
-            # this currently does not work in the new login procedure
-            pass
+            if self.is_session_active():
+                return True
+        except (requests.RequestException, FusionSolarException) as e:
+            _LOGGER.debug("Failed to validate stored session: %s", e)
+
+        # start from a clean session for the regular login
+        self._reset_session()
+        return False
+
+    def _set_default_headers(self) -> None:
+        """Sets the headers sent with every request of the session."""
+        self._session.headers["User-Agent"] = USER_AGENT
+        self._session.headers["Accept-Encoding"] = ACCEPT_ENCODING_HEADER
+
+    def _reset_session(self) -> None:
+        """Drops the cookies and headers of the current session. Its connection
+        pools are kept, so that a new login reuses the open connections."""
+        self._session.cookies.clear()
+        self._session.headers.clear()
+        self._session.headers.update(requests.utils.default_headers())
+        self._company_id = None
 
     def is_session_active(self) -> bool:
         """Tests whether the current session is active. In the web-based application, this
@@ -519,21 +1232,108 @@ class FusionSolarClient:
         :rtype: bool
         """
         if not self._session:
+            self._invalidate_session_cache()
             return False
 
         # send the request
-        r = self._session.get(
-            f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/dpcloud/auth/v1/is-session-alive"
+        endpoint = _session_alive_endpoint(self._huawei_subdomain)
+        r = self._send(endpoint)
+        if r.status_code == 401:
+            self._invalidate_session_cache()
+            return False
+        _raise_for_status(r)
+
+        # get the response - an expired session may return the HTML login page
+        try:
+            active = endpoint.parse(r.json())
+        except json.JSONDecodeError:
+            active = False
+
+        if active:
+            self._mark_session_active()
+        else:
+            self._invalidate_session_cache()
+        return active
+
+    @contextmanager
+    def deadline(self, expires_at: Optional[float]):
+        """Limits all requests issued by the current thread within the context,
+        including a re-login, to finish before the given deadline. Requests started
+        after the deadline fail right away with a RequestTimeoutException.
+
+        :param expires_at: The deadline as time.monotonic() value, None for no deadline
+        :type expires_at: float
+        """
+        previous = getattr(self._deadline, "expires_at", None)
+        self._deadline.expires_at = expires_at
+        try:
+            yield
+        finally:
+            self._deadline.expires_at = previous
+
+    def _timeout(self, endpoint_class: str) -> tuple:
+        """Returns the (connect, read) timeout of a request to the given endpoint
+        class, shortened to the remaining time of the current deadline.
+
+        :param endpoint_class: One of the TIMEOUT_* endpoint classes
+        :type endpoint_class: str
+        :return: The timeout to pass to requests
+        :rtype: tuple
+        """
+        connect_timeout, read_timeout = self._timeouts[endpoint_class]
+        expires_at = getattr(self._deadline, "expires_at", None)
+        if expires_at is None:
+            return connect_timeout, read_timeout
+
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            raise RequestTimeoutException("Deadline of the refresh exceeded.")
+        return min(connect_timeout, remaining), min(read_timeout, remaining)
+
+    def _send(self, endpoint: Endpoint) -> requests.Response:
+        """Sends the request of an endpoint with the session"""
+        return self._session.request(
+            endpoint.method,
+            endpoint.url,
+            params=endpoint.params,
+            json=endpoint.json,
+            data=endpoint.data,
+            timeout=self._timeout(endpoint.timeout_class),
         )
-        r.raise_for_status()
 
-        # get the response
-        response_data = r.json()
+    def _fetch(self, endpoint: Endpoint) -> Any:
+        """Sends the request of an endpoint and returns its parsed response.
 
-        if "code" not in response_data or response_data["code"] != 0:
-            return False
+        Decoding errors are raised as is, they mean that the session expired and
+        are handled by @logged_in.
+        """
+        if endpoint.fake_response is not None and ENABLE_FAKE_BATTERY:
+            response = _load_fake_response(endpoint.fake_response)
         else:
-            return True
+            r = self._send(endpoint)
+            _raise_for_status(r)
+            if endpoint.parse is None:
+                return None
+            response = r.json(parse_float=endpoint.parse_float)
+
+        with _unexpected_response():
+            return endpoint.parse(response)
+
+    def _is_session_cached(self) -> bool:
+        """Tests whether the session was confirmed to be active within the cache TTL.
+
+        :return: True if no is-session-alive check is required
+        :rtype: bool
+        """
+        return time.monotonic() < self._session_valid_until
+
+    def _mark_session_active(self) -> None:
+        """Marks the current session as active for the configured cache TTL."""
+        self._session_valid_until = time.monotonic() + self._session_cache_ttl
+
+    def _invalidate_session_cache(self) -> None:
+        """Forces the next request to check whether the session is still active."""
+        self._session_valid_until = 0.0
 
     @logged_in
     def keep_alive(self) -> str:
@@ -544,23 +1344,11 @@ class FusionSolarClient:
         :return: This function returns the payload returned by the respective call
         :rtype: str
         """
-        r = self._session.get(
-            f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/dpcloud/auth/v1/keep-alive"
-        )
-        r.raise_for_status()
-
-        response_data = r.json()
-
-        if "code" not in response_data or response_data["code"] != 0:
-            raise FusionSolarException("Failed to set keep alive.")
-
-        # get the payload
-        if "payload" in response_data:
+        payload = self._fetch(_keep_alive_endpoint(self._huawei_subdomain))
+        if payload is not None:
             # save the payload as a session header
-            self._session.headers["roarand"] = response_data["payload"]
-            return response_data["payload"]
-
-        return None
+            self._session.headers["roarand"] = payload
+        return payload
 
     @logged_in
     def get_power_status(self) -> PowerStatus:
@@ -568,54 +1356,16 @@ class FusionSolarClient:
            summary accross all stations.
         :return: The current status as a PowerStatus object
         """
-
-        url = f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/station/total-real-kpi"
-        params = {
-            "queryTime": round(time.time() * 1000),
-            "timeZone": 1,
-            "_": round(time.time() * 1000),
-        }
-
-        r = self._session.get(url=url, params=params)
-        r.raise_for_status()
-
-        # errors in decoding the object generally mean that the login expired
-        # this is handeled by @logged_in
-        power_obj = r.json()
-
-        power_status = PowerStatus(
-            current_power_kw=float(power_obj["data"]["currentPower"]),
-            energy_today_kwh=float(power_obj["data"]["dailyEnergy"]),
-            energy_kwh=float(power_obj["data"]["cumulativeEnergy"]),
-        )
-
-        return power_status
+        return self._fetch(_power_status_endpoint(self._huawei_subdomain))
 
     @logged_in
     def get_current_plant_data(self, plant_id: str) -> dict:
         """Retrieve the current power status for a specific plant.
         :return: A dict object containing the whole data
         """
-
-        url = f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/overview/station-real-kpi"
-        params = {
-            "stationDn": plant_id,
-            "clientTime": round(time.time() * 1000),
-            "timeZone": 1,
-            "_": round(time.time() * 1000),
-        }
-
-        r = self._session.get(url=url, params=params)
-        r.raise_for_status()
-
-        # errors in decoding the object generally mean that the login expired
-        # this is handeled by @logged_in
-        power_obj = r.json()
-
-        if "data" not in power_obj:
-            raise FusionSolarException("Failed to retrieve plant data.")
-
-        return power_obj["data"]
+        return self._fetch(
+            _current_plant_data_endpoint(self._huawei_subdomain, plant_id)
+        )
 
     @logged_in
     def get_plant_ids(self) -> list:
@@ -624,13 +1374,7 @@ class FusionSolarClient:
         :return: A list of plant ids (strings)
         :rtype: list
         """
-        # get the complete object tree
-        station_list = self.get_station_list()
-
-        # get the ids
-        plant_ids = [obj["dn"] for obj in station_list]
-
-        return plant_ids
+        return _parse_plant_ids(self.get_station_list())
 
     @logged_in
     def get_station_list(self) -> list:
@@ -639,55 +1383,24 @@ class FusionSolarClient:
         :return: _description_
         :rtype: list
         """
-        # get the complete list
-        r = self._session.post(
-            url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/station/station-list",
-            json={
-                "curPage": 1,
-                "pageSize": 10,
-                "gridConnectedTime": "",
-                "queryTime": self._get_day_start_sec(),
-                "timeZone": 2,
-                "sortId": "createTime",
-                "sortDir": "DESC",
-                "locale": "en_US",
-            },
+        return self._fetch(
+            _station_list_endpoint(self._huawei_subdomain, self._get_day_start_sec())
         )
-        r.raise_for_status()
-
-        obj_tree = r.json()
-
-        if not obj_tree["success"]:
-            raise FusionSolarException("Failed to retrieve station list")
-
-        # simply return the original object list
-        return obj_tree["data"]["list"]
 
     @logged_in
     def get_device_ids(self) -> list:
         """gets the devices associated to a given parent_id (can be a plant or a company/account)
         returns a dictionary mapping device_type to device_id"""
-        url = f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/neteco/web/config/device/v1/device-list"
-        params = {
-            "conditionParams.parentDn": self._company_id,  # can be a plant or company id
-            "conditionParams.mocTypes": "20814,20815,20816,20819,20822,50017,60066,60014,60015,23037",  # specifies the types of devices
-            "_": round(time.time() * 1000),
-        }
-        r = self._session.get(url=url, params=params)
-        r.raise_for_status()
-        device_data = r.json()
-
-        devices = []
-        for device in device_data["data"]:
-            devices += [dict(type=device["mocTypeName"], deviceDn=device["dn"])]
-        return devices
+        return self._fetch(
+            _device_ids_endpoint(self._huawei_subdomain, self._company_id)
+        )
 
     @logged_in
     def get_historical_data(
         self,
         signal_ids: list[str] = ["30014", "30016", "30017"],
         device_dn: str = None,
-        date: datetime = datetime.now(),
+        date: datetime = None,
     ) -> dict:
         """retrieves historical data for specified signals and device
         possible signal_ids:
@@ -698,21 +1411,11 @@ class FusionSolarClient:
         :return: historical data for requested signals and device
         :rtype: dict
         """
-
-        url = f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/device-history-data"
-        params = ()
-        for signal_id in signal_ids:
-            params += (("signalIds", signal_id),)
-
-        params += (
-            ("deviceDn", device_dn),  #
-            ("date", int(date.timestamp() * 1000)),
-            ("_", round(time.time() * 1000)),
+        return self._fetch(
+            _historical_data_endpoint(
+                self._huawei_subdomain, signal_ids, device_dn, date
+            )
         )
-        r = self._session.get(url=url, params=params)
-        r.raise_for_status()
-
-        return r.json(parse_float=_parse_float)
 
     @logged_in
     def get_real_time_data(self, device_dn: str = None) -> dict:
@@ -722,16 +1425,7 @@ class FusionSolarClient:
         :rtype: dict
 
         """
-
-        url = f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/device-realtime-data"
-        params = (
-            ("deviceDn", device_dn),  #
-            ("_", round(time.time() * 1000)),
-        )
-        r = self._session.get(url=url, params=params)
-        r.raise_for_status()
-
-        return r.json()
+        return self._fetch(_real_time_data_endpoint(self._huawei_subdomain, device_dn))
 
     @logged_in
     def get_alarm_data(self, device_dn: str = None) -> dict:
@@ -740,19 +1434,7 @@ class FusionSolarClient:
         :rtype: dict
         https://uni004eu5.fusionsolar.huawei.com/rest/pvms/fm/v1/query
         """
-
-        url = f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/fm/v1/query"
-        request_data = {
-            "dataType": "CURRENT",
-            "domainType": "OC_SOLAR",
-            "pageNo": 1,
-            "pageSize": 10,
-            "nativeMeDn": device_dn,
-        }
-        r = self._session.post(url=url, json=request_data)
-        r.raise_for_status()
-
-        return r.json()
+        return self._fetch(_alarm_data_endpoint(self._huawei_subdomain, device_dn))
 
     @logged_in
     def get_battery_ids(self, plant_id) -> list:
@@ -760,28 +1442,7 @@ class FusionSolarClient:
         :return: A list of battery ids (strings)
         :rtype: list
         """
-        plant_flow = self.get_plant_flow(plant_id)
-        nodes = plant_flow["data"]["flow"]["nodes"]
-        battery_ids = []
-
-        # for node in nodes:
-        #     if "energy_store" in node["name"]:
-        #         battery_ids.append(node["devIds"][0])
-
-        for node in nodes:
-            name = node.get("name", "")
-            dev_ids = node.get("devIds")
-            logging.debug("Processing node: name=%r devIds=%r", name, dev_ids)
-            if "energy_store" in name:
-                if isinstance(dev_ids, list) and dev_ids:
-                    battery_ids.append(dev_ids[0])
-                else:
-                    logging.warning(
-                        "Node with 'energy_store' in name but devIds is not a non-empty list: %r",
-                        node,
-                    )
-
-        return battery_ids
+        return _parse_battery_ids(self.get_plant_flow(plant_id))
 
     @logged_in
     def get_battery_basic_stats(self, battery_id: str) -> BatteryStatus:
@@ -790,25 +1451,7 @@ class FusionSolarClient:
         :type battery_id: str
         :return: The basic stats as a BatteryStatus object
         """
-        battery_stats = self.get_battery_status(battery_id)
-
-        # ensure that all values are numeric
-        for index in (2, 4, 5, 6, 7, 8):
-            if "-" in battery_stats[index]["realValue"]:
-                battery_stats[index]["realValue"] = 0
-
-        battery_status = BatteryStatus(
-            state_of_charge=float(battery_stats[8]["realValue"]),
-            rated_capacity=float(battery_stats[2]["realValue"]),
-            operating_status=battery_stats[0]["value"],
-            backup_time=battery_stats[3]["value"],
-            bus_voltage=float(battery_stats[7]["realValue"]),
-            total_charged_today_kwh=float(battery_stats[4]["realValue"]),
-            total_discharged_today_kwh=float(battery_stats[5]["realValue"]),
-            current_charge_discharge_kw=float(battery_stats[6]["realValue"]),
-        )
-
-        return battery_status
+        return _parse_battery_basic_stats(self.get_battery_status(battery_id))
 
     @logged_in
     def get_battery_day_stats(self, battery_id: str, query_time: int = None) -> dict:
@@ -822,33 +1465,9 @@ class FusionSolarClient:
         :type query_time: int
         :return: The complete data structure as a dict
         """
-        current_time = round(time.time() * 1000)
-        if query_time is not None:
-            current_time = query_time
-        r = self._session.get(
-            url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/device-history-data",
-            params={
-                "signalIds": [
-                    "30005",
-                    "30007",
-                ],  # 30005 is Charge/Discharge power, 30007 is SOC, state of charge in %
-                "deviceDn": battery_id,
-                "date": current_time,
-                "_": current_time,
-            },
+        return self._fetch(
+            _battery_day_stats_endpoint(self._huawei_subdomain, battery_id, query_time)
         )
-        r.raise_for_status()
-        battery_data = r.json()
-
-        if not battery_data["success"] or "data" not in battery_data:
-            raise FusionSolarException(
-                f"Failed to retrieve battery day stats for {battery_id}"
-            )
-
-        battery_data["data"]["30005"]["name"] = "Charge/Discharge power"
-        battery_data["data"]["30007"]["name"] = "SOC"
-
-        return battery_data["data"]
 
     @logged_in
     def get_battery_module_stats(
@@ -864,57 +1483,11 @@ class FusionSolarClient:
         :type signal_ids: list
         :return: The complete data structure as a dict
         """
-
-        if ENABLE_FAKE_BATTERY:
-            if module_id == "1":
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-                json_path = os.path.join(base_dir, "battery_module_1.json")
-                with open(json_path) as f:
-                    battery_module = json.load(f)
-                return battery_module["data"]
-            elif module_id == "2":
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-                json_path = os.path.join(base_dir, "battery_module_2.json")
-                with open(json_path) as f:
-                    battery_module = json.load(f)
-                return battery_module["data"]
-            else:
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-                json_path = os.path.join(base_dir, "battery_module_empty.json")
-                with open(json_path) as f:
-                    battery_module = json.load(f)
-                return battery_module["data"]
-        else:
-            if signal_ids is None:
-                signal_ids = MODULE_SIGNALS[module_id]
-            else:
-                if not all(
-                    signal_id in MODULE_SIGNALS[module_id] for signal_id in signal_ids
-                ):
-                    raise ValueError(
-                        f"One or more unknown signal ids for module {module_id}"
-                    )
-
-            signal_ids = ",".join(signal_ids)
-
-            r = self._session.get(
-                url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/query-battery-dc",
-                params={
-                    "sigids": signal_ids,
-                    "dn": battery_id,
-                    "moduleId": module_id,
-                    "_": round(time.time() * 1000),
-                },
+        return self._fetch(
+            _battery_module_stats_endpoint(
+                self._huawei_subdomain, battery_id, module_id, signal_ids
             )
-            r.raise_for_status()
-            battery_data = r.json()
-
-            if not battery_data["success"] or "data" not in battery_data:
-                raise FusionSolarException(
-                    f"Failed to retrieve battery status for {battery_id}"
-                )
-
-            return battery_data["data"]
+        )
 
     @logged_in
     def get_battery_status(self, battery_id: str) -> dict:
@@ -924,30 +1497,7 @@ class FusionSolarClient:
         :type battery_id: str
         :return: The current status as a dict
         """
-        if ENABLE_FAKE_BATTERY:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            json_path = os.path.join(base_dir, "battery_status.json")
-            with open(json_path) as f:
-                battery_status = json.load(f)
-            return battery_status["data"][1]["signals"]
-        else:
-            r = self._session.get(
-                url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/device-realtime-data",
-                params={
-                    "deviceDn": battery_id,
-                    "_": round(time.time() * 1000),
-                },
-            )
-
-            r.raise_for_status()
-            battery_data = r.json()
-
-            if not battery_data["success"] or "data" not in battery_data:
-                raise FusionSolarException(
-                    f"Failed to retrieve battery status for {battery_id}"
-                )
-
-            return battery_data["data"][1]["signals"]
+        return self._fetch(_battery_status_endpoint(self._huawei_subdomain, battery_id))
 
     @logged_in
     def active_power_control(self, power_setting) -> None:
@@ -955,27 +1505,13 @@ class FusionSolarClient:
         This can be usefull when electrity prices are
         negative (sunny summer holiday) and you want
         to limit the power that is exported into the grid"""
-        power_setting_options = {
-            "No limit": 0,
-            "Zero Export Limitation": 5,
-            "Limited Power Grid (kW)": 6,
-            "Limited Power Grid (%)": 7,
-        }
-        if power_setting not in power_setting_options:
-            raise ValueError("Unknown power setting")
-
+        _check_power_setting(power_setting)
         device_ids = self.get_device_ids()
-        dongle_id = list(filter(lambda e: e["type"] == "Dongle", device_ids))[0]["id"]
-
-        url = f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/device/v1/deviceExt/set-config-signals"
-        data = {
-            "dn": dongle_id,  # power control needs to be done in the dongle
-            # 230190032 stands for "Active Power Control"
-            "changeValues": f'[{{"id":"230190032","value":"{power_setting_options[power_setting]}"}}]',
-        }
-
-        r = self._session.post(url, data=data)
-        r.raise_for_status()
+        self._fetch(
+            _active_power_control_endpoint(
+                self._huawei_subdomain, device_ids, power_setting
+            )
+        )
 
     @logged_in
     def get_plant_flow(self, plant_id: str) -> dict:
@@ -985,29 +1521,7 @@ class FusionSolarClient:
         :type plant_id: str
         :return: The complete data structure as a dict
         """
-
-        if ENABLE_FAKE_BATTERY:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            json_path = os.path.join(base_dir, "flow.json")
-            with open(json_path) as f:
-                plantflow = json.load(f)
-            return plantflow
-        else:
-            # https://region01eu5.fusionsolar.huawei.com/rest/pvms/web/station/v1/overview/energy-flow?stationDn=NE%3D33594051&_=1652469979488
-            r = self._session.get(
-                url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/overview/energy-flow",
-                params={"stationDn": plant_id, "_": round(time.time() * 1000)},
-            )
-
-            r.raise_for_status()
-            flow_data = r.json()
-
-            if not flow_data["success"] or "data" not in flow_data:
-                raise FusionSolarException(
-                    f"Failed to retrieve plant flow for {plant_id}"
-                )
-
-            return flow_data
+        return self._fetch(_plant_flow_endpoint(self._huawei_subdomain, plant_id))
 
     @logged_in
     def get_plant_stats(self, plant_id: str, query_time: int = None) -> dict:
@@ -1024,28 +1538,9 @@ class FusionSolarClient:
         if not query_time:
             query_time = self._get_day_start_sec()
 
-        r = self._session.get(
-            url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/overview/energy-balance",
-            params={
-                "stationDn": plant_id,
-                "timeDim": 2,
-                "queryTime": query_time,  # TODO: this may have changed to micro-seconds ie. timestamp * 1000
-                # dateTime=2024-03-07 00:00:00
-                "timeZone": 2,  # 1 in no daylight
-                "timeZoneStr": "Europe/Vienna",
-                "_": round(time.time() * 1000),
-            },
+        return self._fetch(
+            _plant_stats_endpoint(self._huawei_subdomain, plant_id, query_time)
         )
-        r.raise_for_status()
-        plant_data = r.json()
-
-        if not plant_data["success"] or "data" not in plant_data:
-            raise FusionSolarException(
-                f"Failed to retrieve plant status for {plant_id}"
-            )
-
-        # return the plant data
-        return plant_data["data"]
 
     def get_last_plant_data(self, plant_data: dict) -> dict:
         """Extracts the last measurements from the plant data
@@ -1145,26 +1640,6 @@ class FusionSolarClient:
         :type plant_id: str
         :return: _description_
         """
-        r = self._session.get(
-            url=f"https://{self._huawei_subdomain}.fusionsolar.huawei.com/rest/pvms/web/station/v1/layout/optimizer-info",
-            params={
-                "inverterDn": inverter_id,
-                "_": round(time.time() * 1000),
-            },
+        return self._fetch(
+            _optimizer_stats_endpoint(self._huawei_subdomain, inverter_id)
         )
-        r.raise_for_status()
-        optimizer_data = r.json()
-
-        # check for an error - this seems to happen if no optimizer is present
-        if "exceptionType" in optimizer_data:
-            raise FusionSolarException(
-                f"Failed to retrieve optimizer status for {inverter_id}"
-            )
-
-        if not optimizer_data["success"] or "data" not in optimizer_data:
-            raise FusionSolarException(
-                f"Failed to retrieve plant status for {inverter_id}"
-            )
-
-        # return the plant data
-        return optimizer_data["data"]
@@ -1,17 +1,16 @@
 """
-Author: Awni Hannun
-This is an example CTC decoder written in Python. The code is
-intended to be a simple example and is not designed to be
-especially efficient.
+CTC prefix beam search, based on the example decoder by Awni Hannun.
 The algorithm is a prefix beam search for a model trained
 with the CTC loss function.
 For more details checkout either of these references:
   https://distill.pub/2017/ctc/#inference
   https://arxiv.org/abs/1408.2873
-"""
 
-import math
-import collections
+All prefixes of the beam are advanced together as numpy arrays, so each time
+step costs a handful of array operations instead of a Python loop over
+vocab x beam. The beams of several samples are advanced together as well.
+Confident outputs skip the beam search through a greedy path.
+"""
 
 try:
     import numpy as np
@@ -22,23 +21,29 @@ except ImportError:
 
 NEG_INF = -float("inf")
 
+# if every time step has a label above this probability, other paths carry
+# too little probability to change the result and the best path is returned
+GREEDY_THRESHOLD = 0.999
 
-def make_new_beam():
-    def fn():
-        return (NEG_INF, NEG_INF)
+# labels below this probability are not used to extend prefixes at a time step
+PRUNE_THRESHOLD = 1e-3
 
-    return collections.defaultdict(fn)
+# multiplier of the rolling hash identifying prefixes
+_HASH_BASE = 1000003
 
 
-def logsumexp(*args):
+def greedy_decode(probs, blank=0):
     """
-    Stable log sum exp.
+    Returns the best path: the most likely label of every time step with
+    repeats merged and blanks removed, and its negative log-likelihood.
     """
-    if all(a == NEG_INF for a in args):
-        return NEG_INF
-    a_max = max(args)
-    lsp = math.log(sum(math.exp(a - a_max) for a in args))
-    return a_max + lsp
+    best = probs.argmax(axis=1)
+    with np.errstate(divide="ignore"):
+        score = -np.log(probs[np.arange(len(best)), best]).sum()
+    keep = np.ones(len(best), dtype=bool)
+    keep[1:] = best[1:] != best[:-1]
+    keep &= best != blank
+    return tuple(best[keep].tolist()), float(score)
 
 
 def decode(probs, beam_size=100, blank=0):
@@ -52,65 +57,175 @@ def decode(probs, beam_size=100, blank=0):
     Returns the output label sequence and the corresponding negative
     log-likelihood estimated by the decoder.
     """
-    T, S = probs.shape
-    probs = np.log(probs)
-
-    # Elements in the beam are (prefix, (p_blank, p_no_blank))
-    # Initialize the beam with the empty sequence, a probability of
-    # 1 for ending in blank and zero for ending in non-blank
-    # (in log space).
-    beam = [(tuple(), (0.0, NEG_INF))]
-
-    for t in range(T):  # Loop over time
-        # A default dictionary to store the next step candidates.
-        next_beam = make_new_beam()
-
-        for s in range(S):  # Loop over vocab
-            p = probs[t, s]
-
-            # The variables p_b and p_nb are respectively the
-            # probabilities for the prefix given that it ends in a
-            # blank and does not end in a blank at this time step.
-            for prefix, (p_b, p_nb) in beam:  # Loop over beam
-                # If we propose a blank the prefix doesn't change.
-                # Only the probability of ending in blank gets updated.
-                if s == blank:
-                    n_p_b, n_p_nb = next_beam[prefix]
-                    n_p_b = logsumexp(n_p_b, p_b + p, p_nb + p)
-                    next_beam[prefix] = (n_p_b, n_p_nb)
-                    continue
-
-                # Extend the prefix by the new character s and add it to
-                # the beam. Only the probability of not ending in blank
-                # gets updated.
-                end_t = prefix[-1] if prefix else None
-                n_prefix = prefix + (s,)
-                n_p_b, n_p_nb = next_beam[n_prefix]
-                if s != end_t:
-                    n_p_nb = logsumexp(n_p_nb, p_b + p, p_nb + p)
-                else:
-                    # We don't include the previous probability of not ending
-                    # in blank (p_nb) if s is repeated at the end. The CTC
-                    # algorithm merges characters not separated by a blank.
-                    n_p_nb = logsumexp(n_p_nb, p_b + p)
-
-                # *NB* this would be a good place to include an LM score.
-                next_beam[n_prefix] = (n_p_b, n_p_nb)
-
-                # If s is repeated at the end we also update the unchanged
-                # prefix. This is the merging case.
-                if s == end_t:
-                    n_p_b, n_p_nb = next_beam[prefix]
-                    n_p_nb = logsumexp(n_p_nb, p_nb + p)
-                    next_beam[prefix] = (n_p_b, n_p_nb)
-
-        # Sort and trim the beam before moving on to the
-        # next time-step.
-        beam = sorted(next_beam.items(), key=lambda x: logsumexp(*x[1]), reverse=True)
-        beam = beam[:beam_size]
-
-    best = beam[0]
-    return best[0], -logsumexp(*best[1])
+    return decode_batch([probs], beam_size=beam_size, blank=blank)[0][0]
+
+
+def decode_batch(probs, beam_size=100, blank=0, top_k=1):
+    """
+    Performs inference for the output probabilities of several samples at
+    once.
+    Arguments:
+        probs: The output probabilities of each sample. Should be an array
+          of shape (batch x time x output dim) or a list of arrays of shape
+          (time x output dim), all with the same number of time steps.
+        beam_size (int): Size of the beam of each sample.
+        blank (int): Index of the CTC blank label.
+        top_k (int): Number of hypotheses to return per sample.
+    Returns per sample a list of up to top_k (output label sequence,
+    negative log-likelihood) tuples, the most likely first. Samples with a
+    label above GREEDY_THRESHOLD at every time step take the greedy path and
+    return only the best path, even if top_k is larger.
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    N, T, S = probs.shape
+    if T == 0:
+        return [[(tuple(), 0.0)] for _ in range(N)]
+
+    results = [None] * N
+    confident = probs.max(axis=2).min(axis=1) >= GREEDY_THRESHOLD
+    for i in np.flatnonzero(confident):
+        results[i] = [greedy_decode(probs[i], blank)]
+
+    uncertain = np.flatnonzero(~confident)
+    if len(uncertain):
+        with np.errstate(divide="ignore"):
+            log_probs = np.log(probs[uncertain])
+        hypotheses = _beam_search(log_probs, beam_size, blank, top_k)
+        for i, sample_hypotheses in zip(uncertain, hypotheses):
+            results[i] = sample_hypotheses
+    return results
+
+
+def _beam_search(log_probs, beam_size, blank, top_k):
+    """
+    Prefix beam search over the log probabilities of shape
+    (batch x time x output dim), see decode_batch.
+    """
+    N, T, S = log_probs.shape
+
+    # labels each time step may extend the prefixes with, at most beam_size
+    extend = log_probs >= np.log(PRUNE_THRESHOLD)
+    extend[:, :, blank] = False
+    if S - 1 > beam_size:
+        kth = np.partition(np.where(extend, log_probs, NEG_INF), S - beam_size, axis=2)[
+            :, :, S - beam_size, np.newaxis
+        ]
+        extend &= log_probs >= kth
+    has_extension = extend.any(axis=(0, 2)).tolist()
+
+    # The beam holds, per prefix, its sample, its labels (padded to T), its
+    # length, its last label (-1 when empty) and the log probabilities of
+    # ending in blank and in non-blank.
+    # Initialize the beam of every sample with the empty sequence, a
+    # probability of 1 for ending in blank and zero for ending in non-blank.
+    batch = np.arange(N)
+    prefixes = np.zeros((N, T), dtype=np.int64)
+    lengths = np.zeros(N, dtype=np.int64)
+    last = np.full(N, -1, dtype=np.int64)
+    p_b = np.zeros(N)
+    p_nb = np.full(N, NEG_INF)
+    # Prefixes are identified by a rolling hash of their labels. The hash of
+    # the prefix without its last label finds the prefixes an extension can
+    # merge into.
+    hashes = np.zeros(N, dtype=np.uint64)
+    parent_hashes = np.full(N, np.iinfo(np.uint64).max, dtype=np.uint64)
+    hash_base = np.uint64(_HASH_BASE)
+    # column of the candidates extended by a label, 0 if it doesn't extend
+    column_of = np.zeros(S + 1, dtype=np.int64)
+
+    for t in range(T):
+        lp = log_probs[:, t]
+
+        # Unchanged prefixes: a blank only updates the probability of ending
+        # in blank, a repeated last label is merged into the prefix. The empty
+        # prefix can't end in non-blank, lp[-1] doesn't change that.
+        p_total = np.logaddexp(p_b, p_nb)
+        stay_b = p_total + lp[batch, blank]
+        stay_nb = p_nb + lp[batch, last]
+        if not has_extension[t]:
+            # nothing extends the prefixes, the beams stay the same
+            p_b, p_nb = stay_b, stay_nb
+            continue
+
+        # labels extending the prefixes of any sample, the others of each
+        # sample are masked
+        ext = np.flatnonzero(extend[:, t].any(axis=0))
+        e = len(ext) + 1
+        column_of[ext] = np.arange(1, e)
+        lp_ext = np.where(extend[:, t, ext], lp[:, ext], NEG_INF)[batch]
+
+        # Extended prefixes, one column per label: a repeated label needs a
+        # blank in between, so it only extends the prefixes ending in blank.
+        # Column 0 holds the unchanged prefixes.
+        cand_nb = np.empty((len(last), e))
+        cand_nb[:, 0] = stay_nb
+        cand_nb[:, 1:] = (
+            np.where(
+                ext == last[:, np.newaxis], p_b[:, np.newaxis], p_total[:, np.newaxis]
+            )
+            + lp_ext
+        )
+        cand_nb = cand_nb.ravel()
+
+        # An extension can produce a prefix that is already in the beam, add
+        # its probability to that prefix.
+        child, parent = np.nonzero(
+            (parent_hashes[:, np.newaxis] == hashes) & (batch[:, np.newaxis] == batch)
+        )
+        if len(child):
+            column = column_of[last[child]]
+            merged = column > 0
+            src = parent[merged] * e + column[merged]
+            dst = child[merged] * e
+            cand_nb[dst] = np.logaddexp(cand_nb[dst], cand_nb[src])
+            cand_nb[src] = NEG_INF
+        column_of[ext] = 0
+
+        # Trim the beams before moving on to the next time-step.
+        cand_total = cand_nb.copy()
+        cand_total[::e] = np.logaddexp(stay_b, cand_nb[::e])
+        keep = np.flatnonzero(cand_total > NEG_INF)
+        if N == 1 and len(keep) > beam_size:
+            keep = keep[np.argpartition(-cand_total[keep], beam_size - 1)[:beam_size]]
+        elif len(keep) > beam_size:
+            keep = keep[_top_per_sample(batch[keep // e], cand_total[keep], beam_size)]
+
+        parent, column = np.divmod(keep, e)
+        label = np.concatenate(([-1], ext))[column]
+        extended = column > 0
+        batch = batch[parent]
+        p_b = np.where(extended, NEG_INF, stay_b[parent])
+        p_nb = cand_nb[keep]
+        prefixes = prefixes[parent]
+        lengths = lengths[parent]
+        # unchanged prefixes get the -1 past their end
+        prefixes[np.arange(len(keep)), lengths] = label
+        lengths += extended
+        last = np.where(extended, label, last[parent])
+        hashes = hashes[parent]
+        parent_hashes = np.where(extended, hashes, parent_hashes[parent])
+        hashes = np.where(
+            extended, hashes * hash_base + (label + 1).astype(np.uint64), hashes
+        )
+
+    p_total = np.logaddexp(p_b, p_nb)
+    results = [[] for _ in range(N)]
+    for i in _top_per_sample(batch, p_total, top_k):
+        results[batch[i]].append(
+            (tuple(prefixes[i, : lengths[i]].tolist()), float(-p_total[i]))
+        )
+    return results
+
+
+def _top_per_sample(batch, scores, k):
+    """
+    Returns the indices of the k highest scores of every sample, per sample
+    from highest to lowest.
+    """
+    order = np.lexsort((-scores, batch))
+    sorted_batch = batch[order]
+    rank = np.arange(len(order)) - np.searchsorted(sorted_batch, sorted_batch)
+    return order[rank < k]
 
 
 if __name__ == "__main__":
@@ -29,3 +29,73 @@ class CaptchaRequiredException(FusionSolarException):
     """
 
     pass
+
+
+class InvalidSubdomainException(AuthenticationException):
+    """The configured Huawei subdomain does not belong to the account
+
+    :param AuthenticationException: _description_
+    :type AuthenticationException: _type_
+    """
+
+    pass
+
+
+class SessionExpiredException(FusionSolarException):
+    """The session is no longer valid and a new login is required
+
+    :param FusionSolarException: _description_
+    :type FusionSolarException: _type_
+    """
+
+    pass
+
+
+class RateLimitException(FusionSolarException):
+    """The API throttled the request because of too many requests
+
+    :param FusionSolarException: _description_
+    :type FusionSolarException: _type_
+    """
+
+    pass
+
+
+class ServerException(FusionSolarException):
+    """The API failed with a server side error
+
+    :param FusionSolarException: _description_
+    :type FusionSolarException: _type_
+    """
+
+    pass
+
+
+class NetworkException(FusionSolarException):
+    """The API could not be reached
+
+    :param FusionSolarException: _description_
+    :type FusionSolarException: _type_
+    """
+
+    pass
+
+
+class RequestTimeoutException(NetworkException):
+    """The API did not respond in time
+
+    :param NetworkException: _description_
+    :type NetworkException: _type_
+    """
+
+    pass
+
+
+class NoDataException(FusionSolarException):
+    """The API answered but the response does not contain the requested data
+
+    :param FusionSolarException: _description_
+    :type FusionSolarException: _type_
+    """
+
+    pass
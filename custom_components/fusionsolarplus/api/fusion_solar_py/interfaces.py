@@ -16,10 +16,15 @@ class GenericSolver(ABC):
     def solve_captcha(self, img):
         pass
 
+    def solve_captcha_candidates(self, img, count):
+        """Returns up to count answers for the captcha, the most likely first"""
+        return [self.solve_captcha(img)]
+
     @abstractmethod
     def decode_batch_predictions(self, pred):
         pass
 
     @abstractmethod
     def preprocess_image(self, img):
+        """Turns the captcha image bytes into the input of the solver"""
         pass
@@ -0,0 +1,53 @@
+"""HTTP transport used by the FusionSolar client"""
+
+import ssl
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# default number of connections kept open per host
+DEFAULT_POOL_SIZE = 10
+
+# "gzip,deflate" plus "br" if a brotli decoder is installed, the API must not
+# send an encoding the response can't be decoded with
+ACCEPT_ENCODING_HEADER = ACCEPT_ENCODING.replace(",", ", ")
+
+
+class FusionSolarAdapter(HTTPAdapter):
+    """HTTPAdapter with a connection pool sized to the number of concurrent
+    requests of the client and a single TLS context shared by all connections.
+
+    Without a shared context, every new TLS connection creates its own context
+    and loads the CA bundle again.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, **kwargs):
+        """Create a new FusionSolarAdapter
+        :param pool_size: The maximum number of connections kept open per host
+        :type pool_size: int
+        """
+        self._ssl_context = ssl.create_default_context(cafile=requests.certs.where())
+        super().__init__(pool_maxsize=pool_size, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("ssl_context", self._ssl_context)
+        super().init_poolmanager(*args, **kwargs)
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        if verify is True:
+            # the CA bundle is already loaded into the shared context
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+
+def mount_adapter(session: requests.Session, pool_size: int = DEFAULT_POOL_SIZE):
+    """Replaces the HTTPS adapter of the given session by a FusionSolarAdapter
+
+    :param session: The session to configure
+    :type session: requests.Session
+    :param pool_size: The maximum number of connections kept open per host
+    :type pool_size: int
+    """
+    session.mount("https://", FusionSolarAdapter(pool_size=pool_size))
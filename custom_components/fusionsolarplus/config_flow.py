@@ -1,7 +1,7 @@
 import logging
-from functools import partial
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from custom_components.fusionsolarplus.const import (
     CONF_USERNAME,
@@ -11,9 +11,14 @@ from custom_components.fusionsolarplus.const import (
     CONF_DEVICE_TYPE,
     CONF_DEVICE_ID,
     CONF_DEVICE_NAME,
+    CONF_STALE_DATA_MINUTES,
+    DEFAULT_STALE_DATA_MINUTES,
+)
+from . import async_close_client, async_create_client
+from .api.fusion_solar_py.exceptions import (
+    AuthenticationException,
+    InvalidSubdomainException,
 )
-from .api.fusion_solar_py.client import FusionSolarClient
-from .api.fusion_solar_py.exceptions import AuthenticationException
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,6 +46,18 @@ class FusionSolarPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.device_options = {}
         self.client = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return FusionSolarPlusOptionsFlow()
+
+    @callback
+    def async_remove(self) -> None:
+        """Closes the client of the flow once it finished or was aborted"""
+        if self.client is not None:
+            self.hass.async_create_task(async_close_client(self.client))
+            self.client = None
+
     async def async_step_user(self, user_input=None) -> FlowResult:
         errors = {}
 
@@ -49,16 +66,20 @@ class FusionSolarPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self.password = user_input[CONF_PASSWORD]
             self.subdomain = user_input[CONF_SUBDOMAIN]
 
+            if self.client is not None:
+                await async_close_client(self.client)
+                self.client = None
+
             try:
-                self.client = await self.hass.async_add_executor_job(
-                    partial(
-                        FusionSolarClient,
-                        self.username,
-                        self.password,
-                        captcha_model_path=self.hass,  # Using modelpath to pass self.hass
-                        huawei_subdomain=self.subdomain,
-                    )
+                self.client = await async_create_client(
+                    self.hass, self.username, self.password, self.subdomain
                 )
+            except InvalidSubdomainException as subdomain_exc:
+                _LOGGER.warning(
+                    "FusionSolarPlus: Invalid subdomain - %s",
+                    str(subdomain_exc),
+                )
+                errors["base"] = "invalid_subdomain"
             except AuthenticationException as auth_exc:
                 _LOGGER.warning(
                     "FusionSolarPlus: Invalid authentication credentials - %s",
@@ -109,17 +130,13 @@ class FusionSolarPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
                 # Handle plants ids
                 if self.device_type == DEVICE_TYPE_PLANT:
-                    response = await self.hass.async_add_executor_job(
-                        self.client.get_plant_ids
-                    )
+                    response = await self.client.get_plant_ids()
                     for plant_id in response:
                         device_options[f"Plant (ID: {plant_id})"] = plant_id
 
                 # Handle inverter ids
                 elif self.device_type == DEVICE_TYPE_INVERTER:
-                    response = await self.hass.async_add_executor_job(
-                        self.client.get_device_ids
-                    )
+                    response = await self.client.get_device_ids()
                     for device in response:
                         if device["type"] == "Inverter":
                             device_dn = device["deviceDn"]
@@ -127,22 +144,16 @@ class FusionSolarPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
                 # Handle battery ids
                 elif self.device_type == DEVICE_TYPE_BATTERY:
-                    plant_ids = await self.hass.async_add_executor_job(
-                        self.client.get_plant_ids
-                    )
+                    plant_ids = await self.client.get_plant_ids()
                     for plant_id in plant_ids:
-                        battery_ids = await self.hass.async_add_executor_job(
-                            self.client.get_battery_ids, plant_id
-                        )
+                        battery_ids = await self.client.get_battery_ids(plant_id)
 
                         for battery_id in battery_ids:
                             device_options[f"Battery (ID: {battery_id})"] = battery_id
 
                 # Handle flow ids (uses plant ids)
                 elif self.device_type == DEVICE_TYPE_FLOW:
-                    response = await self.hass.async_add_executor_job(
-                        self.client.get_plant_ids
-                    )
+                    response = await self.client.get_plant_ids()
                     for plant_id in response:
                         device_options[f"Flow (Plant ID: {plant_id})"] = plant_id
 
@@ -184,3 +195,24 @@ class FusionSolarPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors={},
         )
+
+
+class FusionSolarPlusOptionsFlow(config_entries.OptionsFlow):
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_STALE_DATA_MINUTES,
+                        default=self.config_entry.options.get(
+                            CONF_STALE_DATA_MINUTES, DEFAULT_STALE_DATA_MINUTES
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1440)),
+                }
+            ),
+            errors={},
+        )
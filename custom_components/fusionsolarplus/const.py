@@ -7,3 +7,23 @@ CONF_SUBDOMAIN = "subdomain"
 CONF_DEVICE_TYPE = "device_type"
 CONF_DEVICE_ID = "device_id"
 CONF_DEVICE_NAME = "device_name"
+
+CONF_STALE_DATA_MINUTES = "stale_data_minutes"
+DEFAULT_STALE_DATA_MINUTES = 10
+
+STORAGE_KEY = f"{DOMAIN}.sessions"
+STORAGE_VERSION = 1
+SESSION_SAVE_DELAY = 10
+
+# ONNX captcha model, looked up in <config>/fusionsolarplus/. Captchas are
+# solved remotely if it's missing
+CAPTCHA_MODEL_FILENAME = "captcha_huawei.onnx"
+
+# concurrent requests of the account coordinator
+MAX_CONCURRENT_FETCHES = 4
+MAX_CONCURRENT_MODULE_FETCHES = 4
+
+# refresh tiers of the signals, see polling.TIER_INTERVALS
+TIER_REALTIME = "realtime"
+TIER_MINUTES = "minutes"
+TIER_DAILY = "daily"
@@ -0,0 +1,598 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.core import callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from . import DOMAIN, async_recreate_client, async_save_session, client_key
+from .api.fusion_solar_py.exceptions import FusionSolarException, NoDataException
+from .const import MAX_CONCURRENT_FETCHES, MAX_CONCURRENT_MODULE_FETCHES
+from .retry import ERROR_THROTTLED, CircuitBreaker, RetryPolicy, classify_error
+from .polling import DAY_UPDATE_INTERVAL, TIER_INTERVALS, AdaptivePollScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_RETRIES = 2
+# number of cycles the last data of a failing battery module is kept
+MAX_MODULE_FAILURES = 3
+# battery modules without data are polled this often to detect added modules
+ABSENT_MODULE_POLL_INTERVAL = timedelta(minutes=30)
+
+# time budget of a refresh of all devices, including retries and a re-login
+REFRESH_DEADLINE = timedelta(seconds=30)
+
+# longest backoff between two updates while stale data is served
+STALE_RETRY_MAX_INTERVAL = timedelta(minutes=5)
+
+# backoff between two updates after FusionSolar throttled the requests
+THROTTLE_MIN_INTERVAL = timedelta(minutes=1)
+THROTTLE_MAX_INTERVAL = timedelta(minutes=15)
+
+BATTERY_MODULE_IDS = ["1", "2", "3", "4"]
+
+
+def get_account_coordinator(hass, entry):
+    """Returns the coordinator polling all devices of the account of an entry"""
+    key = client_key(entry)
+    coordinators = hass.data[DOMAIN].setdefault("coordinators", {})
+    if key not in coordinators:
+        coordinators[key] = FusionSolarAccountCoordinator(hass, entry)
+    return coordinators[key]
+
+
+def _parse_signal(signal):
+    """Numeric signals are returned as float, all others as reported"""
+    if signal.get("unit"):
+        try:
+            return float(signal.get("value"))
+        except (TypeError, ValueError):
+            return None
+    return signal.get("value")
+
+
+def _parse_module_signal(signal):
+    try:
+        return float(signal.get("realValue"))
+    except (TypeError, ValueError):
+        return signal.get("realValue")
+
+
+def build_snapshot(device_type, device_data):
+    """Indexes the raw data of a device by signal once per update, so that
+    every entity reads its parsed value with a single lookup.
+
+    Inverter and battery signals are keyed by signal id, battery module signals
+    by (module_id, signal_id) and flow nodes by name. Plant data is already a
+    flat dict and returned as is.
+    """
+    snapshot = {}
+    if device_type == "Inverter":
+        for group in device_data.get("data", []):
+            for signal in group.get("signals", []):
+                snapshot.setdefault(signal["id"], _parse_signal(signal))
+    elif device_type == "Battery":
+        for signal in device_data.get("battery") or []:
+            snapshot.setdefault(signal["id"], _parse_signal(signal))
+        for module_id, module_signals in device_data.get("modules", {}).items():
+            for signal in module_signals:
+                snapshot.setdefault(
+                    (module_id, signal["id"]), _parse_module_signal(signal)
+                )
+    elif device_type == "Flow":
+        flow_data = device_data.get("flow", {}).get("data", {})
+        for node in flow_data.get("flow", {}).get("nodes", []):
+            value = node.get("value")
+            if value is None:
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                value = None
+            snapshot.setdefault(node.get("name"), value)
+    else:
+        snapshot = device_data
+    return snapshot
+
+
+class FusionSolarAccountCoordinator(DataUpdateCoordinator):
+    """Polls every registered device of one FusionSolar account in a single
+    scheduled batch. The data is a dict keyed by (device_type, device_id),
+    entities read their slice using that key as coordinator context."""
+
+    def __init__(self, hass, entry):
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=None,
+            name=f"FusionSolar {entry.data['username']} Data",
+            update_interval=DAY_UPDATE_INTERVAL,
+            # don't notify the entities if the cloud returned the same payload
+            always_update=False,
+        )
+        self._key = client_key(entry)
+        # (device_type, device_id) -> number of entries using the device
+        self.devices = {}
+        # (device_type, device_id) -> parsed values, see build_snapshot
+        self.snapshots = {}
+        self._scheduler = AdaptivePollScheduler(hass)
+        self._retry_policy = RetryPolicy(max_retries=MAX_RETRIES)
+        self._circuit_breaker = CircuitBreaker()
+        self._fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        self._module_semaphore = asyncio.Semaphore(MAX_CONCURRENT_MODULE_FETCHES)
+        # (device_id, module_id) -> number of consecutive failed module requests
+        self._module_failures = {}
+        # (device_id, module_id) -> time.monotonic() of the next poll of an empty module
+        self._absent_modules = {}
+        # (device_id, module_id) of the battery modules which returned all their
+        # signals once, so that their entities could be created
+        self._discovered_modules = set()
+        # (device_type, device_id) -> time.monotonic() of the last successful fetch
+        self._last_success = {}
+        # (device_type, device_id) -> timedelta the last data may be served for
+        self._stale_data_max_age = {}
+        self._stale_devices = set()
+        self._stale_retries = 0
+        # number of consecutive updates with a throttled request
+        self._throttled_updates = 0
+        # (device_type, device_id) -> {signal_key: (number of entities, tier)}
+        self._subscriptions = {}
+        # ((device_type, device_id), tier) -> time.monotonic() of the last fetch
+        self._tier_fetched = {}
+        # (client, login generation) of the last session written to .storage
+        self._saved_session = None
+
+    @property
+    def client(self):
+        return self.hass.data[DOMAIN]["clients"][self._key]["client"]
+
+    async def async_add_device(self, device_type, device_id, stale_data_max_age):
+        """Registers a device and fetches its data right away, so that entities
+        can be created from it.
+
+        :param stale_data_max_age: How long the last data of the device is served
+                                   while updating it fails
+        :return: The key of the device in the coordinator data
+        """
+        device_key = (device_type, str(device_id))
+        self._stale_data_max_age[device_key] = stale_data_max_age
+        # the data of a known device is dropped once it is stale for too long
+        if device_key not in self.devices or device_key not in (self.data or {}):
+            deadline = time.monotonic() + REFRESH_DEADLINE.total_seconds()
+            try:
+                device_data = await self._async_fetch_device_with_retry(
+                    device_key, deadline
+                )
+            except UpdateFailed as err:
+                raise ConfigEntryNotReady(str(err)) from err
+
+            data = dict(self.data or {})
+            data[device_key] = device_data
+            self._last_success[device_key] = time.monotonic()
+            self.snapshots[device_key] = build_snapshot(device_type, device_data)
+            self.async_set_updated_data(data)
+
+        self.devices[device_key] = self.devices.get(device_key, 0) + 1
+        return device_key
+
+    def async_remove_device(self, device_key):
+        """Unregisters a device and drops the coordinator with its last device"""
+        self.devices[device_key] -= 1
+        if self.devices[device_key] > 0:
+            return
+
+        del self.devices[device_key]
+        if self.data:
+            self.data.pop(device_key, None)
+        self.snapshots.pop(device_key, None)
+        self._last_success.pop(device_key, None)
+        self._stale_data_max_age.pop(device_key, None)
+        self._stale_devices.discard(device_key)
+        if device_key[0] == "Battery":
+            self._discovered_modules -= {
+                (device_key[1], module_id) for module_id in BATTERY_MODULE_IDS
+            }
+
+        if not self.devices:
+            self.hass.data[DOMAIN]["coordinators"].pop(self._key, None)
+
+    def data_age(self, device_key):
+        """Returns the age in seconds of the data of a device while stale data is
+        served because updating it failed, None while the data is fresh"""
+        if device_key not in self._stale_devices:
+            return None
+        return time.monotonic() - self._last_success[device_key]
+
+    def _can_serve_stale(self, device_key):
+        """Tells whether the last data of a device is recent enough to be served
+        in place of a failed update"""
+        if (self.data or {}).get(device_key) is None:
+            return False
+        age = time.monotonic() - self._last_success.get(device_key, 0)
+        return age <= self._stale_data_max_age[device_key].total_seconds()
+
+    @callback
+    def async_subscribe_signal(self, device_key, signal_key, tier):
+        """Registers the signal of an entity while it is added to Home Assistant.
+        Battery module requests only contain subscribed signals and every signal
+        is requested at the cadence of its refresh tier.
+
+        :return: Callback removing the subscription again
+        """
+        subscriptions = self._subscriptions.setdefault(device_key, {})
+        count, _ = subscriptions.get(signal_key, (0, tier))
+        subscriptions[signal_key] = (count + 1, tier)
+
+        @callback
+        def async_unsubscribe():
+            count, tier = subscriptions[signal_key]
+            if count <= 1:
+                del subscriptions[signal_key]
+            else:
+                subscriptions[signal_key] = (count - 1, tier)
+
+        return async_unsubscribe
+
+    def _due_tiers(self, device_key):
+        """Returns the refresh tiers of a device which have to be requested now"""
+        now = time.monotonic()
+        due_tiers = set()
+        for tier, interval in TIER_INTERVALS.items():
+            last_fetch = self._tier_fetched.get((device_key, tier))
+            if last_fetch is None or now - last_fetch >= interval.total_seconds():
+                due_tiers.add(tier)
+        return due_tiers
+
+    def _is_due(self, device_key, due_tiers):
+        """Tells whether the main endpoint of a device has to be requested, which
+        is the case if any of its subscribed signals or no signal at all is due.
+        Battery module signals are keyed by tuples and requested separately."""
+        tiers = {
+            tier
+            for signal_key, (_, tier) in self._subscriptions.get(device_key, {}).items()
+            if not isinstance(signal_key, tuple)
+        }
+        return not tiers or not tiers.isdisjoint(due_tiers)
+
+    async def _async_update_data(self):
+        device_keys = list(self.devices)
+        request_allowed = self._circuit_breaker.allow_request()
+        if request_allowed:
+            deadline = time.monotonic() + REFRESH_DEADLINE.total_seconds()
+            results = await asyncio.gather(
+                *(
+                    self._async_fetch_device_with_retry(key, deadline)
+                    for key in device_keys
+                ),
+                return_exceptions=True,
+            )
+        else:
+            paused = UpdateFailed(
+                "Requests paused after repeated failures, retrying in "
+                f"{self._circuit_breaker.remaining_cooldown}"
+            )
+            results = [paused] * len(device_keys)
+
+        data = {}
+        stale_devices = set()
+        now = time.monotonic()
+        for device_key, result in zip(device_keys, results):
+            if not isinstance(result, Exception):
+                data[device_key] = result
+                self._last_success[device_key] = now
+            elif self._can_serve_stale(device_key):
+                _LOGGER.warning(
+                    "Failed to update %s %s, serving data from %d s ago: %s",
+                    *device_key,
+                    now - self._last_success[device_key],
+                    result,
+                )
+                data[device_key] = self.data[device_key]
+                stale_devices.add(device_key)
+            else:
+                _LOGGER.warning("Failed to update %s %s: %s", *device_key, result)
+
+        # the entities only hear about updates with changed data. Serving the
+        # same data again still changes its age, so notify them anyway.
+        notify_stale = (
+            stale_devices or stale_devices != self._stale_devices
+        ) and data == self.data
+        self._stale_devices = stale_devices
+        # updates skipped by the open breaker don't count
+        if request_allowed:
+            if device_keys and len(data) == len(stale_devices):
+                self._circuit_breaker.record_failure()
+            else:
+                self._circuit_breaker.record_success()
+
+            # the fetches don't retry throttled requests, slow the updates
+            # down until FusionSolar accepts them again
+            throttled = any(
+                isinstance(result, Exception)
+                and classify_error(result.__cause__ or result) == ERROR_THROTTLED
+                for result in results
+            )
+            self._throttled_updates = self._throttled_updates + 1 if throttled else 0
+
+        if device_keys and not data:
+            self.update_interval = self._backoff(self.update_interval)
+            raise UpdateFailed("Error fetching data for all devices")
+
+        if len(data) > len(stale_devices):
+            self._async_save_session()
+
+        self.snapshots = {
+            device_key: build_snapshot(device_key[0], device_data)
+            for device_key, device_data in data.items()
+        }
+        self.update_interval = self._scheduler.next_interval(data, self.snapshots)
+
+        # retry stale devices with an exponential backoff
+        if stale_devices:
+            self._stale_retries += 1
+            self.update_interval = min(
+                STALE_RETRY_MAX_INTERVAL,
+                DAY_UPDATE_INTERVAL * 2 ** (self._stale_retries - 1),
+            )
+        else:
+            self._stale_retries = 0
+
+        self.update_interval = self._backoff(self.update_interval)
+
+        if notify_stale:
+            self.async_update_listeners()
+        return data
+
+    def _backoff(self, interval):
+        """Delays the next update while the circuit breaker is open or
+        FusionSolar throttles the requests"""
+        if self._circuit_breaker.is_open:
+            interval = max(
+                DAY_UPDATE_INTERVAL, self._circuit_breaker.remaining_cooldown
+            )
+        if self._throttled_updates:
+            interval = max(
+                interval,
+                min(
+                    THROTTLE_MAX_INTERVAL,
+                    THROTTLE_MIN_INTERVAL * 2 ** (self._throttled_updates - 1),
+                ),
+            )
+        return interval
+
+    async def _async_fetch_device_with_retry(self, device_key, deadline):
+        # while the last data can still be served, fail fast and leave the
+        # recovery to the background instead of blocking the update
+        max_retries = (
+            0 if self._can_serve_stale(device_key) else self._retry_policy.max_retries
+        )
+
+        attempt = 0
+        while True:
+            client = self.client
+            login_generation = client.login_generation
+            try:
+                async with self._fetch_semaphore:
+                    response = await self._async_fetch_device(
+                        client, deadline, *device_key
+                    )
+
+                if response is None:
+                    raise NoDataException("API returned None response")
+
+                return response
+
+            except Exception as err:
+                error_class = classify_error(err)
+                needs_login = self._retry_policy.needs_login(error_class)
+
+                delay = self._retry_policy.delay(attempt)
+                if (
+                    not self._retry_policy.should_retry(
+                        error_class, attempt, max_retries
+                    )
+                    or time.monotonic() + delay >= deadline
+                ):
+                    if needs_login:
+                        self.hass.async_create_background_task(
+                            self._async_recover(client, login_generation),
+                            name=f"{self.name} recovery",
+                        )
+                    raise UpdateFailed(
+                        f"Error fetching data after {attempt + 1} attempts "
+                        f"({error_class} error): {err}"
+                    ) from err
+
+                if needs_login:
+                    await self._async_recover(client, login_generation, deadline)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    @callback
+    def _async_save_session(self):
+        """Stores the session after the client logged in again, so that a
+        restart reuses it instead of logging in with a captcha"""
+        client = self.client
+        session = (client, client.login_generation)
+        if session != self._saved_session:
+            async_save_session(self.hass, client, *self._key)
+            self._saved_session = session
+
+    async def _async_recover(self, client, login_generation, deadline=None):
+        """Logs in again, or replaces the client if it is broken. Concurrent
+        failures of several devices share the same login."""
+        try:
+            await self._async_call(client, deadline, client.relogin, login_generation)
+            return True
+        except FusionSolarException:
+            # a rejected login, throttling or an unreachable cloud: a new client
+            # would log in again only to fail the same way
+            return False
+        except Exception:
+            # the client itself is broken, e.g. its session was closed
+            pass
+
+        try:
+            await async_recreate_client(self.hass, self._key, client)
+            return True
+        except Exception:
+            return False
+
+    async def _async_call(self, client, deadline, func, *args):
+        """Calls a client method. All requests it issues have to finish before
+        the deadline of the refresh."""
+        with client.deadline(deadline):
+            return await func(*args)
+
+    async def _async_fetch_device(self, client, deadline, device_type, device_id):
+        device_key = (device_type, device_id)
+        previous = (self.data or {}).get(device_key)
+        due_tiers = self._due_tiers(device_key)
+        fetch = previous is None or self._is_due(device_key, due_tiers)
+
+        if device_type == "Inverter":
+            if fetch:
+                response = await self._async_call(
+                    client, deadline, client.get_real_time_data, device_id
+                )
+            else:
+                response = previous
+        elif device_type == "Plant":
+            response = await self._async_call(
+                client, deadline, client.get_current_plant_data, device_id
+            )
+        elif device_type == "Battery":
+            # the status request validates the session once, the module requests
+            # issued right after it reuse the cached session check
+            if fetch:
+                battery_status = await self._async_call(
+                    client, deadline, client.get_battery_status, device_id
+                )
+            else:
+                battery_status = previous["battery"]
+            module_data = await self._async_fetch_battery_modules(
+                client, deadline, device_id, due_tiers
+            )
+            response = {"battery": battery_status, "modules": module_data}
+        elif device_type == "Flow":
+            response = await self._async_call(
+                client, deadline, client.get_plant_flow, device_id
+            )
+            response = {"flow": response}
+        else:
+            raise Exception("Unsupported device type")
+
+        now = time.monotonic()
+        for tier in due_tiers:
+            self._tier_fetched[(device_key, tier)] = now
+
+        return response
+
+    async def _async_fetch_battery_modules(
+        self, client, deadline, device_id, due_tiers
+    ):
+        """Fetches all battery modules in parallel. A failing module keeps its
+        previous data for a few cycles instead of failing the whole battery.
+
+        Only the signals of subscribed entities whose tier is due are requested
+        and merged into the previous data of the module. All signals are
+        requested until the module returned them once, so that its entities
+        can be created. Afterwards modules without subscribed entities, e.g.
+        because all of them are disabled, are not requested at all."""
+        previous_device_data = (self.data or {}).get(("Battery", device_id)) or {}
+        previous_modules = previous_device_data.get("modules", {})
+        subscriptions = self._subscriptions.get(("Battery", device_id), {})
+
+        module_data = {}
+        module_signal_ids = {}
+        now = time.monotonic()
+        for module_id in BATTERY_MODULE_IDS:
+            # modules which returned no data are only polled again once in a while
+            if self._absent_modules.get((device_id, module_id), 0) > now:
+                continue
+
+            signal_tiers = {
+                str(signal_key[1]): tier
+                for signal_key, (_, tier) in subscriptions.items()
+                if isinstance(signal_key, tuple) and signal_key[0] == module_id
+            }
+            if not signal_tiers:
+                if (device_id, module_id) not in self._discovered_modules:
+                    module_signal_ids[module_id] = None
+                continue
+
+            if module_id not in previous_modules:
+                module_signal_ids[module_id] = sorted(signal_tiers)
+                continue
+
+            signal_ids = [
+                signal_id
+                for signal_id, tier in signal_tiers.items()
+                if tier in due_tiers
+            ]
+            if signal_ids:
+                module_signal_ids[module_id] = sorted(signal_ids)
+            else:
+                module_data[module_id] = previous_modules[module_id]
+
+        async def fetch_module(module_id):
+            async with self._module_semaphore:
+                return await self._async_call(
+                    client,
+                    deadline,
+                    client.get_battery_module_stats,
+                    device_id,
+                    module_id,
+                    module_signal_ids[module_id],
+                )
+
+        module_ids = list(module_signal_ids)
+        results = await asyncio.gather(
+            *(fetch_module(module_id) for module_id in module_ids),
+            return_exceptions=True,
+        )
+
+        for module_id, result in zip(module_ids, results):
+            failure_key = (device_id, module_id)
+            if isinstance(result, Exception):
+                failures = self._module_failures.get(failure_key, 0) + 1
+                self._module_failures[failure_key] = failures
+                _LOGGER.warning(
+                    "Failed to update battery %s module %s (%d consecutive failures): %s",
+                    device_id,
+                    module_id,
+                    failures,
+                    result,
+                )
+                if module_id in previous_modules and failures <= MAX_MODULE_FAILURES:
+                    module_data[module_id] = previous_modules[module_id]
+                continue
+
+            self._module_failures.pop(failure_key, None)
+            if result:
+                if module_signal_ids[module_id] is None:
+                    self._discovered_modules.add(failure_key)
+                signals = {
+                    signal["id"]: signal
+                    for signal in previous_modules.get(module_id, [])
+                }
+                signals.update((signal["id"], signal) for signal in result)
+                module_data[module_id] = list(signals.values())
+                if self._absent_modules.pop(failure_key, None) is not None:
+                    _LOGGER.info(
+                        "Battery %s module %s reports data again. Reload the entry "
+                        "if its entities are missing",
+                        device_id,
+                        module_id,
+                    )
+            else:
+                self._absent_modules[failure_key] = (
+                    now + ABSENT_MODULE_POLL_INTERVAL.total_seconds()
+                )
+
+        return module_data
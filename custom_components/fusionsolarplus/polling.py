@@ -0,0 +1,227 @@
+import logging
+import statistics
+import time
+from collections import deque
+from datetime import timedelta
+
+from homeassistant.const import SUN_EVENT_SUNRISE
+from homeassistant.helpers.sun import get_astral_event_next, is_up
+from homeassistant.util import dt as dt_util
+
+from .const import TIER_DAILY, TIER_MINUTES, TIER_REALTIME
+
+_LOGGER = logging.getLogger(__name__)
+
+DAY_UPDATE_INTERVAL = timedelta(seconds=15)
+NIGHT_UPDATE_INTERVAL = timedelta(minutes=5)
+
+# how often the signals of each refresh tier are requested, realtime signals
+# are requested on every update
+TIER_INTERVALS = {
+    TIER_REALTIME: timedelta(0),
+    TIER_MINUTES: timedelta(minutes=5),
+    TIER_DAILY: timedelta(days=1),
+}
+
+# bounds of the learned server side refresh period (seconds) of a device
+MIN_REFRESH_PERIOD = 10
+MAX_REFRESH_PERIOD = 30 * 60
+# number of observed refreshes before polls are aligned to them
+MIN_REFRESH_SAMPLES = 3
+# shortest wait (seconds) after the expected server side refresh before polling
+REFRESH_DELAY = 10
+# the wait is this percentile of the observed lags between the collection of
+# the data and the first poll that returned it
+VISIBILITY_LAG_PERCENTILE = 90
+# lags above this (seconds) come from outages, not from the upload of the data
+MAX_VISIBILITY_LAG = 5 * 60
+# longest interval between two polls while in sync with the server
+MAX_SYNCED_INTERVAL = timedelta(minutes=10)
+
+# power below this threshold (kW) is treated as no production / idle battery
+ACTIVE_POWER_THRESHOLD = 0.01
+
+INVERTER_STATUS_SIGNAL = 10025
+INVERTER_ACTIVE_POWER_SIGNAL = 10018
+BATTERY_POWER_SIGNAL = 10004
+FLOW_PV_NODE = "neteco.pvms.devTypeLangKey.string"
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def device_activity(device_type, snapshot):
+    """Tells from the latest snapshot of a device whether it is active.
+
+    :return: True if the device produces power or the battery charges/discharges,
+             False if it reports night (no PV power, inverter in standby/shutdown),
+             None if the data does not tell
+    """
+    if device_type == "Inverter":
+        power = _to_float(snapshot.get(INVERTER_ACTIVE_POWER_SIGNAL))
+        status = str(snapshot.get(INVERTER_STATUS_SIGNAL) or "").lower()
+        if power is not None and power > ACTIVE_POWER_THRESHOLD:
+            return True
+        if "shutdown" in status or "standby" in status or power == 0:
+            return False
+        return None
+
+    if device_type == "Battery":
+        # an idle battery says nothing about the time of day
+        power = _to_float(snapshot.get(BATTERY_POWER_SIGNAL))
+        if power is not None and abs(power) > ACTIVE_POWER_THRESHOLD:
+            return True
+        return None
+
+    if device_type == "Plant":
+        power = _to_float(snapshot.get("currentPower"))
+    elif device_type == "Flow":
+        power = _to_float(snapshot.get(FLOW_PV_NODE))
+    else:
+        return None
+
+    if power is None:
+        return None
+    return power > ACTIVE_POWER_THRESHOLD
+
+
+def collection_time(device_data):
+    """Returns the newest collection timestamp (seconds since epoch) reported by
+    the signals of a device, or None if the data carries no timestamps"""
+    signal_lists = []
+    if isinstance(device_data.get("data"), list):
+        signal_lists += [group.get("signals", []) for group in device_data["data"]]
+    if isinstance(device_data.get("battery"), list):
+        signal_lists.append(device_data["battery"])
+    signal_lists += list(device_data.get("modules", {}).values())
+
+    timestamps = [
+        signal["latestTime"]
+        for signals in signal_lists
+        for signal in signals
+        if isinstance(signal.get("latestTime"), (int, float))
+    ]
+    return max(timestamps) if timestamps else None
+
+
+class RefreshTracker:
+    """Learns when the cloud refreshes the data of one device from the collection
+    timestamps in its responses, or from the time its values changed if the
+    data carries no timestamps. The data of a collection shows up in the cloud
+    some time after it was collected, that lag is learned as well."""
+
+    def __init__(self):
+        self.last_refresh = None
+        self.periods = deque(maxlen=8)
+        self.lags = deque(maxlen=8)
+        self._last_snapshot = None
+
+    def update(self, snapshot, collected_at, now):
+        if snapshot == self._last_snapshot:
+            return
+        self._last_snapshot = snapshot
+
+        refresh_time = collected_at if collected_at else now
+        if self.last_refresh is not None:
+            if refresh_time <= self.last_refresh:
+                return
+            period = refresh_time - self.last_refresh
+            if MIN_REFRESH_PERIOD <= period <= MAX_REFRESH_PERIOD:
+                self.periods.append(period)
+            # the first data seen may have shown up long before
+            lag = now - refresh_time
+            if 0 <= lag <= MAX_VISIBILITY_LAG:
+                self.lags.append(lag)
+        self.last_refresh = refresh_time
+
+    @property
+    def period(self):
+        """The median observed refresh period in seconds, None while unknown"""
+        if len(self.periods) < MIN_REFRESH_SAMPLES:
+            return None
+        return statistics.median(self.periods)
+
+    @property
+    def delay(self):
+        """Seconds between a refresh and its data showing up in the cloud"""
+        if len(self.lags) < 2:
+            return max([REFRESH_DELAY, *self.lags])
+        lag = statistics.quantiles(self.lags, n=100, method="inclusive")[
+            VISIBILITY_LAG_PERCENTILE - 1
+        ]
+        return max(REFRESH_DELAY, lag)
+
+    def next_poll(self, now):
+        """Returns the time to poll right after the next expected refresh shows
+        up, or None if the cadence is unknown or the expected refresh is overdue"""
+        period = self.period
+        if period is None or self.last_refresh is None:
+            return None
+
+        next_poll = self.last_refresh + period + self.delay
+        if now >= next_poll:
+            # the poll after the expected refresh returned unchanged data, poll
+            # at the full rate until it shows up
+            return None
+        return next_poll
+
+
+class AdaptivePollScheduler:
+    """Chooses the update interval of the account coordinator from the data it
+    already fetched: a slow rate while the devices report night and the sun is
+    down, back to full rate at sunrise. During the day, polls are aligned to the learned server
+    side refresh of the devices, falling back to the full rate while the
+    cadence is unknown or an expected refresh is overdue."""
+
+    def __init__(self, hass):
+        self.hass = hass
+        self.idle = False
+        self._trackers = {}
+
+    def next_interval(self, data, snapshots):
+        """Returns the interval until the next update.
+
+        :param data: The raw data of all devices keyed by (device_type, device_id)
+        :param snapshots: The snapshots of all devices keyed by (device_type, device_id)
+        """
+        now = time.time()
+        self._trackers = {
+            device_key: self._trackers.get(device_key) or RefreshTracker()
+            for device_key in snapshots
+        }
+        for device_key, tracker in self._trackers.items():
+            tracker.update(
+                snapshots[device_key], collection_time(data[device_key]), now
+            )
+
+        activity = [
+            device_activity(device_type, snapshot)
+            for (device_type, _), snapshot in snapshots.items()
+        ]
+        idle = False in activity and True not in activity
+
+        if idle != self.idle:
+            _LOGGER.debug("Devices are %s", "idle" if idle else "active")
+            self.idle = idle
+
+        if not idle or is_up(self.hass):
+            # between sunrise and sunset production can start any time, e.g.
+            # once the snow slid off the panels
+            return self._synced_interval(now)
+
+        # the sun is down, don't sleep past sunrise
+        next_sunrise = get_astral_event_next(self.hass, SUN_EVENT_SUNRISE)
+        until_sunrise = next_sunrise - dt_util.utcnow()
+        return max(DAY_UPDATE_INTERVAL, min(NIGHT_UPDATE_INTERVAL, until_sunrise))
+
+    def _synced_interval(self, now):
+        next_polls = [tracker.next_poll(now) for tracker in self._trackers.values()]
+        if not next_polls or None in next_polls:
+            return DAY_UPDATE_INTERVAL
+
+        interval = timedelta(seconds=min(next_polls) - now)
+        return max(DAY_UPDATE_INTERVAL, min(MAX_SYNCED_INTERVAL, interval))
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from datetime import timedelta
+
+import aiohttp
+
+from .api.fusion_solar_py.exceptions import (
+    AuthenticationException,
+    InvalidSubdomainException,
+    NetworkException,
+    NoDataException,
+    RateLimitException,
+    ServerException,
+    SessionExpiredException,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# error classes deciding how a failed request is retried
+ERROR_AUTH = "auth"
+ERROR_NETWORK = "network"
+ERROR_SERVER = "server"
+ERROR_THROTTLED = "throttled"
+ERROR_NO_DATA = "no_data"
+ERROR_CONFIG = "config"
+ERROR_OTHER = "other"
+
+# checked in order, so subclasses have to be listed before their base classes
+_EXCEPTION_CLASSES = (
+    (InvalidSubdomainException, ERROR_CONFIG),
+    (SessionExpiredException, ERROR_AUTH),
+    (AuthenticationException, ERROR_AUTH),
+    (RateLimitException, ERROR_THROTTLED),
+    (ServerException, ERROR_SERVER),
+    (NetworkException, ERROR_NETWORK),
+    (NoDataException, ERROR_NO_DATA),
+)
+
+
+def classify_error(err):
+    """Maps an exception raised by the client to one of the ERROR_* classes"""
+    for exception_type, error_class in _EXCEPTION_CLASSES:
+        if isinstance(err, exception_type):
+            return error_class
+
+    # errors raised outside of the client methods, e.g. while logging in
+    if isinstance(err, aiohttp.ClientResponseError):
+        status = err.status
+        if status in (401, 403):
+            return ERROR_AUTH
+        if status == 429:
+            return ERROR_THROTTLED
+        if status >= 500:
+            return ERROR_SERVER
+        return ERROR_OTHER
+    if isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError)):
+        return ERROR_NETWORK
+    if isinstance(err, json.JSONDecodeError):
+        return ERROR_AUTH
+    return ERROR_OTHER
+
+
+class RetryPolicy:
+    """Decides whether and when a failed request is retried, depending on the
+    class of the error. Delays grow exponentially and are jittered, so that
+    several devices failing at once don't retry in lockstep."""
+
+    # throttled requests are never retried right away, the coordinator backs
+    # off its next update instead. Missing data and a wrong configuration
+    # won't change with another attempt.
+    RETRYABLE = {ERROR_AUTH, ERROR_NETWORK, ERROR_SERVER, ERROR_OTHER}
+
+    def __init__(self, max_retries=2, base_delay=1.0, max_delay=30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error_class, attempt, max_retries=None):
+        """Tells whether another attempt should be made after attempt (0-based)
+        failed with an error of the given class"""
+        if max_retries is None:
+            max_retries = self.max_retries
+        return attempt < max_retries and error_class in self.RETRYABLE
+
+    def needs_login(self, error_class):
+        """Only authentication errors are worth a new login"""
+        return error_class == ERROR_AUTH
+
+    def delay(self, attempt):
+        """Returns the jittered delay in seconds before the retry of attempt"""
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(delay / 2, delay)
+
+
+class CircuitBreaker:
+    """Stops requests to the cloud for a cooldown after repeated failures.
+
+    After failure_threshold consecutive failed updates the breaker opens. Once
+    the cooldown passed, a single trial update is let through (half open): if
+    it succeeds the breaker closes, otherwise it opens again.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=timedelta(minutes=5)):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self._opened_at = None
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    @property
+    def remaining_cooldown(self):
+        """Time until the next trial update is allowed"""
+        if self._opened_at is None:
+            return timedelta(0)
+        elapsed = time.monotonic() - self._opened_at
+        return max(timedelta(0), self.cooldown - timedelta(seconds=elapsed))
+
+    def allow_request(self):
+        return not self.is_open or self.remaining_cooldown == timedelta(0)
+
+    def record_success(self):
+        if self.is_open:
+            _LOGGER.info("FusionSolar is reachable again, closing circuit breaker")
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.is_open or self.failures >= self.failure_threshold:
+            if not self.is_open:
+                _LOGGER.warning(
+                    "FusionSolar failed %d times in a row, pausing requests for %s",
+                    self.failures,
+                    self.cooldown,
+                )
+            self._opened_at = time.monotonic()
@@ -1,21 +1,23 @@
 import logging
 import re
-import asyncio
-from . import DOMAIN
-from functools import partial
 from datetime import timedelta
-from .api.fusion_solar_py.client import FusionSolarClient
+from . import DOMAIN
+from .const import (
+    CONF_STALE_DATA_MINUTES,
+    DEFAULT_STALE_DATA_MINUTES,
+    TIER_DAILY,
+    TIER_MINUTES,
+    TIER_REALTIME,
+)
+from .coordinator import get_account_coordinator
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorStateClass,
     SensorEntity,
 )
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    UpdateFailed,
-    CoordinatorEntity,
-)
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -77,20 +79,40 @@ CURRENCY_MAP = {
 #
 # Device & state classes: https://developers.home-assistant.io/docs/core/entity/sensor/
 INVERTER_SIGNALS = [
-    {"id": 10025, "name": "Inverter status", "unit": "", "custom_name": "Status"},
-    {"id": 10020, "name": "Power factor", "unit": "", "custom_name": "Power Factor"},
-    {"id": 21029, "name": "Output mode", "unit": "", "custom_name": "Output Mode"},
+    {
+        "id": 10025,
+        "name": "Inverter status",
+        "unit": "",
+        "custom_name": "Status",
+        "tier": TIER_REALTIME,
+    },
+    {
+        "id": 10020,
+        "name": "Power factor",
+        "unit": "",
+        "custom_name": "Power Factor",
+        "tier": TIER_REALTIME,
+    },
+    {
+        "id": 21029,
+        "name": "Output mode",
+        "unit": "",
+        "custom_name": "Output Mode",
+        "tier": TIER_DAILY,
+    },
     {
         "id": 10027,
         "name": "Inverter startup time",
         "unit": "",
         "custom_name": "Last Startup Time",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 10028,
         "name": "Inverter shutdown time",
         "unit": "",
         "custom_name": "Last Shutdown Time",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 10032,
@@ -99,6 +121,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Daily Energy",
         "device_class": SensorDeviceClass.ENERGY,
         "state_class": SensorStateClass.TOTAL,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 10029,
@@ -107,6 +130,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Total Energy Produced",
         "device_class": SensorDeviceClass.ENERGY,
         "state_class": SensorStateClass.TOTAL_INCREASING,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 10018,
@@ -115,6 +139,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Current Active Power",
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10019,
@@ -123,6 +148,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Reactive Power",
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10006,
@@ -131,6 +157,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Rated Power",
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_DAILY,
     },
     {
         "id": 10021,
@@ -139,6 +166,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Grid Frequency",
         "device_class": SensorDeviceClass.FREQUENCY,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10014,
@@ -147,6 +175,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Phase A Current",
         "device_class": SensorDeviceClass.CURRENT,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10015,
@@ -155,6 +184,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Phase B Current",
         "device_class": SensorDeviceClass.CURRENT,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10016,
@@ -163,6 +193,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Phase C Current",
         "device_class": SensorDeviceClass.CURRENT,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10011,
@@ -171,6 +202,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Phase A Voltage",
         "device_class": SensorDeviceClass.VOLTAGE,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10012,
@@ -179,6 +211,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Phase B Voltage",
         "device_class": SensorDeviceClass.VOLTAGE,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10013,
@@ -187,6 +220,7 @@ INVERTER_SIGNALS = [
         "custom_name": "Phase C Voltage",
         "device_class": SensorDeviceClass.VOLTAGE,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10023,
@@ -195,12 +229,14 @@ INVERTER_SIGNALS = [
         "custom_name": "Temperature",
         "device_class": SensorDeviceClass.TEMPERATURE,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 10024,
         "name": "Insulation resistance",
         "unit": "MΩ",
         "custom_name": "Insulation Resistance",
+        "tier": TIER_MINUTES,
     },
 ]
 
@@ -261,12 +297,14 @@ BATTERY_STATUS_SIGNALS = [
         "name": "Battery operating status",
         "unit": "",
         "custom_name": "Operating Status",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10008,
         "name": "Charge/Discharge mode",
         "unit": "",
         "custom_name": "Charge/Discharge Mode",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10013,
@@ -275,6 +313,7 @@ BATTERY_STATUS_SIGNALS = [
         "custom_name": "Rated Capacity",
         "device_class": SensorDeviceClass.ENERGY,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_DAILY,
     },
     {
         "id": 10015,
@@ -283,6 +322,7 @@ BATTERY_STATUS_SIGNALS = [
         "custom_name": "Backup Time",
         "device_class": SensorDeviceClass.DURATION,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 10001,
@@ -291,6 +331,7 @@ BATTERY_STATUS_SIGNALS = [
         "custom_name": "Energy Charged Today",
         "device_class": SensorDeviceClass.ENERGY,
         "state_class": SensorStateClass.TOTAL,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 10002,
@@ -299,6 +340,7 @@ BATTERY_STATUS_SIGNALS = [
         "custom_name": "Energy Discharged Today",
         "device_class": SensorDeviceClass.ENERGY,
         "state_class": SensorStateClass.TOTAL,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 10004,
@@ -307,6 +349,7 @@ BATTERY_STATUS_SIGNALS = [
         "custom_name": "Charge/Discharge Power",
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10005,
@@ -315,6 +358,7 @@ BATTERY_STATUS_SIGNALS = [
         "custom_name": "Bus Voltage",
         "device_class": SensorDeviceClass.VOLTAGE,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 10006,
@@ -323,6 +367,7 @@ BATTERY_STATUS_SIGNALS = [
         "custom_name": "State of Charge",
         "device_class": SensorDeviceClass.BATTERY,
         "state_class": SensorStateClass.MEASUREMENT,
+        "tier": TIER_REALTIME,
     },
 ]
 
@@ -345,6 +390,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320459,
@@ -353,6 +399,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Working Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320275,
@@ -361,6 +408,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320146,
@@ -369,6 +417,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Software Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320463,
@@ -377,6 +426,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320473,
@@ -385,6 +435,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Charge and Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320462,
@@ -393,6 +444,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Internal Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320469,
@@ -401,6 +453,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Daily Charge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320470,
@@ -409,6 +462,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Daily Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320108,
@@ -417,6 +471,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320460,
@@ -425,6 +480,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Bus Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320461,
@@ -433,6 +489,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Bus Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320514,
@@ -441,6 +498,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] FE Connection",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320107,
@@ -449,6 +507,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Total Charge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320265,
@@ -457,6 +516,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320266,
@@ -465,6 +525,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320267,
@@ -473,6 +534,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320148,
@@ -481,6 +543,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320165,
@@ -489,6 +552,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320181,
@@ -497,6 +561,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320147,
@@ -505,6 +570,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320164,
@@ -513,6 +579,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320180,
@@ -521,6 +588,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320151,
@@ -529,6 +597,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320168,
@@ -537,6 +606,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320184,
@@ -545,6 +615,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320159,
@@ -553,6 +624,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320174,
@@ -561,6 +633,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320190,
@@ -569,6 +642,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320158,
@@ -577,6 +651,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320173,
@@ -585,6 +660,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320189,
@@ -593,6 +669,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320446,
@@ -601,6 +678,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320448,
@@ -609,6 +687,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320450,
@@ -617,6 +696,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320447,
@@ -625,6 +705,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320449,
@@ -633,6 +714,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320451,
@@ -641,6 +723,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320152,
@@ -649,6 +732,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320169,
@@ -657,6 +741,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320185,
@@ -665,6 +750,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320163,
@@ -673,6 +759,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320179,
@@ -681,6 +768,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320194,
@@ -689,6 +777,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320492,
@@ -697,6 +786,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Battery Health Check",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320493,
@@ -705,6 +795,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Battery Health Check",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320494,
@@ -713,6 +804,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Battery Health Check",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320498,
@@ -721,6 +813,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 1 Heating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320499,
@@ -729,6 +822,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 2 Heating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320500,
@@ -737,6 +831,7 @@ BATTERY_MODULE_SIGNALS_1 = [
         "custom_name": "[Module 1] Battery Pack 3 Heating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
 ]
 
@@ -748,6 +843,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320464,
@@ -756,6 +852,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Working Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320276,
@@ -764,6 +861,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320145,
@@ -772,6 +870,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Software Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320468,
@@ -780,6 +879,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320474,
@@ -788,6 +888,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Charge and Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320467,
@@ -796,6 +897,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Internal Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320471,
@@ -804,6 +906,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Daily Charge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320472,
@@ -812,6 +915,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Daily Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320115,
@@ -820,6 +924,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320465,
@@ -828,6 +933,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Bus Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320466,
@@ -836,6 +942,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Bus Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320515,
@@ -844,6 +951,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] FE Connection",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320114,
@@ -852,6 +960,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Total Charge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320268,
@@ -860,6 +969,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320269,
@@ -868,6 +978,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320270,
@@ -876,6 +987,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320196,
@@ -884,6 +996,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320211,
@@ -892,6 +1005,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320226,
@@ -900,6 +1014,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320195,
@@ -908,6 +1023,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320210,
@@ -916,6 +1032,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320225,
@@ -924,6 +1041,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320199,
@@ -932,6 +1050,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320214,
@@ -940,6 +1059,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320229,
@@ -948,6 +1068,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320205,
@@ -956,6 +1077,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320220,
@@ -964,6 +1086,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320235,
@@ -972,6 +1095,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320204,
@@ -980,6 +1104,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320219,
@@ -988,6 +1113,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320234,
@@ -996,6 +1122,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320452,
@@ -1004,6 +1131,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320454,
@@ -1012,6 +1140,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320456,
@@ -1020,6 +1149,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320453,
@@ -1028,6 +1158,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320455,
@@ -1036,6 +1167,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320457,
@@ -1044,6 +1176,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320200,
@@ -1052,6 +1185,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320215,
@@ -1060,6 +1194,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320230,
@@ -1068,6 +1203,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320209,
@@ -1076,6 +1212,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320224,
@@ -1084,6 +1221,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320239,
@@ -1092,6 +1230,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320495,
@@ -1100,6 +1239,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Battery Health Check",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320496,
@@ -1108,6 +1248,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Battery Health Check",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320497,
@@ -1116,6 +1257,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Battery Health Check",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320501,
@@ -1124,6 +1266,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 1 Heating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320502,
@@ -1132,6 +1275,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 2 Heating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320503,
@@ -1140,6 +1284,7 @@ BATTERY_MODULE_SIGNALS_2 = [
         "custom_name": "[Module 2] Battery Pack 3 Heating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
 ]
 
@@ -1151,6 +1296,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320526,
@@ -1159,6 +1305,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Working Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320536,
@@ -1167,6 +1314,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320542,
@@ -1175,6 +1323,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Software Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320529,
@@ -1183,6 +1332,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320527,
@@ -1191,6 +1341,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Charge and Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320535,
@@ -1199,6 +1350,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Internal Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320532,
@@ -1207,6 +1359,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Daily Charge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320533,
@@ -1215,6 +1368,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Daily Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320539,
@@ -1223,6 +1377,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320528,
@@ -1231,6 +1386,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Bus Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320534,
@@ -1239,6 +1395,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Bus Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320516,
@@ -1247,6 +1404,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] FE Connection",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320538,
@@ -1255,6 +1413,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Total Charge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320646,
@@ -1263,6 +1422,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320647,
@@ -1271,6 +1431,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320648,
@@ -1279,6 +1440,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320544,
@@ -1287,6 +1449,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320555,
@@ -1295,6 +1458,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320566,
@@ -1303,6 +1467,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320543,
@@ -1311,6 +1476,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320554,
@@ -1319,6 +1485,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320565,
@@ -1327,6 +1494,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320545,
@@ -1335,6 +1503,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320556,
@@ -1343,6 +1512,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320567,
@@ -1351,6 +1521,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320549,
@@ -1359,6 +1530,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320560,
@@ -1367,6 +1539,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320571,
@@ -1375,6 +1548,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320548,
@@ -1383,6 +1557,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320559,
@@ -1391,6 +1566,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320570,
@@ -1399,6 +1575,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320576,
@@ -1407,6 +1584,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320578,
@@ -1415,6 +1593,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320580,
@@ -1423,6 +1602,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320577,
@@ -1431,6 +1611,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320579,
@@ -1439,6 +1620,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320581,
@@ -1447,6 +1629,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320546,
@@ -1455,6 +1638,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 Capacity",
         "device_class": None,
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320557,
@@ -1463,6 +1647,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 Capacity",
         "device_class": None,
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320568,
@@ -1471,6 +1656,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 Capacity",
         "device_class": None,
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320552,
@@ -1479,6 +1665,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320563,
@@ -1487,6 +1674,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320574,
@@ -1495,6 +1683,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320553,
@@ -1503,6 +1692,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320564,
@@ -1511,6 +1701,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320575,
@@ -1519,6 +1710,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320504,
@@ -1527,6 +1719,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 1 High Voltage Fuse Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320505,
@@ -1535,6 +1728,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 2 High Voltage Fuse Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320506,
@@ -1543,6 +1737,7 @@ BATTERY_MODULE_SIGNALS_3 = [
         "custom_name": "[Module 3] Battery Pack 3 High Voltage Fuse Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
 ]
 
@@ -1554,6 +1749,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320583,
@@ -1562,6 +1758,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Working Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320593,
@@ -1570,6 +1767,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320599,
@@ -1578,6 +1776,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Software Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320586,
@@ -1586,6 +1785,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320584,
@@ -1594,6 +1794,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Charge and Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320592,
@@ -1602,6 +1803,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Internal Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320589,
@@ -1610,6 +1812,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Daily Charge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320590,
@@ -1618,6 +1821,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Daily Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320596,
@@ -1626,6 +1830,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Total Discharge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320585,
@@ -1634,6 +1839,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Bus Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320591,
@@ -1642,6 +1848,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Bus Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320517,
@@ -1650,6 +1857,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] FE Connection",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320595,
@@ -1658,6 +1866,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Total Charge Energy",
         "device_class": "energy",
         "state_class": "total_increasing",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320649,
@@ -1666,6 +1875,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320650,
@@ -1674,6 +1884,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320651,
@@ -1682,6 +1893,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 No.",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320601,
@@ -1690,6 +1902,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320612,
@@ -1698,6 +1911,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320623,
@@ -1706,6 +1920,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 Firmware Version",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320600,
@@ -1714,6 +1929,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320611,
@@ -1722,6 +1938,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320622,
@@ -1730,6 +1947,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 SN",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_DAILY,
     },
     {
         "id": 230320602,
@@ -1738,6 +1956,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320613,
@@ -1746,6 +1965,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320624,
@@ -1754,6 +1974,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 Operating Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320606,
@@ -1762,6 +1983,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320617,
@@ -1770,6 +1992,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320628,
@@ -1778,6 +2001,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 Voltage",
         "device_class": "voltage",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320605,
@@ -1786,6 +2010,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320616,
@@ -1794,6 +2019,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320627,
@@ -1802,6 +2028,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 Charge/Discharge Power",
         "device_class": "power",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320633,
@@ -1810,6 +2037,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320635,
@@ -1818,6 +2046,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320637,
@@ -1826,6 +2055,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 Maximum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320634,
@@ -1834,6 +2064,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320636,
@@ -1842,6 +2073,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320638,
@@ -1850,6 +2082,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 Minimum Temperature",
         "device_class": "temperature",
         "state_class": "measurement",
+        "tier": TIER_MINUTES,
     },
     {
         "id": 230320603,
@@ -1858,6 +2091,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 Capacity",
         "device_class": None,
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320614,
@@ -1866,6 +2100,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 Capacity",
         "device_class": None,
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320625,
@@ -1874,6 +2109,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 Capacity",
         "device_class": None,
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320609,
@@ -1882,6 +2118,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320620,
@@ -1890,6 +2127,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320631,
@@ -1898,6 +2136,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 Current",
         "device_class": "current",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320610,
@@ -1906,6 +2145,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320621,
@@ -1914,6 +2154,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320632,
@@ -1922,6 +2163,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 SOC",
         "device_class": "battery",
         "state_class": "measurement",
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320507,
@@ -1930,6 +2172,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 1 High Voltage Fuse Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320508,
@@ -1938,6 +2181,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 2 High Voltage Fuse Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
     {
         "id": 230320509,
@@ -1946,6 +2190,7 @@ BATTERY_MODULE_SIGNALS_4 = [
         "custom_name": "[Module 4] Battery Pack 3 High Voltage Fuse Status",
         "device_class": None,
         "state_class": None,
+        "tier": TIER_REALTIME,
     },
 ]
 
@@ -1970,128 +2215,15 @@ async def async_setup_entry(hass, entry, async_add_entities):
         "via_device": None,
     }
 
-    async def async_get_data():
-        client = hass.data[DOMAIN][entry.entry_id]
-        username = entry.data["username"]
-        password = entry.data["password"]
-        subdomain = entry.data.get("subdomain", "uni001eu5")
-
-        async def ensure_logged_in(client_instance):
-            try:
-                is_active = await hass.async_add_executor_job(
-                    client_instance.is_session_active
-                )
-                if not is_active:
-                    await hass.async_add_executor_job(client_instance._login)
-
-                    is_active = await hass.async_add_executor_job(
-                        client_instance.is_session_active
-                    )
-                    if not is_active:
-                        raise Exception("Login completed but session still not active")
-
-                return True
-            except Exception:
-                return False
-
-        async def create_new_client():
-            new_client = await hass.async_add_executor_job(
-                partial(
-                    FusionSolarClient,
-                    username,
-                    password,
-                    captcha_model_path=hass,
-                    huawei_subdomain=subdomain,
-                )
-            )
-
-            if await hass.async_add_executor_job(new_client.is_session_active):
-                hass.data[DOMAIN][entry.entry_id] = new_client
-                return new_client
-            return None
-
-        if not await ensure_logged_in(client):
-            client = await create_new_client()
-
-        max_retries = 2
-
-        for attempt in range(max_retries + 1):
-            try:
-                if device_type == "Inverter":
-                    response = await hass.async_add_executor_job(
-                        client.get_real_time_data, device_id
-                    )
-                elif device_type == "Plant":
-                    response = await hass.async_add_executor_job(
-                        client.get_current_plant_data, device_id
-                    )
-                elif device_type == "Battery":
-                    response = await hass.async_add_executor_job(
-                        client.get_battery_status, device_id
-                    )
-                    module_data = {}
-                    for module_id in ["1", "2", "3", "4"]:
-                        stats = await hass.async_add_executor_job(
-                            client.get_battery_module_stats, device_id, module_id
-                        )
-                        if stats:
-                            module_data[module_id] = stats
-                    response = {"battery": response, "modules": module_data}
-                elif device_type == "Flow":
-                    response = await hass.async_add_executor_job(
-                        client.get_plant_flow, device_id
-                    )
-                    response = {"flow": response}
-
-                else:
-                    raise Exception("Unsupported device type")
-
-                if response is None:
-                    raise Exception("API returned None response")
-
-                return response
-
-            except Exception as err:
-                if attempt < max_retries:
-                    recovery_success = False
-
-                    try:
-                        await hass.async_add_executor_job(client._login)
-
-                        if await hass.async_add_executor_job(client.is_session_active):
-                            recovery_success = True
-                        return None
-
-                    except Exception:
-                        pass
-
-                    if not recovery_success:
-                        try:
-                            client = await create_new_client()
-                            recovery_success = True
-                        except Exception:
-                            pass
-
-                    if recovery_success:
-                        await asyncio.sleep(2)
-                    else:
-                        await asyncio.sleep(1)
-                else:
-                    raise UpdateFailed(
-                        f"Error fetching data after {max_retries + 1} attempts: {err}"
-                    )
-
-        raise UpdateFailed("Unexpected end of retry loop")
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=f"{device_name} FusionSolar Data",
-        update_method=async_get_data,
-        update_interval=timedelta(seconds=15),
+    stale_data_max_age = timedelta(
+        minutes=entry.options.get(CONF_STALE_DATA_MINUTES, DEFAULT_STALE_DATA_MINUTES)
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = get_account_coordinator(hass, entry)
+    device_key = await coordinator.async_add_device(
+        device_type, device_id, stale_data_max_age
+    )
+    entry.async_on_unload(lambda: coordinator.async_remove_device(device_key))
 
     if device_type == "Inverter":
         signals = INVERTER_SIGNALS
@@ -2121,17 +2253,19 @@ async def async_setup_entry(hass, entry, async_add_entities):
         if unique_id not in unique_ids:
             entity = entity_class(
                 coordinator,
+                device_key,
                 signal[id_key],
                 signal.get("custom_name", signal["name"]),
                 signal["unit"],
                 device_info,
                 signal.get("device_class"),
                 signal.get("state_class"),
+                signal.get("tier", TIER_REALTIME),
             )
             entities.append(entity)
             unique_ids.add(unique_id)
 
-    modules_data = coordinator.data.get("modules", {})
+    modules_data = coordinator.data[device_key].get("modules", {})
     for module_id, module_signals in MODULE_SIGNAL_MAP.items():
         module_signals_data = modules_data.get(module_id)
         if not module_signals_data:
@@ -2156,6 +2290,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
             if unique_id not in unique_ids:
                 entity = FusionSolarBatteryModuleSensor(
                     coordinator,
+                    device_key,
                     signal["id"],
                     signal.get("custom_name", signal["name"]),
                     signal["unit"],
@@ -2163,6 +2298,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
                     module_id,
                     signal.get("device_class"),
                     signal.get("state_class"),
+                    signal.get("tier", TIER_REALTIME),
                 )
                 entities.append(entity)
                 unique_ids.add(unique_id)
@@ -2171,54 +2307,97 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(entities)
 
 
+class FusionSolarSensor(CoordinatorEntity, SensorEntity):
+    """Base class for sensors reading the slice of their device from the
+    account coordinator. The device key is used as coordinator context."""
+
+    _last_written_state = None
+
+    # key of the signal in the device snapshot and its refresh tier
+    _signal_key = None
+    _tier = TIER_REALTIME
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        # disabled entities are never added, so their signals are not requested
+        self.async_on_remove(
+            self.coordinator.async_subscribe_signal(
+                self.coordinator_context, self._signal_key, self._tier
+            )
+        )
+
+    @callback
+    def _handle_coordinator_update(self):
+        # static values like SN or rated capacity rarely change, so only write
+        # the state if anything visible changed since the last write
+        written_state = (
+            self.available,
+            self.state,
+            self.native_unit_of_measurement,
+            self.extra_state_attributes,
+        )
+        if written_state == self._last_written_state:
+            return
+        self._last_written_state = written_state
+        self.async_write_ha_state()
+
+    @property
+    def device_data(self):
+        data = self.coordinator.data
+        if not data:
+            return None
+        return data.get(self.coordinator_context)
+
+    @property
+    def extra_state_attributes(self):
+        # only present while the last data is served because updates fail
+        data_age = self.coordinator.data_age(self.coordinator_context)
+        if data_age is None:
+            return None
+        return {"data_age": round(data_age)}
+
+    @property
+    def snapshot(self):
+        """The parsed values of the device indexed by signal"""
+        return self.coordinator.snapshots.get(self.coordinator_context) or {}
+
+    @property
+    def available(self):
+        return self.coordinator.last_update_success and self.device_data is not None
+
+
 #
 #   Inverter
 #
 
 
-class FusionSolarInverterSensor(CoordinatorEntity, SensorEntity):
+class FusionSolarInverterSensor(FusionSolarSensor):
     def __init__(
         self,
         coordinator,
+        device_key,
         signal_id,
         name,
         unit,
         device_info,
         device_class=None,
         state_class=None,
+        tier=TIER_REALTIME,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=device_key)
         self._signal_id = signal_id
+        self._signal_key = signal_id
         self._attr_name = name
         self._attr_native_unit_of_measurement = unit
         self._attr_device_info = device_info
         self._attr_unique_id = f"{list(device_info['identifiers'])[0][1]}_{signal_id}"
         self._attr_device_class = device_class
         self._attr_state_class = state_class
+        self._tier = tier
 
     @property
     def state(self):
-        data = self.coordinator.data
-        if not data:
-            return None
-        for group in data.get("data", []):
-            if "signals" in group:
-                for signal in group["signals"]:
-                    if signal["id"] == self._signal_id:
-                        if signal.get("unit"):
-                            try:
-                                return float(signal.get("value"))
-                            except (TypeError, ValueError):
-                                return None
-                        else:
-                            return signal.get("value")
-        return None
-
-    @property
-    def available(self):
-        return (
-            self.coordinator.last_update_success and self.coordinator.data is not None
-        )
+        return self.snapshot.get(self._signal_id)
 
 
 #
@@ -2226,31 +2405,35 @@ class FusionSolarInverterSensor(CoordinatorEntity, SensorEntity):
 #
 
 
-class FusionSolarPlantSensor(CoordinatorEntity, SensorEntity):
+class FusionSolarPlantSensor(FusionSolarSensor):
     def __init__(
         self,
         coordinator,
+        device_key,
         key,
         name,
         unit,
         device_info,
         device_class=None,
         state_class=None,
+        tier=TIER_REALTIME,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=device_key)
         self._key = key
+        self._signal_key = key
         self._attr_name = name
         self._base_unit = unit
         self._attr_device_info = device_info
         self._attr_unique_id = f"{list(device_info['identifiers'])[0][1]}_{key}"
         self._attr_device_class = device_class
         self._attr_state_class = state_class
+        self._tier = tier
 
     @property
     def native_unit_of_measurement(self):
         # set currency unit dynamically from api
         if self._key == "dailyIncome":
-            data = self.coordinator.data
+            data = self.device_data
             if data:
                 currency_num = data.get("currency")
                 if currency_num:
@@ -2259,7 +2442,7 @@ class FusionSolarPlantSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def state(self):
-        data = self.coordinator.data
+        data = self.device_data
         if not data:
             return None
         value = data.get(self._key)
@@ -2273,70 +2456,46 @@ class FusionSolarPlantSensor(CoordinatorEntity, SensorEntity):
         else:
             return value
 
-    @property
-    def available(self):
-        return (
-            self.coordinator.last_update_success and self.coordinator.data is not None
-        )
-
 
 #
 #   Battery
 #
 
 
-class FusionSolarBatterySensor(CoordinatorEntity, SensorEntity):
+class FusionSolarBatterySensor(FusionSolarSensor):
     def __init__(
         self,
         coordinator,
+        device_key,
         signal_id,
         name,
         unit,
         device_info,
         device_class=None,
         state_class=None,
+        tier=TIER_REALTIME,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=device_key)
         self._signal_id = signal_id
+        self._signal_key = signal_id
         self._attr_name = name
         self._attr_native_unit_of_measurement = unit
         self._attr_device_info = device_info
         self._attr_unique_id = f"{list(device_info['identifiers'])[0][1]}_{signal_id}"
         self._attr_device_class = device_class
         self._attr_state_class = state_class
+        self._tier = tier
 
     @property
     def state(self):
-        data = self.coordinator.data
-        if not data:
-            return None
-
-        signals = data.get("battery", [])
-        if not signals:
-            return None
+        return self.snapshot.get(self._signal_id)
 
-        for signal in signals:
-            if signal["id"] == self._signal_id:
-                if signal.get("unit"):
-                    try:
-                        return float(signal.get("value"))
-                    except (TypeError, ValueError):
-                        return None
-                else:
-                    return signal.get("value")
-        return None
 
-    @property
-    def available(self):
-        return (
-            self.coordinator.last_update_success and self.coordinator.data is not None
-        )
-
-
-class FusionSolarBatteryModuleSensor(CoordinatorEntity, SensorEntity):
+class FusionSolarBatteryModuleSensor(FusionSolarSensor):
     def __init__(
         self,
         coordinator,
+        device_key,
         signal_id,
         name,
         unit,
@@ -2344,9 +2503,11 @@ class FusionSolarBatteryModuleSensor(CoordinatorEntity, SensorEntity):
         module_id,
         device_class=None,
         state_class=None,
+        tier=TIER_REALTIME,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=device_key)
         self._signal_id = signal_id
+        self._signal_key = signal_id
         self._attr_name = name
         self._attr_native_unit_of_measurement = unit
         self._attr_device_info = device_info
@@ -2355,25 +2516,17 @@ class FusionSolarBatteryModuleSensor(CoordinatorEntity, SensorEntity):
         )
         self._attr_device_class = device_class
         self._attr_state_class = state_class
+        self._tier = tier
         self._module_id = module_id
+        self._signal_key = (module_id, signal_id)
 
     @property
     def state(self):
-        data = self.coordinator.data
-        if not data or "modules" not in data:
-            return None
-        module_signals = data["modules"].get(self._module_id, [])
-        for signal in module_signals:
-            if signal["id"] == self._signal_id:
-                try:
-                    return float(signal.get("realValue"))
-                except (TypeError, ValueError):
-                    return signal.get("realValue")
-        return None
+        return self.snapshot.get(self._signal_key)
 
     @property
     def available(self):
-        data = self.coordinator.data
+        data = self.device_data
         return (
             self.coordinator.last_update_success
             and data is not None
@@ -2388,51 +2541,31 @@ class FusionSolarBatteryModuleSensor(CoordinatorEntity, SensorEntity):
 #
 
 
-class FusionSolarFlowSensor(CoordinatorEntity, SensorEntity):
+class FusionSolarFlowSensor(FusionSolarSensor):
     def __init__(
         self,
         coordinator,
+        device_key,
         key,
         name,
         unit,
         device_info,
         device_class=None,
         state_class=None,
+        tier=TIER_REALTIME,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=device_key)
         self._key = key
+        self._signal_key = key
         self._attr_name = name
         self._attr_native_unit_of_measurement = unit
         self._attr_device_info = device_info
         self._attr_unique_id = f"{list(device_info['identifiers'])[0][1]}_{key}"
         self._attr_device_class = device_class
         self._attr_state_class = state_class
+        self._tier = tier
 
     @property
     def state(self):
-        data = self.coordinator.data
-        if not data or "flow" not in data:
-            return None
-
-        flow_data = data["flow"]
-        if "data" not in flow_data or "flow" not in flow_data["data"]:
-            return None
-
-        nodes = flow_data["data"]["flow"].get("nodes", [])
-
         # Look for the electrical load node
-        for node in nodes:
-            if node.get("name") == "neteco.pvms.KPI.kpiView.electricalLoad":
-                value = node.get("value")
-                if value is not None:
-                    try:
-                        return float(value)
-                    except (TypeError, ValueError):
-                        return None
-        return None
-
-    @property
-    def available(self):
-        return (
-            self.coordinator.last_update_success and self.coordinator.data is not None
-        )
+        return self.snapshot.get("neteco.pvms.KPI.kpiView.electricalLoad")
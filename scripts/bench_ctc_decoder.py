@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Compares the numpy CTC prefix beam search with the pure Python one it
+replaced on outputs shaped like those of the captcha model.
+
+The outputs are generated from random label sequences. The logit of the label
+of each time step is --margin above the others, which are blurred by --noise.
+A large margin and no noise give confident outputs which take the greedy path,
+a small margin and more noise give uncertain outputs which need the beam
+search on every time step. The outputs are also decoded in one batch.
+
+    python scripts/bench_ctc_decoder.py --beam-size 10 --margin 6 --noise 2
+"""
+
+import argparse
+import collections
+import math
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "custom_components",
+        "fusionsolarplus",
+        "api",
+    ),
+)
+
+from fusion_solar_py.ctc_decoder import decode, decode_batch  # noqa: E402
+
+NEG_INF = -float("inf")
+
+
+def logsumexp(*args):
+    if all(a == NEG_INF for a in args):
+        return NEG_INF
+    a_max = max(args)
+    return a_max + math.log(sum(math.exp(a - a_max) for a in args))
+
+
+def decode_reference(probs, beam_size=100, blank=0):
+    """The previous pure Python prefix beam search"""
+    T, S = probs.shape
+    with np.errstate(divide="ignore"):
+        probs = np.log(probs)
+    beam = [(tuple(), (0.0, NEG_INF))]
+
+    for t in range(T):
+        next_beam = collections.defaultdict(lambda: (NEG_INF, NEG_INF))
+        for s in range(S):
+            p = probs[t, s]
+            for prefix, (p_b, p_nb) in beam:
+                if s == blank:
+                    n_p_b, n_p_nb = next_beam[prefix]
+                    n_p_b = logsumexp(n_p_b, p_b + p, p_nb + p)
+                    next_beam[prefix] = (n_p_b, n_p_nb)
+                    continue
+                end_t = prefix[-1] if prefix else None
+                n_prefix = prefix + (s,)
+                n_p_b, n_p_nb = next_beam[n_prefix]
+                if s != end_t:
+                    n_p_nb = logsumexp(n_p_nb, p_b + p, p_nb + p)
+                else:
+                    n_p_nb = logsumexp(n_p_nb, p_b + p)
+                next_beam[n_prefix] = (n_p_b, n_p_nb)
+                if s == end_t:
+                    n_p_b, n_p_nb = next_beam[prefix]
+                    n_p_nb = logsumexp(n_p_nb, p_nb + p)
+                    next_beam[prefix] = (n_p_b, n_p_nb)
+
+        beam = sorted(next_beam.items(), key=lambda x: logsumexp(*x[1]), reverse=True)
+        beam = beam[:beam_size]
+
+    best = beam[0]
+    return best[0], -logsumexp(*best[1])
+
+
+def make_output(rng, time_steps, labels, length, margin, noise):
+    """Softmax output of a model reading a captcha of the given length, with
+    the blank as the last label"""
+    blank = labels - 1
+    path = np.full(time_steps, blank)
+    starts = np.sort(rng.choice(time_steps // 2, length, replace=False)) * 2
+    for start, label in zip(starts, rng.integers(0, blank, length)):
+        path[start : start + 2] = label
+    logits = rng.normal(0, noise, (time_steps, labels))
+    logits[np.arange(time_steps), path] += margin
+    probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+def bench(func, outputs, beam_size, blank, repeat):
+    """Decodes every output, timing the fastest of repeat runs"""
+    times = []
+    results = []
+    for probs in outputs:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func(probs, beam_size=beam_size, blank=blank)
+            best = min(best, time.perf_counter() - start)
+        results.append(result)
+        times.append(best)
+    return results, statistics.median(times) * 1000, max(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--time-steps", type=int, default=50)
+    parser.add_argument("--labels", type=int, default=24)
+    parser.add_argument("--length", type=int, default=4)
+    parser.add_argument("--beam-size", type=int, default=10)
+    parser.add_argument("--margin", type=float, default=10.0)
+    parser.add_argument("--noise", type=float, default=1.5)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    blank = args.labels - 1
+    outputs = [
+        make_output(
+            rng, args.time_steps, args.labels, args.length, args.margin, args.noise
+        )
+        for _ in range(args.samples)
+    ]
+
+    reference, ref_median, ref_max = bench(
+        decode_reference, outputs, args.beam_size, blank, 1
+    )
+    numpy_results, np_median, np_max = bench(
+        decode, outputs, args.beam_size, blank, args.repeat
+    )
+
+    same = sum(a[0] == b[0] for a, b in zip(reference, numpy_results))
+    score_diff = max(abs(a[1] - b[1]) for a, b in zip(reference, numpy_results))
+    print(f"reference median {ref_median:8.3f} ms  max {ref_max:8.3f} ms")
+    print(f"numpy     median {np_median:8.3f} ms  max {np_max:8.3f} ms")
+    print(
+        f"same labels for {same}/{len(outputs)} outputs, "
+        f"max score difference {score_diff:.2e}"
+    )
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        decode_batch(outputs, beam_size=args.beam_size, blank=blank, top_k=3)
+        best = min(best, time.perf_counter() - start)
+    print(
+        f"numpy batch of {len(outputs)} with top 3: "
+        f"{best * 1000:.3f} ms, {best * 1000 / len(outputs):.3f} ms per output"
+    )
+
+
+if __name__ == "__main__":
+    main()
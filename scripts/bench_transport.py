@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Compares the per-request latency of a default requests.Session with the
+FusionSolar transport against a local mock server.
+
+The mock server sleeps for --connect-delay on every new connection to stand in
+for the TCP and TLS handshake with the cloud, so every connection that is not
+reused shows up in the latency.
+
+    python scripts/bench_transport.py --concurrency 16 --requests 2000
+"""
+
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import ssl
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "custom_components",
+        "fusionsolarplus",
+        "api",
+    ),
+)
+
+from fusion_solar_py.transport import mount_adapter  # noqa: E402
+
+# roughly the size of a device-realtime-data response
+PAYLOAD = json.dumps(
+    {
+        "success": True,
+        "data": [
+            {
+                "signals": [
+                    {"id": i, "name": f"Signal {i}", "value": "1.23", "unit": "kW"}
+                    for i in range(200)
+                ]
+            }
+        ],
+    }
+).encode()
+PAYLOAD_GZIP = gzip.compress(PAYLOAD)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connect_delay = 0.0
+    # multiprocessing.Value counting the accepted connections
+    connections = None
+
+    def setup(self):
+        with self.connections.get_lock():
+            self.connections.value += 1
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        body = PAYLOAD
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = PAYLOAD_GZIP
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, connect_delay, connections):
+    """Runs the mock server, in its own process to not compete with the client
+    for the GIL"""
+    MockHandler.connect_delay = connect_delay
+    MockHandler.connections = connections
+    server = ThreadingHTTPServer(("127.0.0.1", port.value), MockHandler)
+    server.daemon_threads = True
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def run(session, url, concurrency, count, connections):
+    with connections.get_lock():
+        connections.value = 0
+
+    def fetch(_):
+        start = time.perf_counter()
+        r = session.get(url, timeout=10)
+        r.json()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = sorted(executor.map(fetch, range(count)))
+    session.close()
+
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "connections": connections.value,
+    }
+
+
+def bench_tls_context(count):
+    """Time spent per new TLS connection to set up its context, which the
+    shared context of the transport saves"""
+    start = time.perf_counter()
+    for _ in range(count):
+        context = ssl.create_default_context()
+        context.load_verify_locations(requests.certs.where())
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--connect-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    port = multiprocessing.Value("i", 0)
+    connections = multiprocessing.Value("i", 0)
+    server = multiprocessing.Process(
+        target=serve, args=(port, args.connect_delay, connections), daemon=True
+    )
+    server.start()
+    while port.value == 0:
+        time.sleep(0.01)
+    url = f"http://127.0.0.1:{port.value}/realtime"
+
+    default_session = requests.Session()
+    tuned_session = requests.Session()
+    mount_adapter(tuned_session, args.concurrency)
+    tuned_session.mount("http://", tuned_session.get_adapter("https://"))
+
+    for name, session in (("default", default_session), ("tuned", tuned_session)):
+        result = run(session, url, args.concurrency, args.requests, connections)
+        print(
+            f"{name:8} mean {result['mean_ms']:7.2f} ms  p50 {result['p50_ms']:7.2f} ms  "
+            f"p95 {result['p95_ms']:7.2f} ms  connections {result['connections']}"
+        )
+
+    print(f"CA bundle load per new TLS connection: {bench_tls_context(50):.2f} ms")
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from custom_components.fusionsolarplus.api.fusion_solar_py import captcha_solver
+from custom_components.fusionsolarplus.api.fusion_solar_py.exceptions import (
+    FusionSolarException,
+)
+
+PACKAGE = "custom_components.fusionsolarplus.api.fusion_solar_py"
+
+
+class LocalSolver:
+    """Stands in for the ONNX solver, loading blocks while loading is set"""
+
+    loading = None
+    loads = []
+    broken = {"missing.onnx"}
+
+    def __init__(self, model_path, device):
+        if model_path in self.broken:
+            raise FusionSolarException("Captcha model not found")
+        self.loads.append(model_path)
+        if self.loading is not None:
+            self.loading.wait(5)
+
+
+class RemoteSolver:
+    def __init__(self, model_path):
+        self.model_path = model_path
+
+
+@pytest.fixture(autouse=True)
+def solvers(monkeypatch):
+    monkeypatch.setattr(captcha_solver, "_solvers", {})
+    monkeypatch.setattr(captcha_solver, "_load_locks", {})
+    monkeypatch.setattr(captcha_solver, "_retry_at", {})
+    monkeypatch.setattr(LocalSolver, "loading", None)
+    monkeypatch.setattr(LocalSolver, "loads", [])
+    monkeypatch.setattr(LocalSolver, "broken", {"missing.onnx"})
+    for name, solver in (
+        ("captcha_solver_onnx", LocalSolver),
+        ("captcha_solver_remote", RemoteSolver),
+    ):
+        module = types.ModuleType(f"{PACKAGE}.{name}")
+        module.Solver = solver
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+
+
+def test_local_solver_is_shared():
+    solver = captcha_solver.get_solver("model.onnx")
+
+    assert isinstance(solver, LocalSolver)
+    assert captcha_solver.get_solver("model.onnx") is solver
+    assert captcha_solver.get_solver("model.onnx", ["CUDAExecutionProvider"]) is not (
+        solver
+    )
+
+
+def test_remote_fallback_is_shared():
+    first = captcha_solver.get_solver("missing.onnx")
+
+    assert isinstance(first, RemoteSolver)
+    assert captcha_solver.get_solver("missing.onnx") is first
+    assert captcha_solver.get_solver("missing.onnx", ["CUDAExecutionProvider"]) is (
+        first
+    )
+
+
+def test_failed_model_is_tried_again_later(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(captcha_solver.time, "monotonic", lambda: now[0])
+    LocalSolver.broken.add("model.onnx")
+    remote = captcha_solver.get_solver("model.onnx")
+
+    # the model is repaired, but only tried again after the retry interval
+    LocalSolver.broken.clear()
+    assert captcha_solver.get_solver("model.onnx") is remote
+    assert not LocalSolver.loads
+
+    now[0] += captcha_solver.LOCAL_RETRY_INTERVAL
+    solver = captcha_solver.get_solver("model.onnx")
+
+    assert isinstance(solver, LocalSolver)
+    assert captcha_solver.get_solver("model.onnx") is solver
+
+
+def test_loading_a_model_does_not_block_other_models():
+    LocalSolver.loading = threading.Event()
+    slow = threading.Thread(target=captcha_solver.get_solver, args=("slow.onnx",))
+    slow.start()
+    try:
+        # the slow model is still loading, the fallback is returned right away
+        start = time.monotonic()
+        assert isinstance(captcha_solver.get_solver("missing.onnx"), RemoteSolver)
+        assert time.monotonic() - start < 1
+    finally:
+        LocalSolver.loading.set()
+        slow.join()
+    assert LocalSolver.loads == ["slow.onnx"]
+
+
+def test_concurrent_callers_share_one_load():
+    LocalSolver.loading = threading.Event()
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(captcha_solver.get_solver("model.onnx"))
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    LocalSolver.loading.set()
+    for thread in threads:
+        thread.join()
+
+    assert LocalSolver.loads == ["model.onnx"]
+    assert len(results) == 4
+    assert all(solver is results[0] for solver in results)
+
+
+def test_local_solver_needs_the_model(tmp_path):
+    assert not captcha_solver.local_solver_available(str(tmp_path / "missing.onnx"))
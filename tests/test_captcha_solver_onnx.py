@@ -0,0 +1,161 @@
+import importlib
+import sys
+import types
+from io import BytesIO
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from custom_components.fusionsolarplus.api.fusion_solar_py.exceptions import (
+    FusionSolarException,
+)
+
+Image = pytest.importorskip("PIL.Image")
+
+MODULE = "custom_components.fusionsolarplus.api.fusion_solar_py.captcha_solver_onnx"
+
+
+class InferenceSession:
+    """Stands in for onnxruntime, runs return the probabilities in output"""
+
+    input_shape = ["batch", 200, 60, 1]
+    output_shape = ["batch", 50, 24]
+    metadata = {}
+    output = None
+
+    def __init__(self, model_path, sess_options, providers):
+        self.runs = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="image", shape=self.input_shape)]
+
+    def get_outputs(self):
+        return [SimpleNamespace(name="output", shape=self.output_shape)]
+
+    def get_modelmeta(self):
+        return SimpleNamespace(custom_metadata_map=self.metadata)
+
+    def run(self, output_names, feeds):
+        self.runs.append(feeds)
+        return [self.output]
+
+
+@pytest.fixture
+def onnx(monkeypatch):
+    """The ONNX solver module, imported against a stubbed onnxruntime"""
+    ort = types.ModuleType("onnxruntime")
+    ort.SessionOptions = SimpleNamespace
+    ort.InferenceSession = InferenceSession
+    monkeypatch.setitem(sys.modules, "onnxruntime", ort)
+    monkeypatch.delitem(sys.modules, MODULE, raising=False)
+    module = importlib.import_module(MODULE)
+    monkeypatch.setitem(sys.modules, MODULE, module)
+    package = sys.modules[MODULE.rpartition(".")[0]]
+    monkeypatch.setattr(package, "captcha_solver_onnx", module, raising=False)
+    return module
+
+
+@pytest.fixture
+def model(tmp_path):
+    path = tmp_path / "captcha.onnx"
+    path.write_bytes(b"")
+    return str(path)
+
+
+def probabilities(*steps, labels=24):
+    """One batch of time steps, each step is {label: probability}"""
+    probs = np.zeros((1, len(steps), labels), dtype=np.float32)
+    for t, step in enumerate(steps):
+        for label, p in step.items():
+            probs[0, t, label] = p
+    return probs
+
+
+def png(width, height, white):
+    img = Image.new("L", (width, height), 0)
+    img.putpixel(white, 255)
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_image_is_fed_column_by_column(onnx, model, monkeypatch):
+    solver = onnx.Solver(model)
+    monkeypatch.setattr(InferenceSession, "output", probabilities({23: 1.0}))
+
+    solver.solve_captcha(png(200, 60, white=(10, 5)))
+
+    pixels = solver._session.runs[0]["image"]
+    assert pixels.shape == (1, 200, 60, 1)
+    assert pixels.dtype == np.float32
+    # x is the first axis, y the second
+    assert pixels[0, 10, 5, 0] == 1.0
+    assert pixels.sum() == 1.0
+
+
+def test_labels_map_to_the_alphabet_with_the_blank_last(onnx, model, monkeypatch):
+    solver = onnx.Solver(model)
+    # "2", "2" merged, blank, "2", "y"
+    monkeypatch.setattr(
+        InferenceSession,
+        "output",
+        probabilities({0: 1.0}, {0: 1.0}, {23: 1.0}, {0: 1.0}, {22: 1.0}),
+    )
+
+    assert solver.solve_captcha(png(200, 60, white=(0, 0))) == "22y"
+
+
+def test_model_metadata_overrides_the_alphabet(onnx, model, monkeypatch):
+    monkeypatch.setattr(InferenceSession, "metadata", {"alphabet": "ab"})
+    monkeypatch.setattr(InferenceSession, "output_shape", ["batch", 50, 3])
+    solver = onnx.Solver(model)
+    monkeypatch.setattr(
+        InferenceSession,
+        "output",
+        probabilities({1: 1.0}, {2: 1.0}, {0: 1.0}, labels=3),
+    )
+
+    assert solver.solve_captcha(png(200, 60, white=(0, 0))) == "ba"
+
+
+def test_candidates_are_ordered_by_likelihood(onnx, model, monkeypatch):
+    solver = onnx.Solver(model)
+    monkeypatch.setattr(
+        InferenceSession,
+        "output",
+        probabilities({0: 1.0}, {23: 1.0}, {1: 0.7, 2: 0.3}, {23: 1.0}),
+    )
+
+    candidates = solver.solve_captcha_candidates(png(200, 60, white=(0, 0)), 2)
+
+    assert candidates == ["23", "24"]
+
+
+def test_dynamic_input_size_uses_the_default(onnx, model, monkeypatch):
+    monkeypatch.setattr(InferenceSession, "input_shape", ["batch", "width", None, 1])
+    solver = onnx.Solver(model)
+
+    assert (solver._width, solver._height) == (onnx.IMAGE_WIDTH, onnx.IMAGE_HEIGHT)
+
+
+@pytest.mark.parametrize(
+    ("attribute", "value"),
+    [
+        ("input_shape", ["batch", 200, 60]),
+        ("input_shape", ["batch", 200, 60, 3]),
+        ("input_shape", None),
+        ("output_shape", ["batch", 50, 30]),
+        ("metadata", None),
+    ],
+)
+def test_unsupported_model_raises(onnx, model, monkeypatch, attribute, value):
+    monkeypatch.setattr(InferenceSession, attribute, value)
+
+    with pytest.raises(FusionSolarException):
+        onnx.Solver(model)
+
+
+def test_missing_model_raises(onnx, tmp_path):
+    with pytest.raises(FusionSolarException):
+        onnx.Solver(str(tmp_path / "missing.onnx"))
@@ -0,0 +1,227 @@
+import json
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.fusionsolarplus.api.fusion_solar_py import (
+    client as client_module,
+)
+from custom_components.fusionsolarplus.api.fusion_solar_py.async_client import (
+    AsyncFusionSolarClient,
+    logged_in,
+)
+from custom_components.fusionsolarplus.api.fusion_solar_py.client import (
+    FusionSolarClient,
+    _unexpected_response,
+)
+from custom_components.fusionsolarplus.api.fusion_solar_py.exceptions import (
+    NoDataException,
+)
+
+
+class FakeClient:
+    """Just enough of a client for logged_in, with a session known to be alive"""
+
+    _login_generation = 0
+
+    def _is_session_cached(self):
+        return True
+
+    def _mark_session_active(self):
+        pass
+
+    def _invalidate_session_cache(self):
+        pass
+
+    @logged_in
+    async def get_data(self, response):
+        with _unexpected_response():
+            return response["data"]["list"]
+
+    @logged_in
+    async def broken(self):
+        # a bug in the client, not in the response
+        return len(self._login_generation)
+
+
+@pytest.mark.parametrize("response", [{}, {"data": None}, [], {"data": []}])
+@pytest.mark.asyncio
+async def test_missing_response_fields_raise_no_data(response):
+    with pytest.raises(NoDataException):
+        await FakeClient().get_data(response)
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_mistaken_for_missing_data():
+    with pytest.raises(TypeError):
+        await FakeClient().broken()
+
+
+@pytest.mark.asyncio
+async def test_key_errors_outside_the_response_propagate():
+    client = FakeClient()
+    client._is_session_cached = lambda: {}["expired"]
+    with pytest.raises(KeyError):
+        await client.get_data({"data": {"list": []}})
+
+
+class SyncResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self, parse_float=None):
+        return json.loads(json.dumps(self._payload), parse_float=parse_float)
+
+
+class AsyncResponse:
+    def __init__(self, payload):
+        self.status = 200
+        self._payload = payload
+
+    async def json(self, content_type, loads=json.loads):
+        return loads(json.dumps(self._payload))
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """Both clients with a live session, answering every request with the
+    response of the test and recording the requests they send"""
+    sent = {"sync": [], "async": []}
+    response = {}
+    sync_session = MagicMock()
+
+    def request(method, url, params, json, data, timeout):
+        sent["sync"].append((method, url, params, json, data))
+        return SyncResponse(response["payload"])
+
+    sync_session.request = request
+    sync_client = FusionSolarClient("user", "password", session=sync_session)
+    async_client = AsyncFusionSolarClient(
+        "user", "password", session=MagicMock(closed=False)
+    )
+
+    async def async_request(method, url, endpoint_class, params, json, data):
+        sent["async"].append((method, url, params, json, data))
+        return AsyncResponse(response["payload"])
+
+    monkeypatch.setattr(async_client, "_request", async_request)
+    for client in (sync_client, async_client):
+        client._company_id = "NE=1"
+        client._mark_session_active()
+    # the timestamps sent with the requests
+    monkeypatch.setattr(time, "time", lambda: 1700000000.0)
+    return sync_client, async_client, sent, response
+
+
+BATTERY_SIGNALS = [{"value": "Running", "realValue": "1.5"} for _ in range(9)]
+
+ENDPOINTS = [
+    (
+        "get_power_status",
+        (),
+        {"data": {"currentPower": "1", "dailyEnergy": "2", "cumulativeEnergy": "3"}},
+    ),
+    ("get_current_plant_data", ("NE=2",), {"data": {"power": 1}}),
+    ("get_plant_ids", (), {"success": True, "data": {"list": [{"dn": "NE=2"}]}}),
+    ("get_device_ids", (), {"data": [{"mocTypeName": "Inverter", "dn": "NE=3"}]}),
+    (
+        "get_historical_data",
+        (["30014"], "NE=3", datetime(2024, 3, 7)),
+        {"data": {"30014": 0.123456789}},
+    ),
+    ("get_real_time_data", ("NE=3",), {"data": [{"signals": []}]}),
+    ("get_alarm_data", ("NE=3",), {"data": []}),
+    (
+        "get_battery_basic_stats",
+        ("NE=4",),
+        {"success": True, "data": [{}, {"signals": BATTERY_SIGNALS}]},
+    ),
+    (
+        "get_battery_day_stats",
+        ("NE=4", 1700000000000),
+        {"success": True, "data": {"30005": {}, "30007": {}}},
+    ),
+    (
+        "get_battery_module_stats",
+        ("NE=4", "1", ["230320252"]),
+        {"success": True, "data": [{"id": "230320252"}]},
+    ),
+    (
+        "get_battery_ids",
+        ("NE=2",),
+        {
+            "success": True,
+            "data": {"flow": {"nodes": [{"name": "energy_store", "devIds": ["NE=4"]}]}},
+        },
+    ),
+    ("get_plant_stats", ("NE=2", 1700000000000), {"success": True, "data": {}}),
+    ("get_optimizer_stats", ("NE=3",), {"success": True, "data": []}),
+]
+
+
+@pytest.mark.parametrize(("method", "args", "payload"), ENDPOINTS)
+@pytest.mark.asyncio
+async def test_clients_send_the_same_requests(clients, method, args, payload):
+    sync_client, async_client, sent, response = clients
+    response["payload"] = payload
+
+    result = getattr(sync_client, method)(*args)
+    async_result = await getattr(async_client, method)(*args)
+
+    assert sent["sync"] == sent["async"]
+    assert repr(result) == repr(async_result)
+
+
+@pytest.mark.parametrize(
+    ("method", "args"),
+    [
+        ("get_battery_status", ("NE=4",)),
+        ("get_battery_module_stats", ("NE=4", "2")),
+        ("get_battery_module_stats", ("NE=4", "3")),
+        ("get_plant_flow", ("NE=2",)),
+    ],
+)
+@pytest.mark.asyncio
+async def test_clients_return_the_same_fake_battery(clients, monkeypatch, method, args):
+    sync_client, async_client, sent, _ = clients
+    monkeypatch.setattr(client_module, "ENABLE_FAKE_BATTERY", True)
+
+    result = getattr(sync_client, method)(*args)
+
+    assert result == await getattr(async_client, method)(*args)
+    assert sent == {"sync": [], "async": []}
+
+
+@pytest.mark.parametrize(
+    "payload", [{"success": False}, {"success": True}, {"data": {}}]
+)
+@pytest.mark.asyncio
+async def test_clients_reject_the_same_responses(clients, payload):
+    sync_client, async_client, _, response = clients
+    response["payload"] = payload
+
+    with pytest.raises(NoDataException):
+        sync_client.get_plant_stats("NE=2")
+    with pytest.raises(NoDataException):
+        await async_client.get_plant_stats("NE=2")
+
+
+@pytest.mark.parametrize(
+    ("payload", "active"), [({"code": 0}, True), ({"code": 1}, False), ({}, False)]
+)
+@pytest.mark.asyncio
+async def test_clients_read_the_session_state_alike(clients, payload, active):
+    sync_client, async_client, sent, response = clients
+    response["payload"] = payload
+
+    assert sync_client.is_session_active() is active
+    assert await async_client.is_session_active() is active
+    assert sent["sync"] == sent["async"]
+    assert sync_client._is_session_cached() is active
+    assert async_client._is_session_cached() is active
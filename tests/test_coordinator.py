@@ -0,0 +1,306 @@
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.fusionsolarplus.api.fusion_solar_py.exceptions import (
+    RateLimitException,
+)
+from custom_components.fusionsolarplus import coordinator as coordinator_module
+from custom_components.fusionsolarplus.coordinator import (
+    DAY_UPDATE_INTERVAL,
+    FusionSolarAccountCoordinator,
+)
+from custom_components.fusionsolarplus.const import TIER_REALTIME
+from custom_components.fusionsolarplus.retry import CircuitBreaker
+
+PLANT = ("Plant", "NE=1")
+BATTERY = ("Battery", "NE=2")
+PAYLOAD = {"current_power": 1.5}
+
+
+@pytest.fixture
+def coordinator(monkeypatch):
+    """A coordinator with one plant whose data was fetched a minute ago"""
+    entry = SimpleNamespace(data={"username": "user", "subdomain": "uni001eu5"})
+    coordinator = FusionSolarAccountCoordinator(MagicMock(), entry)
+    coordinator.devices[PLANT] = 1
+    coordinator.data = {PLANT: PAYLOAD}
+    coordinator._last_success[PLANT] = time.monotonic() - 60
+    coordinator._stale_data_max_age[PLANT] = timedelta(minutes=10)
+    monkeypatch.setattr(
+        coordinator._scheduler,
+        "next_interval",
+        lambda data, snapshots: DAY_UPDATE_INTERVAL,
+    )
+    monkeypatch.setattr(coordinator, "async_update_listeners", MagicMock())
+    return coordinator
+
+
+def fetch_returning(result):
+    async def fetch(device_key, deadline):
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_failed_update_serves_the_last_data(coordinator, monkeypatch):
+    monkeypatch.setattr(
+        coordinator,
+        "_async_fetch_device_with_retry",
+        fetch_returning(UpdateFailed("timeout")),
+    )
+
+    data = await coordinator._async_update_data()
+
+    assert data == {PLANT: PAYLOAD}
+    assert coordinator.data_age(PLANT) == pytest.approx(60, abs=1)
+    # the data didn't change, the listeners are notified of its age anyway
+    coordinator.async_update_listeners.assert_called_once()
+    assert coordinator.update_interval == DAY_UPDATE_INTERVAL
+
+
+@pytest.mark.asyncio
+async def test_stale_updates_back_off(coordinator, monkeypatch):
+    monkeypatch.setattr(
+        coordinator,
+        "_async_fetch_device_with_retry",
+        fetch_returning(UpdateFailed("timeout")),
+    )
+
+    await coordinator._async_update_data()
+    await coordinator._async_update_data()
+    await coordinator._async_update_data()
+
+    assert coordinator.update_interval == DAY_UPDATE_INTERVAL * 4
+
+
+@pytest.mark.asyncio
+async def test_data_older_than_the_limit_is_not_served(coordinator, monkeypatch):
+    coordinator._last_success[PLANT] = time.monotonic() - 11 * 60
+    monkeypatch.setattr(
+        coordinator,
+        "_async_fetch_device_with_retry",
+        fetch_returning(UpdateFailed("timeout")),
+    )
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    assert coordinator.data_age(PLANT) is None
+
+
+@pytest.mark.asyncio
+async def test_recovery_with_unchanged_data_clears_the_age(coordinator, monkeypatch):
+    monkeypatch.setattr(
+        coordinator,
+        "_async_fetch_device_with_retry",
+        fetch_returning(UpdateFailed("timeout")),
+    )
+    await coordinator._async_update_data()
+    coordinator.async_update_listeners.reset_mock()
+
+    monkeypatch.setattr(
+        coordinator, "_async_fetch_device_with_retry", fetch_returning(dict(PAYLOAD))
+    )
+    data = await coordinator._async_update_data()
+
+    assert data == {PLANT: PAYLOAD}
+    assert coordinator.data_age(PLANT) is None
+    coordinator.async_update_listeners.assert_called_once()
+    assert coordinator.update_interval == DAY_UPDATE_INTERVAL
+
+
+@pytest.mark.asyncio
+async def test_fresh_data_leaves_notifying_to_the_coordinator(coordinator, monkeypatch):
+    monkeypatch.setattr(
+        coordinator,
+        "_async_fetch_device_with_retry",
+        fetch_returning({"current_power": 2.0}),
+    )
+
+    await coordinator._async_update_data()
+
+    coordinator.async_update_listeners.assert_not_called()
+    assert coordinator.data_age(PLANT) is None
+
+
+@pytest.mark.asyncio
+async def test_added_device_is_fetched_if_its_data_was_dropped(
+    coordinator, monkeypatch
+):
+    monkeypatch.setattr(
+        coordinator, "_async_fetch_device_with_retry", fetch_returning(PAYLOAD)
+    )
+    monkeypatch.setattr(coordinator, "async_set_updated_data", MagicMock())
+
+    # the data is there, a second entry of the plant reuses it
+    await coordinator.async_add_device(*PLANT, timedelta(minutes=10))
+    coordinator.async_set_updated_data.assert_not_called()
+
+    # the data was dropped after it went stale
+    coordinator.data = {}
+    device_key = await coordinator.async_add_device(*PLANT, timedelta(minutes=10))
+
+    coordinator.async_set_updated_data.assert_called_once_with({PLANT: PAYLOAD})
+    assert coordinator.devices[device_key] == 3
+
+
+@pytest.mark.asyncio
+async def test_session_is_saved_after_a_login(coordinator, monkeypatch):
+    client = coordinator.client
+    client.login_generation = 1
+    save = MagicMock()
+    monkeypatch.setattr(coordinator_module, "async_save_session", save)
+    monkeypatch.setattr(
+        coordinator, "_async_fetch_device_with_retry", fetch_returning(PAYLOAD)
+    )
+
+    await coordinator._async_update_data()
+    await coordinator._async_update_data()
+    save.assert_called_once_with(coordinator.hass, client, "user", "uni001eu5")
+
+    # the client logged in again during the update
+    client.login_generation = 2
+    await coordinator._async_update_data()
+    assert save.call_count == 2
+
+    # a failed update doesn't save
+    client.login_generation = 3
+    monkeypatch.setattr(
+        coordinator,
+        "_async_fetch_device_with_retry",
+        fetch_returning(UpdateFailed("timeout")),
+    )
+    await coordinator._async_update_data()
+    assert save.call_count == 2
+
+
+def throttled():
+    err = UpdateFailed("throttled")
+    err.__cause__ = RateLimitException("Too many requests to FusionSolar.")
+    return err
+
+
+@pytest.mark.asyncio
+async def test_throttled_updates_back_off(coordinator, monkeypatch):
+    coordinator._last_success[PLANT] = time.monotonic() - 11 * 60
+    coordinator._circuit_breaker = CircuitBreaker(failure_threshold=10)
+    monkeypatch.setattr(
+        coordinator, "_async_fetch_device_with_retry", fetch_returning(throttled())
+    )
+
+    for expected in (1, 2, 4, 8, 15, 15):
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+        assert coordinator.update_interval == timedelta(minutes=expected)
+
+    monkeypatch.setattr(
+        coordinator, "_async_fetch_device_with_retry", fetch_returning(PAYLOAD)
+    )
+    await coordinator._async_update_data()
+    assert coordinator.update_interval == DAY_UPDATE_INTERVAL
+
+
+@pytest.mark.asyncio
+async def test_throttling_slows_down_serving_stale_data(coordinator, monkeypatch):
+    monkeypatch.setattr(
+        coordinator, "_async_fetch_device_with_retry", fetch_returning(throttled())
+    )
+
+    await coordinator._async_update_data()
+
+    assert coordinator.data_age(PLANT) is not None
+    assert coordinator.update_interval == timedelta(minutes=1)
+
+
+@pytest.mark.asyncio
+async def test_throttle_backoff_outlasts_the_circuit_breaker(coordinator, monkeypatch):
+    coordinator._last_success[PLANT] = time.monotonic() - 11 * 60
+    coordinator._circuit_breaker = CircuitBreaker(failure_threshold=4)
+    monkeypatch.setattr(
+        coordinator, "_async_fetch_device_with_retry", fetch_returning(throttled())
+    )
+
+    for _ in range(5):
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+    # the fifth update was skipped by the open breaker, throttling still counts
+    assert coordinator._circuit_breaker.is_open
+    assert coordinator.update_interval == timedelta(minutes=8)
+
+
+class FakeBatteryClient:
+    """Battery with two modules, every module signal has the value 1"""
+
+    ALL_SIGNALS = ["230320252", "230320459"]
+
+    def __init__(self):
+        self.module_requests = []
+
+    @contextmanager
+    def deadline(self, deadline):
+        yield
+
+    async def get_battery_module_stats(self, battery_id, module_id, signal_ids):
+        self.module_requests.append((module_id, signal_ids))
+        if module_id not in ("1", "2"):
+            return []
+        return [
+            {"id": signal_id, "realValue": "1"}
+            for signal_id in signal_ids or self.ALL_SIGNALS
+        ]
+
+
+@pytest.mark.asyncio
+async def test_modules_with_all_entities_disabled_are_not_requested(coordinator):
+    client = FakeBatteryClient()
+    # only module 1 has an enabled entity
+    coordinator.async_subscribe_signal(BATTERY, ("1", 230320252), TIER_REALTIME)
+
+    modules = await coordinator._async_fetch_battery_modules(
+        client, None, BATTERY[1], {TIER_REALTIME}
+    )
+
+    # every module is discovered once
+    assert client.module_requests == [
+        ("1", ["230320252"]),
+        ("2", None),
+        ("3", None),
+        ("4", None),
+    ]
+    assert set(modules) == {"1", "2"}
+
+    coordinator.data[BATTERY] = {"battery": [], "modules": modules}
+    client.module_requests.clear()
+    modules = await coordinator._async_fetch_battery_modules(
+        client, None, BATTERY[1], {TIER_REALTIME}
+    )
+
+    # module 2 has no subscriptions, 3 and 4 reported no data
+    assert client.module_requests == [("1", ["230320252"])]
+    assert set(modules) == {"1"}
+
+
+@pytest.mark.asyncio
+async def test_removing_a_battery_discovers_its_modules_again(coordinator):
+    client = FakeBatteryClient()
+    coordinator.devices[BATTERY] = 1
+    await coordinator._async_fetch_battery_modules(
+        client, None, BATTERY[1], {TIER_REALTIME}
+    )
+
+    coordinator.async_remove_device(BATTERY)
+    client.module_requests.clear()
+    await coordinator._async_fetch_battery_modules(
+        client, None, BATTERY[1], {TIER_REALTIME}
+    )
+
+    assert ("2", None) in client.module_requests
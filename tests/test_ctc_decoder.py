@@ -0,0 +1,149 @@
+import collections
+import math
+
+import numpy as np
+import pytest
+
+from custom_components.fusionsolarplus.api.fusion_solar_py.ctc_decoder import (
+    decode,
+    decode_batch,
+    greedy_decode,
+)
+
+NEG_INF = -float("inf")
+LABELS = 24
+BLANK = LABELS - 1
+BEAM_SIZE = 10
+
+
+def logsumexp(*args):
+    if all(a == NEG_INF for a in args):
+        return NEG_INF
+    a_max = max(args)
+    return a_max + math.log(sum(math.exp(a - a_max) for a in args))
+
+
+def decode_reference(probs, beam_size=100, blank=0):
+    """The pure Python prefix beam search the numpy decoder replaced"""
+    T, S = probs.shape
+    with np.errstate(divide="ignore"):
+        probs = np.log(probs)
+    beam = [(tuple(), (0.0, NEG_INF))]
+
+    for t in range(T):
+        next_beam = collections.defaultdict(lambda: (NEG_INF, NEG_INF))
+        for s in range(S):
+            p = probs[t, s]
+            for prefix, (p_b, p_nb) in beam:
+                if s == blank:
+                    n_p_b, n_p_nb = next_beam[prefix]
+                    n_p_b = logsumexp(n_p_b, p_b + p, p_nb + p)
+                    next_beam[prefix] = (n_p_b, n_p_nb)
+                    continue
+                end_t = prefix[-1] if prefix else None
+                n_prefix = prefix + (s,)
+                n_p_b, n_p_nb = next_beam[n_prefix]
+                if s != end_t:
+                    n_p_nb = logsumexp(n_p_nb, p_b + p, p_nb + p)
+                else:
+                    n_p_nb = logsumexp(n_p_nb, p_b + p)
+                next_beam[n_prefix] = (n_p_b, n_p_nb)
+                if s == end_t:
+                    n_p_b, n_p_nb = next_beam[prefix]
+                    n_p_nb = logsumexp(n_p_nb, p_nb + p)
+                    next_beam[prefix] = (n_p_b, n_p_nb)
+
+        beam = sorted(next_beam.items(), key=lambda x: logsumexp(*x[1]), reverse=True)
+        beam = beam[:beam_size]
+
+    best = beam[0]
+    return best[0], -logsumexp(*best[1])
+
+
+def make_output(rng, time_steps=50, length=4, margin=10.0, noise=1.5):
+    """Softmax output of the captcha model for a random captcha, the label of
+    each time step is margin above the others"""
+    path = np.full(time_steps, BLANK)
+    starts = np.sort(rng.choice(time_steps // 2, length, replace=False)) * 2
+    for start, label in zip(starts, rng.integers(0, BLANK, length)):
+        path[start : start + 2] = label
+    logits = rng.normal(0, noise, (time_steps, LABELS))
+    logits[np.arange(time_steps), path] += margin
+    probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+# on very noisy outputs the pruning may pick another sequence than the
+# reference, those aren't compared
+@pytest.mark.parametrize(("margin", "noise"), [(10.0, 1.5), (6.0, 2.0), (20.0, 0.0)])
+def test_decode_matches_the_reference(margin, noise):
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        probs = make_output(rng, margin=margin, noise=noise)
+        labels, score = decode(probs, beam_size=BEAM_SIZE, blank=BLANK)
+        ref_labels, ref_score = decode_reference(probs, BEAM_SIZE, BLANK)
+        assert labels == ref_labels
+        # labels below PRUNE_THRESHOLD don't add to the score
+        assert score == pytest.approx(ref_score, abs=0.05)
+
+
+def test_batch_matches_single_decodes():
+    rng = np.random.default_rng(1)
+    outputs = [make_output(rng, margin=4.0, noise=2.0) for _ in range(8)]
+    outputs += [make_output(rng, margin=30.0, noise=0.0) for _ in range(2)]
+
+    results = decode_batch(outputs, beam_size=BEAM_SIZE, blank=BLANK)
+
+    for probs, hypotheses in zip(outputs, results):
+        labels, score = decode(probs, beam_size=BEAM_SIZE, blank=BLANK)
+        assert hypotheses[0][0] == labels
+        assert hypotheses[0][1] == pytest.approx(score)
+
+
+def test_top_k_hypotheses_are_distinct_and_sorted():
+    rng = np.random.default_rng(2)
+    probs = make_output(rng, margin=3.0, noise=2.0)
+
+    (hypotheses,) = decode_batch([probs], beam_size=BEAM_SIZE, blank=BLANK, top_k=3)
+
+    assert len(hypotheses) == 3
+    assert len({labels for labels, _ in hypotheses}) == 3
+    scores = [score for _, score in hypotheses]
+    assert scores == sorted(scores)
+    assert hypotheses[0] == decode(probs, beam_size=BEAM_SIZE, blank=BLANK)
+
+
+def test_confident_output_returns_the_best_path_only():
+    rng = np.random.default_rng(3)
+    probs = make_output(rng, margin=30.0, noise=0.0)
+
+    (hypotheses,) = decode_batch([probs], beam_size=BEAM_SIZE, blank=BLANK, top_k=3)
+
+    assert hypotheses == [greedy_decode(probs, BLANK)]
+    assert hypotheses[0][0] == decode_reference(probs, BEAM_SIZE, BLANK)[0]
+
+
+def test_greedy_decode_merges_repeats_and_drops_blanks():
+    path = [BLANK, 3, 3, BLANK, 3, 5, 5, BLANK]
+    probs = np.full((len(path), LABELS), 1e-6)
+    probs[np.arange(len(path)), path] = 1.0
+
+    labels, _ = greedy_decode(probs, BLANK)
+
+    assert labels == (3, 3, 5)
+
+
+def test_empty_output():
+    assert decode_batch(np.zeros((2, 0, LABELS)), blank=BLANK) == [
+        [((), 0.0)],
+        [((), 0.0)],
+    ]
+
+
+def test_outputs_of_different_lengths_are_rejected():
+    rng = np.random.default_rng(4)
+    with pytest.raises(ValueError):
+        decode_batch(
+            [make_output(rng, time_steps=50), make_output(rng, time_steps=40)],
+            blank=BLANK,
+        )
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+import custom_components.fusionsolarplus as integration
+from custom_components.fusionsolarplus import DOMAIN, async_recreate_client
+
+KEY = ("user", "uni001eu5")
+
+
+def entry(entry_id, password):
+    return SimpleNamespace(
+        entry_id=entry_id,
+        data={"username": "user", "subdomain": "uni001eu5", "password": password},
+    )
+
+
+@pytest.fixture
+def hass(monkeypatch):
+    """Two entries of one account sharing a client, the first one unloaded"""
+    entries = {"second": entry("second", "new password")}
+    shared = {"client": "stale", "entries": {"first", "second"}}
+    hass = SimpleNamespace(
+        data={DOMAIN: {"clients": {KEY: shared}, "client_locks": {}}},
+        config_entries=SimpleNamespace(async_get_entry=entries.get),
+    )
+    monkeypatch.setattr(
+        integration,
+        "_async_create_client",
+        AsyncMock(side_effect=lambda hass, entry: entry.data["password"]),
+    )
+    monkeypatch.setattr(integration, "async_close_client", AsyncMock())
+    return hass
+
+
+@pytest.mark.asyncio
+async def test_recreated_client_uses_a_loaded_entry(hass):
+    client = await async_recreate_client(hass, KEY, "stale")
+
+    assert client == "new password"
+    assert hass.data[DOMAIN]["first"] == hass.data[DOMAIN]["second"] == client
+    integration.async_close_client.assert_awaited_once_with("stale")
+
+
+@pytest.mark.asyncio
+async def test_client_replaced_by_another_entry_is_reused(hass):
+    hass.data[DOMAIN]["clients"][KEY]["client"] = "fresh"
+
+    assert await async_recreate_client(hass, KEY, "stale") == "fresh"
+    integration._async_create_client.assert_not_awaited()
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.fusionsolarplus import polling
+from custom_components.fusionsolarplus.polling import (
+    DAY_UPDATE_INTERVAL,
+    NIGHT_UPDATE_INTERVAL,
+    REFRESH_DELAY,
+    AdaptivePollScheduler,
+)
+
+NOW = datetime(2026, 1, 15, 6, 0, tzinfo=timezone.utc)
+INVERTER = ("Inverter", "NE=1")
+
+
+def inverter_snapshot(power, status="Grid connected"):
+    return {
+        polling.INVERTER_ACTIVE_POWER_SIGNAL: power,
+        polling.INVERTER_STATUS_SIGNAL: status,
+    }
+
+
+@pytest.fixture
+def sun(monkeypatch):
+    """Controls whether the sun is up and when it rises next"""
+    state = {"up": True, "sunrise": NOW + timedelta(hours=2)}
+    monkeypatch.setattr(polling, "is_up", lambda hass: state["up"])
+    monkeypatch.setattr(
+        polling, "get_astral_event_next", lambda hass, event: state["sunrise"]
+    )
+    monkeypatch.setattr(polling.dt_util, "utcnow", lambda: NOW)
+    monkeypatch.setattr(polling.time, "time", lambda: NOW.timestamp())
+    return state
+
+
+def test_active_devices_poll_at_day_rate(sun):
+    scheduler = AdaptivePollScheduler(None)
+    interval = scheduler.next_interval(
+        {INVERTER: {}}, {INVERTER: inverter_snapshot(3.2)}
+    )
+    assert interval == DAY_UPDATE_INTERVAL
+    assert not scheduler.idle
+
+
+def test_idle_devices_poll_at_day_rate_while_the_sun_is_up(sun):
+    scheduler = AdaptivePollScheduler(None)
+    interval = scheduler.next_interval(
+        {INVERTER: {}}, {INVERTER: inverter_snapshot(0, "Standby")}
+    )
+    assert interval == DAY_UPDATE_INTERVAL
+    assert scheduler.idle
+
+
+def test_idle_devices_poll_at_night_rate_while_the_sun_is_down(sun):
+    sun["up"] = False
+    scheduler = AdaptivePollScheduler(None)
+    interval = scheduler.next_interval(
+        {INVERTER: {}}, {INVERTER: inverter_snapshot(0, "Shutdown")}
+    )
+    assert interval == NIGHT_UPDATE_INTERVAL
+
+
+@pytest.mark.parametrize(
+    ("until_sunrise", "expected"),
+    [
+        (timedelta(minutes=2), timedelta(minutes=2)),
+        (timedelta(seconds=5), DAY_UPDATE_INTERVAL),
+    ],
+)
+def test_night_rate_does_not_sleep_past_sunrise(sun, until_sunrise, expected):
+    sun["up"] = False
+    sun["sunrise"] = NOW + until_sunrise
+    scheduler = AdaptivePollScheduler(None)
+    interval = scheduler.next_interval(
+        {INVERTER: {}}, {INVERTER: inverter_snapshot(0, "Shutdown")}
+    )
+    assert interval == expected
+
+
+def test_unknown_activity_polls_at_day_rate(sun):
+    sun["up"] = False
+    scheduler = AdaptivePollScheduler(None)
+    interval = scheduler.next_interval({INVERTER: {}}, {INVERTER: {}})
+    assert interval == DAY_UPDATE_INTERVAL
+
+
+def test_polls_align_to_the_learned_refresh(monkeypatch, sun):
+    scheduler = AdaptivePollScheduler(None)
+    period = 300
+    start = NOW.timestamp() - 4 * period
+    for i in range(4):
+        collected_at = start + i * period
+        monkeypatch.setattr(polling.time, "time", lambda t=collected_at: t + 20)
+        data = {INVERTER: {"data": [{"signals": [{"latestTime": collected_at}]}]}}
+        interval = scheduler.next_interval(data, {INVERTER: inverter_snapshot(i + 1)})
+
+    # the data showed up 20 s after each refresh, the next one is due a period
+    # after the last poll
+    assert interval == timedelta(seconds=period)
+
+
+def test_polls_follow_an_upload_lag_above_the_refresh_delay(monkeypatch, sun):
+    period, lag = 300, 45
+    start = NOW.timestamp()
+    end = start + 30 * period
+    scheduler = AdaptivePollScheduler(None)
+
+    first_seen = {}
+    polls = 0
+    now = start + lag
+    while now < end:
+        # the newest collection the cloud returns at this time
+        collected_at = start + (now - start - lag) // period * period
+        first_seen.setdefault(collected_at, now)
+        monkeypatch.setattr(polling.time, "time", lambda t=now: t)
+        data = {INVERTER: {"data": [{"signals": [{"latestTime": collected_at}]}]}}
+        snapshot = inverter_snapshot(1 + (collected_at - start) / period)
+        now += scheduler.next_interval(data, {INVERTER: snapshot}).total_seconds()
+        polls += now >= start + 5 * period
+
+    assert lag > REFRESH_DELAY
+    # once the lag is learned, every collection is seen within one day interval
+    # of showing up
+    delays = [
+        seen - (collected_at + lag)
+        for collected_at, seen in first_seen.items()
+        if collected_at >= start + 5 * period
+    ]
+    assert len(delays) == 25
+    assert max(delays) < DAY_UPDATE_INTERVAL.total_seconds()
+    # one poll per refresh instead of 20 at the day rate
+    assert polls <= 26
@@ -0,0 +1,131 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import aiohttp
+import pytest
+
+from custom_components.fusionsolarplus import retry
+from custom_components.fusionsolarplus.api.fusion_solar_py.exceptions import (
+    AuthenticationException,
+    InvalidSubdomainException,
+    NetworkException,
+    NoDataException,
+    RateLimitException,
+    ServerException,
+    SessionExpiredException,
+)
+from custom_components.fusionsolarplus.retry import (
+    ERROR_AUTH,
+    ERROR_CONFIG,
+    ERROR_NETWORK,
+    ERROR_NO_DATA,
+    ERROR_OTHER,
+    ERROR_SERVER,
+    ERROR_THROTTLED,
+    CircuitBreaker,
+    RetryPolicy,
+    classify_error,
+)
+
+
+def http_error(status_code):
+    return aiohttp.ClientResponseError(None, (), status=status_code)
+
+
+@pytest.mark.parametrize(
+    ("err", "expected"),
+    [
+        (InvalidSubdomainException("wrong region"), ERROR_CONFIG),
+        (SessionExpiredException("expired"), ERROR_AUTH),
+        (AuthenticationException("wrong password"), ERROR_AUTH),
+        (RateLimitException("slow down"), ERROR_THROTTLED),
+        (ServerException("HTTP 502"), ERROR_SERVER),
+        (NetworkException("unreachable"), ERROR_NETWORK),
+        (NoDataException("empty"), ERROR_NO_DATA),
+        (http_error(401), ERROR_AUTH),
+        (http_error(403), ERROR_AUTH),
+        (http_error(429), ERROR_THROTTLED),
+        (http_error(503), ERROR_SERVER),
+        (http_error(404), ERROR_OTHER),
+        (aiohttp.ClientConnectionError(), ERROR_NETWORK),
+        (aiohttp.ServerTimeoutError(), ERROR_NETWORK),
+        (asyncio.TimeoutError(), ERROR_NETWORK),
+        (json.JSONDecodeError("Expecting value", "<html>", 0), ERROR_AUTH),
+        (ValueError("unexpected"), ERROR_OTHER),
+    ],
+)
+def test_classify_error(err, expected):
+    assert classify_error(err) == expected
+
+
+@pytest.mark.parametrize(
+    ("error_class", "retried"),
+    [
+        (ERROR_AUTH, True),
+        (ERROR_NETWORK, True),
+        (ERROR_SERVER, True),
+        (ERROR_OTHER, True),
+        (ERROR_THROTTLED, False),
+        (ERROR_NO_DATA, False),
+        (ERROR_CONFIG, False),
+    ],
+)
+def test_retry_policy_retries_by_error_class(error_class, retried):
+    policy = RetryPolicy(max_retries=2)
+    assert policy.should_retry(error_class, 0) == retried
+    assert not policy.should_retry(error_class, 2)
+
+
+def test_retry_delay_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=30.0)
+    for attempt in range(10):
+        delay = min(30.0, 2**attempt)
+        assert delay / 2 <= policy.delay(attempt) <= delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(retry.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_circuit_breaker_opens_after_the_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=timedelta(minutes=5))
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.is_open
+    assert not breaker.allow_request()
+    assert breaker.remaining_cooldown == timedelta(minutes=5)
+
+
+def test_circuit_breaker_success_resets_the_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert not breaker.is_open
+
+
+def test_circuit_breaker_half_open(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=timedelta(minutes=5))
+    breaker.record_failure()
+
+    clock[0] += 5 * 60
+    # a single trial update is let through once the cooldown passed
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    clock[0] += 5 * 60
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.remaining_cooldown == timedelta(0)